@@ -165,11 +165,7 @@ async def transcribe_uploaded_file(
             )
         
         # Save uploaded file temporarily
-        temp_file_path = os.path.join(settings.temp_dir, f"temp_transcribe_{int(time.time())}_{file.filename}")
-        
-        with open(temp_file_path, "wb") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
+        temp_file_path = await transcription_service.save_upload_file(file)
         
         # Perform transcription
         transcription_result = await transcription_service.transcribe_audio(
@@ -234,15 +230,11 @@ async def process_with_zapcap(
             )
         
         # Save uploaded file temporarily
-        temp_file_path = os.path.join(settings.temp_dir, f"temp_zapcap_{int(time.time())}_{file.filename}")
-        
-        with open(temp_file_path, "wb") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
+        temp_file_path = await zapcap_service.save_upload_file(file)
         
         # Process with ZapCap
-        zapcap_result = await zapcap_service.process_video(
-            video_path=temp_file_path,
+        zapcap_result = await zapcap_service.process_video_file(
+            temp_file_path,
             template_id=request.template_id,
             language=request.language,
             auto_approve=request.auto_approve
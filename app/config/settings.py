@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    public_base_url: Optional[str] = None  # e.g. https://api.example.com; used for file URLs instead of the request host
     
     # OpenAI Configuration
     openai_api_key: str = Field(..., description="OpenAI API key for transcription and AI analysis")
@@ -21,12 +22,20 @@ class Settings(BaseSettings):
     zapcap_api_key: Optional[str] = Field(None, description="ZapCap API key for automated captioning")
     zapcap_template_id: Optional[str] = Field(None, description="Default ZapCap template ID")
     zapcap_api_base: str = "https://api.zapcap.ai"
+    zapcap_upload_concurrency: int = 8  # multipart parts uploaded in parallel
+    zapcap_upload_buffer_budget: int = 256 * 1024 * 1024  # bytes of part buffers per multipart upload; caps parallel parts for large parts
+    zapcap_adaptive_chunk: bool = True  # size multipart parts to ~32 parts (16MB-256MB) instead of 10MB
+    zapcap_part_max_retries: int = 3  # attempts per multipart part on transport errors and 5xx
+    zapcap_max_concurrent_clips: int = 6  # clips captioned at once by the auto clipper
+    zapcap_clip_max_retries: int = 2  # retries of each ZapCap stage of a clip after connection errors
     
     # Storage Configuration
     upload_dir: str = "data/uploads"
     clips_dir: str = "data/clips"
     temp_dir: str = "data/temp"
     results_dir: str = "data/results"
+    cache_dir: str = "data/cache"
+    analysis_cache_ttl: int = 24 * 3600  # seconds transcripts and clip analyses are reused for; 0 disables
     
     # Processing Configuration
     max_file_size: int = 500 * 1024 * 1024  # 500MB
@@ -34,6 +43,7 @@ class Settings(BaseSettings):
     min_clip_duration: int = 10   # seconds
     max_transcription_chunk_size: int = 20 * 1024 * 1024  # 20MB
     max_concurrent_chunks: int = 5
+    transcription_max_retries: int = 3  # retries on rate limit / connection errors
     max_chunk_size_mb: int = 25  # MB - for chunking large files
     
     # Video Processing Configuration
@@ -41,6 +51,10 @@ class Settings(BaseSettings):
     supported_video_formats: list[str] = [".mp4", ".mov", ".avi", ".mkv", ".webm"]
     ffmpeg_preset: str = "fast"
     video_quality_crf: int = 23
+    video_encoder: str = "auto"  # auto, libx264, h264_nvenc, h264_videotoolbox, h264_qsv
+    ffmpeg_threads_per_encode: int = 2
+    stream_copy_max_keyframe_shift: float = 1.0  # seconds an "original" clip may start early to avoid re-encoding
+    parallel_scene_detection_min_duration: float = 300.0  # seconds of video above which scene detection uses worker processes
     
     # Instagram Configuration (for content analyzer)
     instagram_username: Optional[str] = None
@@ -1,7 +1,7 @@
 from functools import lru_cache
 from typing import Generator
 from fastapi import Depends
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 from app.config.settings import Settings
 from app.services.transcription import TranscriptionService
@@ -24,9 +24,16 @@ def get_openai_client(settings: Settings = None) -> OpenAI:
     return OpenAI(api_key=settings.openai_api_key)
 
 
+@lru_cache()
+def get_async_openai_client() -> AsyncOpenAI:
+    """Get cached async OpenAI client used for Whisper transcription"""
+    settings = get_settings()
+    return AsyncOpenAI(api_key=settings.openai_api_key)
+
+
 def get_transcription_service(
     settings: Settings = Depends(get_settings),
-    openai_client: OpenAI = Depends(get_openai_client)
+    openai_client: AsyncOpenAI = Depends(get_async_openai_client)
 ) -> TranscriptionService:
     """Get transcription service instance"""
     return TranscriptionService(settings, openai_client)
@@ -44,15 +51,17 @@ def get_zapcap_service(settings: Settings = Depends(get_settings)) -> ZapCapServ
 
 def get_content_analyzer_service(
     settings: Settings = Depends(get_settings),
-    openai_client: OpenAI = Depends(get_openai_client)
+    openai_client: OpenAI = Depends(get_openai_client),
+    async_openai_client: AsyncOpenAI = Depends(get_async_openai_client)
 ) -> ContentAnalyzerService:
     """Get content analyzer service instance"""
-    return ContentAnalyzerService(settings, openai_client)
+    return ContentAnalyzerService(settings, openai_client, async_openai_client)
 
 
 def get_auto_clipper_service(
     settings: Settings = Depends(get_settings),
-    openai_client: OpenAI = Depends(get_openai_client)
+    openai_client: OpenAI = Depends(get_openai_client),
+    async_openai_client: AsyncOpenAI = Depends(get_async_openai_client)
 ) -> AutoClipperService:
     """Get auto clipper service instance"""
-    return AutoClipperService(settings, openai_client) 
\ No newline at end of file
+    return AutoClipperService(settings, openai_client, async_openai_client) 
\ No newline at end of file
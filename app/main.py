@@ -1,16 +1,22 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import logging
 import time
 from datetime import datetime
 from fastapi.staticfiles import StaticFiles
 
+try:
+    import orjson
+except ImportError:  # optional: responses use stdlib json instead
+    orjson = None
+
 from app.config.settings import Settings
 from app.config.logging import setup_logging
 from app.core.middleware import error_handler_middleware
 from app.core.exceptions import ClipperException
 from app.api.v1.api import api_router
+from app.services.zapcap import close_shared_client
 from app.models.responses import ErrorResponse
 
 # Setup logging
@@ -27,7 +33,8 @@ app = FastAPI(
     version=settings.app_version,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
-    openapi_url="/openapi.json" if settings.debug else None
+    openapi_url="/openapi.json" if settings.debug else None,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # Add CORS middleware
@@ -163,6 +170,9 @@ async def shutdown_event():
     """Cleanup on application shutdown"""
     logger.info(f"Shutting down {settings.app_name}")
     
+    # Close pooled outbound connections
+    await close_shared_client()
+    
     # Cleanup temporary files if needed
     import os
     import shutil
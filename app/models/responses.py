@@ -189,7 +189,8 @@ class ClipResponse(BaseModel):
                 "total_clips": 3,
                 "clips": [],
                 "original_video_info": {},
-                "transcript": "Full video transcript...",
+                "transcript_url": "http://localhost:8000/data/clips/transcript_1700000000.txt",
+                "transcript_size": 12345,
                 "processing_summary": {},
                 "request_id": "req_1234567890"
             }
@@ -201,7 +202,8 @@ class ClipResponse(BaseModel):
     total_clips: int = Field(..., description="Total number of clips created")
     clips: List[ClipInfo] = Field(..., description="List of generated clips")
     original_video_info: VideoInfo = Field(..., description="Original video metadata")
-    transcript: str = Field(..., description="Full video transcript")
+    transcript_url: str = Field(..., description="URL of the full video transcript as a text file")
+    transcript_size: int = Field(..., description="Length of the transcript in characters")
     processing_summary: ProcessingSummary = Field(..., description="Processing statistics")
     request_id: Optional[str] = Field(None, description="Unique request identifier")
     
@@ -2,12 +2,19 @@ import os
 import re
 import json
 import asyncio
+import random
+import time
 from datetime import datetime
-from typing import Dict, List, Union, Optional
-from io import BytesIO
+from typing import Awaitable, Callable, Dict, List, Union, Optional
 
+import httpx
 from fastapi import UploadFile, Request
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
 
 from app.services.base import BaseService
 from app.config.settings import Settings
@@ -15,27 +22,66 @@ from app.services.transcription import TranscriptionService
 from app.services.video_processing import VideoProcessingService
 from app.services.content_analyzer import ContentAnalyzerService
 from app.services.zapcap import ZapCapService
-from app.core.exceptions import VideoProcessingError, TranscriptionError, ContentAnalysisError
+from app.core.exceptions import VideoProcessingError, TranscriptionError, ContentAnalysisError, ZapCapError
 from app.utils.url_utils import file_path_to_url
+from app.utils.file_cache import JsonFileCache, sha256_file, sha256_text
+
+# Outermost JSON array in a chat completion that may wrap it in prose or fences
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+_CLIP_ANALYSIS_MODEL = "gpt-4o"
+
+
+def _is_transient_error(error: BaseException, unsent_only: bool = False) -> bool:
+    """Check whether an error was caused, at any depth, by a connection-level failure
+    
+    With unsent_only, only failures that happen before the request reaches the
+    server count, so retrying cannot repeat a call the server already acted on.
+    """
+    transient_types = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) if unsent_only else httpx.TransportError
+    while error is not None:
+        if isinstance(error, transient_types):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _is_auth_error(error: Optional[BaseException], api_host: str) -> bool:
+    """Check whether an error was caused, at any depth, by a 401/403 from the ZapCap API
+    
+    Responses from other hosts, such as an expired presigned storage URL, only
+    concern the clip being uploaded and are not counted.
+    """
+    while error is not None:
+        if (isinstance(error, httpx.HTTPStatusError) and error.response.status_code in (401, 403)
+                and error.request.url.host == api_host):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
 
 
 class AutoClipperService(BaseService):
     """Main orchestrator service for automatic video clipping with AI analysis"""
     
-    def __init__(self, settings: Settings, openai_client: OpenAI):
+    def __init__(self, settings: Settings, openai_client: OpenAI, async_openai_client: AsyncOpenAI):
         """Initialize auto clipper service
         
         Args:
             settings: Application settings
             openai_client: Shared OpenAI client
+            async_openai_client: Shared async OpenAI client for transcription
         """
         super().__init__(settings)
         
-        # Initialize component services with shared OpenAI client
-        self.transcription_service = TranscriptionService(settings, openai_client)
+        # Initialize component services with shared OpenAI clients
+        self.transcription_service = TranscriptionService(settings, async_openai_client)
         self.video_processing_service = VideoProcessingService(settings)
-        self.content_analyzer_service = ContentAnalyzerService(settings, openai_client)
+        self.content_analyzer_service = ContentAnalyzerService(settings, openai_client, async_openai_client)
         self.zapcap_service = ZapCapService(settings)
+        
+        # Re-runs of the same video (template or aspect ratio tweaks) reuse the
+        # transcript and clip analysis instead of paying for Whisper and the LLM again
+        self.cache = JsonFileCache(settings.cache_dir, settings.analysis_cache_ttl)
     
     def analyze_clip_segments(self, transcript_data: Dict, video_duration: float) -> List[Dict]:
         """Use AI to analyze transcript and identify clip-worthy segments
@@ -45,29 +91,31 @@ class AutoClipperService(BaseService):
             video_duration: Total video duration in seconds
             
         Returns:
-            List of clip segment information
+            List of clip segment information within the allowed durations, with
+            parsed 'start_seconds' and 'end_seconds'
         """
         try:
             # self.content_analyzer_service._ensure_client()  # Removed, not needed
             
-            # Prepare transcript text with timestamps
-            words = transcript_data.get('words', [])
-            if not words:
-                # Fallback to segments if words not available
-                segments = transcript_data.get('segments', [])
-                transcript_text = ""
-                for segment in segments:
-                    start_time = self.format_timestamp(segment['start'])
-                    end_time = self.format_timestamp(segment['end'])
-                    text = segment['text'].strip()
-                    transcript_text += f"[{start_time}-{end_time}] {text}\n"
+            # Prepare transcript text with timestamps; sentence-level segments carry the
+            # same timing information in far fewer prompt tokens than per-word lines
+            segments = transcript_data.get('segments') or []
+            if segments:
+                entries = ((segment['start'], segment['end'], segment['text']) for segment in segments)
             else:
-                transcript_text = ""
-                for word in words:
-                    start_time = self.format_timestamp(word['start'])
-                    end_time = self.format_timestamp(word['end'])
-                    text = word['word'].strip()
-                    transcript_text += f"[{start_time}-{end_time}] {text}\n"
+                # Fallback to words if segments not available
+                entries = ((word['start'], word['end'], word['word']) for word in transcript_data.get('words') or [])
+            format_timestamp = self.format_timestamp
+            transcript_text = "".join(
+                f"[{format_timestamp(start)}-{format_timestamp(end)}] {text.strip()}\n"
+                for start, end, text in entries
+            )
+            
+            cache_key = sha256_text(_CLIP_ANALYSIS_MODEL, str(video_duration), transcript_text)
+            cached_clips = self.cache.get("clip_segments", cache_key)
+            if cached_clips is not None:
+                self.logger.info(f"Using cached clip analysis: {len(cached_clips)} potential clips")
+                return self._with_clip_times(cached_clips)
             
             # AI prompt for clip analysis
             prompt = f"""
@@ -99,7 +147,7 @@ class AutoClipperService(BaseService):
             """
             
             response = self.content_analyzer_service.client.chat.completions.create(
-                model="gpt-4o",
+                model=_CLIP_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a video editing expert who identifies engaging content segments."},
                     {"role": "user", "content": prompt}
@@ -111,11 +159,13 @@ class AutoClipperService(BaseService):
             response_text = response.choices[0].message.content.strip()
             
             # Extract JSON from response
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+            json_match = _JSON_ARRAY_RE.search(response_text)
             if json_match:
-                clips_data = json.loads(json_match.group())
+                clips_json = json_match.group()
+                clips_data = orjson.loads(clips_json) if orjson is not None else json.loads(clips_json)
                 self.logger.info(f"AI identified {len(clips_data)} potential clips")
-                return clips_data
+                self.cache.set("clip_segments", cache_key, clips_data)
+                return self._with_clip_times(clips_data)
             else:
                 raise ContentAnalysisError("Could not parse AI response for clip analysis")
                 
@@ -123,6 +173,32 @@ class AutoClipperService(BaseService):
             self.logger.error(f"Error analyzing clip segments: {e}")
             raise ContentAnalysisError(f"Failed to analyze clip segments: {e}")
     
+    def _write_text(self, path: str, text: str) -> None:
+        """Write a UTF-8 text file (blocking; call through asyncio.to_thread)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    def _with_clip_times(self, clips_data: List[Dict]) -> List[Dict]:
+        """Parse each clip's MM:SS times once and keep only clips of an allowed duration
+        
+        Args:
+            clips_data: Clip segments as returned by the model
+        
+        Returns:
+            Usable segments, each with 'start_seconds' and 'end_seconds' added
+        """
+        time_to_seconds = self.video_processing_service.time_to_seconds
+        segments = []
+        for segment in clips_data:
+            start_seconds = time_to_seconds(segment['start_time'])
+            end_seconds = time_to_seconds(segment['end_time'])
+            clip_duration = end_seconds - start_seconds
+            if clip_duration < self.settings.min_clip_duration or clip_duration > self.settings.max_clip_duration:
+                self.logger.warning(f"Skipping clip '{segment.get('title', '')}': duration {clip_duration}s is out of range")
+                continue
+            segments.append({**segment, 'start_seconds': start_seconds, 'end_seconds': end_seconds})
+        return segments
+    
     async def get_video_from_url(self, url: str) -> str:
         """Download video from social media URL using content analyzer
         
@@ -147,82 +223,119 @@ class AutoClipperService(BaseService):
             self.logger.error(f"Error downloading video from URL: {e}")
             raise VideoProcessingError(f"Failed to download video: {e}")
     
-    async def process_clips_with_zapcap_parallel(self, clip_infos: List[Dict], zapcap_template_id: Optional[str]) -> Dict[int, Dict]:
-        """Process multiple clips with ZapCap simultaneously
+    async def _retry_transient(self, stage: str, clip_path: str, call: Callable[[], Awaitable],
+                               unsent_only: bool = False):
+        """Run one ZapCap stage, retrying connection errors with exponential backoff
         
         Args:
-            clip_infos: List of clip information
-            zapcap_template_id: Optional template ID
-            
+            stage: Stage name for logging
+            clip_path: Path to the clip file, for logging
+            call: Starts the stage; called again for each attempt
+            unsent_only: Only retry errors raised before the request was sent
+        
         Returns:
-            Dictionary mapping clip numbers to ZapCap results
+            The stage's result
         """
-        if not clip_infos:
-            return {}
+        max_attempts = self.settings.zapcap_clip_max_retries + 1
+        for attempt in range(max_attempts):
+            try:
+                return await call()
+            except Exception as e:
+                if attempt == max_attempts - 1 or not _is_transient_error(e, unsent_only):
+                    raise
+                delay = 2 ** attempt + random.random()
+                self.logger.warning(f"ZapCap {stage} connection error for {os.path.basename(clip_path)}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _process_clip_with_zapcap(self, semaphore: asyncio.Semaphore, clip_path: str,
+                                        zapcap_template_id: Optional[str]) -> Dict:
+        """Caption one clip with ZapCap once a concurrency slot is free
         
-        self.logger.info(f"Starting simultaneous ZapCap processing for {len(clip_infos)} clips...")
+        Each stage retries its own connection errors, so a timeout while polling
+        or downloading retries against the existing task instead of uploading
+        the clip and creating another billable task. Task creation is only
+        retried when the request never reached ZapCap.
         
-        # Prepare all clips for simultaneous upload
-        upload_tasks = []
-        clip_data = []
+        Args:
+            semaphore: Limits how many clips are with ZapCap at once
+            clip_path: Path to the clip file
+            zapcap_template_id: Optional template ID
         
-        for clip_info in clip_infos:
-            clip_number = clip_info['clip_number']
-            clip_path = clip_info['file_path']
-            clip_filename = clip_info['file_name']
-            
-            # Read file content for this clip
-            with open(clip_path, 'rb') as f:
-                file_content = f.read()
-                file_obj = BytesIO(file_content)
-                
-                # Create a mock UploadFile-like object
-                class MockUploadFile:
-                    def __init__(self, filename, file_obj, size):
-                        self.filename = filename
-                        self.file = file_obj
-                        self.size = size
-                    
-                    async def read(self):
-                        return self.file.getvalue()
-                
-                upload_file = MockUploadFile(
-                    filename=clip_filename,
-                    file_obj=file_obj,
-                    size=len(file_content)
-                )
-                
-                # Store clip data and create task
-                clip_data.append({
-                    'clip_number': clip_number,
-                    'upload_file': upload_file
-                })
-                
-                # Create ZapCap processing task
-                task = self.zapcap_service.process_video(
-                    upload_file,
-                    template_id=zapcap_template_id,
-                    language="id",
-                    auto_approve=True
-                )
-                upload_tasks.append(task)
+        Returns:
+            ZapCap processing result
+        """
+        zapcap = self.zapcap_service
+        async with semaphore:
+            start_time = time.time()
+            video_id = await self._retry_transient(
+                "upload", clip_path, lambda: zapcap.upload_video(clip_path)
+            )
+            task_id = await self._retry_transient(
+                "task creation", clip_path,
+                lambda: zapcap.create_caption_task(
+                    video_id, template_id=zapcap_template_id, language="id", auto_approve=True
+                ),
+                unsent_only=True
+            )
+            status_data = await self._retry_transient(
+                "status check", clip_path, lambda: zapcap.wait_for_completion(video_id, task_id)
+            )
+            download_url = status_data.get("downloadUrl")
+            if not download_url:
+                raise ZapCapError("Download URL not found in response")
+            result_path = await self._retry_transient(
+                "download", clip_path,
+                lambda: zapcap.download_result_video(download_url, video_id, os.path.basename(clip_path))
+            )
+            return zapcap.caption_result(video_id, task_id, result_path, start_time)
+    
+    async def _gather_zapcap_tasks(self, tasks: List[asyncio.Task]) -> List:
+        """Wait for ZapCap tasks like gather(return_exceptions=True), stopping early on auth failures
         
-        self.logger.info(f"Sending {len(upload_tasks)} clips to ZapCap simultaneously...")
+        A rejected API key or template fails every clip the same way, so once one
+        task gets a 401/403 from the ZapCap API the rest are cancelled instead of
+        uploading for nothing.
         
-        # Execute all ZapCap requests simultaneously
+        Args:
+            tasks: ZapCap clip tasks
+        
+        Returns:
+            Each task's result or exception, in the same order
+        """
+        api_host = httpx.URL(self.settings.zapcap_api_base).host
+        pending = set(tasks)
         try:
-            results = await asyncio.gather(*upload_tasks, return_exceptions=True)
-        except Exception as e:
-            self.logger.error(f"Error in simultaneous ZapCap processing: {e}")
-            results = [e] * len(upload_tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(not task.cancelled() and _is_auth_error(task.exception(), api_host) for task in done):
+                    self.logger.error(f"ZapCap rejected the request, cancelling {len(pending)} remaining clips")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return [
+            ZapCapError("Cancelled: ZapCap authentication failed") if task.cancelled()
+            else task.exception() or task.result()
+            for task in tasks
+        ]
+    
+    def _zapcap_results_by_clip(self, clip_numbers: List[int], results: List) -> Dict[int, Dict]:
+        """Turn gathered ZapCap results (or exceptions) into a dictionary keyed by clip number
         
-        # Process results into a dictionary keyed by clip number
+        Args:
+            clip_numbers: Clip number of each result, in the same order
+            results: ZapCap results or the exceptions raised for them
+        
+        Returns:
+            Dictionary mapping clip numbers to ZapCap results
+        """
         zapcap_results = {}
         successful_count = 0
         
-        for i, result in enumerate(results):
-            clip_number = clip_data[i]['clip_number']
-            
+        for clip_number, result in zip(clip_numbers, results):
             if isinstance(result, Exception):
                 self.logger.error(f"ZapCap processing failed for clip {clip_number} with exception: {result}")
                 zapcap_results[clip_number] = {'error': str(result)}
@@ -240,9 +353,50 @@ class AutoClipperService(BaseService):
                 self.logger.error(f"ZapCap processing failed for clip {clip_number}: Invalid response")
                 zapcap_results[clip_number] = {'error': 'Invalid response from ZapCap'}
         
-        self.logger.info(f"Simultaneous ZapCap processing completed: {successful_count}/{len(clip_infos)} clips successful")
+        self.logger.info(f"Simultaneous ZapCap processing completed: {successful_count}/{len(clip_numbers)} clips successful")
         return zapcap_results
     
+    async def create_clips_with_zapcap(self, video_path: str, clip_specs: List[Dict],
+                                       video_info: Dict, zapcap_template_id: Optional[str]) -> Dict[int, Dict]:
+        """Create clips and caption them with ZapCap as overlapping stages
+        
+        Each group of clips is handed to ZapCap as soon as its FFmpeg process
+        finishes, so uploads start while later groups are still encoding.
+        
+        Args:
+            video_path: Path to source video
+            clip_specs: Clip specs for create_video_clips_batch, each with a 'clip_number'
+            video_info: Already probed video metadata
+            zapcap_template_id: Optional template ID
+        
+        Returns:
+            Dictionary mapping clip numbers to ZapCap results
+        """
+        semaphore = asyncio.Semaphore(max(1, self.settings.zapcap_max_concurrent_clips))
+        clip_numbers = []
+        zapcap_tasks = []
+        
+        try:
+            async for ready_specs in self.video_processing_service.create_video_clips_as_completed(
+                video_path, clip_specs, video_info
+            ):
+                for spec in ready_specs:
+                    clip_numbers.append(spec['clip_number'])
+                    zapcap_tasks.append(asyncio.create_task(
+                        self._process_clip_with_zapcap(semaphore, spec['output_path'], zapcap_template_id)
+                    ))
+        except BaseException:
+            # Clip creation failed; don't leave captioning running for a failed request
+            for task in zapcap_tasks:
+                task.cancel()
+            # Let cancelled uploads unwind before the error propagates
+            await asyncio.gather(*zapcap_tasks, return_exceptions=True)
+            raise
+        
+        self.logger.info(f"All {len(clip_specs)} clips created, waiting for ZapCap...")
+        results = await self._gather_zapcap_tasks(zapcap_tasks)
+        return self._zapcap_results_by_clip(clip_numbers, results)
+    
     async def process_video(self, video_input: Union[str, UploadFile], 
                           use_zapcap: bool = False, 
                           zapcap_template_id: Optional[str] = None,
@@ -279,11 +433,24 @@ class AutoClipperService(BaseService):
                 video_path = video_input
             
             # Step 2: Get video information
-            video_info = self.video_processing_service.get_video_info(video_path)
+            video_info = await asyncio.to_thread(self.video_processing_service.get_video_info, video_path)
             self.logger.info(f"Video info: {video_info['duration']:.1f}s, {video_info['width']}x{video_info['height']}")
             
-            # Step 3: Transcribe video
-            transcript_data = await self.transcription_service.transcribe_video(video_path)
+            # Step 3: Transcribe video; clip selection works on segments, and captions are
+            # transcribed separately by ZapCap, so word timestamps are not requested
+            transcript_key = None
+            transcript_data = None
+            if self.cache.enabled:
+                transcript_key = await asyncio.to_thread(sha256_file, video_path)
+                transcript_data = await asyncio.to_thread(self.cache.get, "transcript", transcript_key)
+            if transcript_data is None:
+                transcript_data = await self.transcription_service.transcribe_video(
+                    video_path, video_info['duration'], word_timestamps=False
+                )
+                if transcript_key:
+                    await asyncio.to_thread(self.cache.set, "transcript", transcript_key, transcript_data)
+            else:
+                self.logger.info("Using cached transcript")
             
             # Step 4: Analyze for clip segments
             clip_segments = self.analyze_clip_segments(transcript_data, video_info['duration'])
@@ -293,30 +460,31 @@ class AutoClipperService(BaseService):
             
             # Step 5: Create clips
             created_clips = []
+            clip_specs = []
+            total_clip_duration = 0.0
             timestamp = int(datetime.now().timestamp())
             
+            # Segments arrive with parsed times, already filtered to the allowed durations
             for i, segment in enumerate(clip_segments):
-                start_seconds = self.video_processing_service.time_to_seconds(segment['start_time'])
-                end_seconds = self.video_processing_service.time_to_seconds(segment['end_time'])
-                
-                # Validate clip duration
+                start_seconds = segment['start_seconds']
+                end_seconds = segment['end_seconds']
                 clip_duration = end_seconds - start_seconds
-                if clip_duration < self.settings.min_clip_duration or clip_duration > self.settings.max_clip_duration:
-                    self.logger.warning(f"Skipping clip {i+1}: duration {clip_duration}s is out of range")
-                    continue
                 
                 # Create clip filename
                 safe_title = self.video_processing_service.get_safe_filename(segment['title'])
                 clip_filename = f"clip_{timestamp}_{i+1}_{safe_title}.mp4"
                 clip_path = os.path.join(self.settings.clips_dir, clip_filename)
                 
-                # Create the clip
-                self.video_processing_service.create_video_clip(
-                    video_path, start_seconds, end_seconds, clip_path, aspect_ratio
-                )
+                clip_specs.append({
+                    'clip_number': i + 1,
+                    'start_time': start_seconds,
+                    'end_time': end_seconds,
+                    'output_path': clip_path,
+                    'aspect_ratio': aspect_ratio
+                })
                 
                 # Convert file path to URL if request is provided
-                clip_url = file_path_to_url(clip_path, request) if request else clip_path
+                clip_url = file_path_to_url(clip_path, request, base_url=self.settings.public_base_url) if request else clip_path
                 clip_info = {
                     'clip_number': i + 1,
                     'title': segment['title'],
@@ -331,14 +499,17 @@ class AutoClipperService(BaseService):
                 }
                 
                 created_clips.append(clip_info)
+                total_clip_duration += clip_duration
             
             if not created_clips:
                 raise VideoProcessingError("No valid clips could be created")
             
-            # Step 6: Process all clips with ZapCap in parallel if requested
             if use_zapcap:
-                self.logger.info(f"Processing {len(created_clips)} clips with ZapCap in parallel...")
-                zapcap_results = await self.process_clips_with_zapcap_parallel(created_clips, zapcap_template_id)
+                # Steps 5-6 overlap: each group of clips goes to ZapCap as soon as it is encoded
+                self.logger.info(f"Creating {len(created_clips)} clips and processing them with ZapCap in parallel...")
+                zapcap_results = await self.create_clips_with_zapcap(
+                    video_path, clip_specs, video_info, zapcap_template_id
+                )
                 
                 # Update clips with ZapCap results
                 for clip in created_clips:
@@ -350,12 +521,24 @@ class AutoClipperService(BaseService):
                         else:
                             # Convert ZapCap result file path to URL
                             if 'captioned_video_path' in zapcap_result and request:
-                                zapcap_result['captioned_video_url'] = file_path_to_url(zapcap_result['captioned_video_path'], request)
+                                zapcap_result['captioned_video_url'] = file_path_to_url(
+                                    zapcap_result['captioned_video_path'], request, base_url=self.settings.public_base_url
+                                )
                             clip['zapcap_result'] = zapcap_result
+            else:
+                # Encode every clip with batched FFmpeg passes over the source
+                await self.video_processing_service.create_video_clips_batch_async(video_path, clip_specs, video_info)
+            
+            # Save the transcript next to the clips rather than inlining it in the result,
+            # which is stored with the task and re-serialized on every status poll
+            transcript_text = transcript_data.get('text', '')
+            transcript_path = os.path.join(self.settings.clips_dir, f"transcript_{timestamp}.txt")
+            await asyncio.to_thread(self._write_text, transcript_path, transcript_text)
+            transcript_url = file_path_to_url(transcript_path, request, base_url=self.settings.public_base_url) if request else transcript_path
             
             # Prepare response
             # Convert original video path to URL if request is provided
-            video_url = file_path_to_url(video_path, request) if request else video_path
+            video_url = file_path_to_url(video_path, request, base_url=self.settings.public_base_url) if request else video_path
             result = {
                 'success': True,
                 'message': f'Successfully created {len(created_clips)} clips',
@@ -363,11 +546,12 @@ class AutoClipperService(BaseService):
                 'clips': created_clips,
                 'original_video_info': video_info,
                 'original_video_url': video_url,
-                'transcript': transcript_data.get('text', ''),
+                'transcript_url': transcript_url,
+                'transcript_size': len(transcript_text),
                 'processing_summary': {
                     'video_duration': video_info['duration'],
                     'clips_created': len(created_clips),
-                    'total_clip_duration': sum(clip['duration'] for clip in created_clips),
+                    'total_clip_duration': total_clip_duration,
                     'zapcap_processed': use_zapcap,
                     'aspect_ratio': aspect_ratio
                 }
@@ -380,11 +564,5 @@ class AutoClipperService(BaseService):
             self.logger.error(f"Error in auto clipping process: {e}")
             raise
         finally:
-            # Clean up temporary files
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    try:
-                        os.remove(temp_file)
-                        self.logger.info(f"Cleaned up temp file: {temp_file}")
-                    except OSError as e:
-                        self.logger.warning(f"Could not clean up temp file {temp_file}: {e}") 
\ No newline at end of file
+            # Clean up temporary files in the background; the response doesn't depend on it
+            self.schedule_cleanup(temp_files) 
\ No newline at end of file
@@ -1,8 +1,50 @@
+import io
 import os
+import math
+import stat
+import time
+import shutil
+import asyncio
+import tempfile
 from abc import ABC
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
+import aiofiles
 from app.config.settings import Settings
 from app.config.logging import get_logger
+from app.core.exceptions import StorageError
+
+
+# Strong references to fire-and-forget cleanup tasks; the event loop only keeps weak ones
+_background_tasks = set()
+
+
+@lru_cache(maxsize=8192)
+def _format_whole_seconds(whole_seconds: int) -> str:
+    """Render an integer number of seconds as MM:SS, once per distinct value"""
+    minutes, seconds_part = divmod(whole_seconds, 60)
+    return f"{minutes:02d}:{seconds_part:02d}"
+
+
+def _disk_fileno(source) -> Optional[int]:
+    """Return the descriptor of the regular file behind a file object, or None
+    
+    A SpooledTemporaryFile is never asked for its fileno, since that would roll
+    an in-memory spool over to disk; its wrapped file is checked instead. If
+    that can't be found, or has no real descriptor (BytesIO), None is returned
+    and callers use a plain buffered copy.
+    """
+    if isinstance(source, tempfile.SpooledTemporaryFile):
+        source = getattr(source, '_file', None)
+        if source is None:
+            return None
+    try:
+        fd = source.fileno()
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            return None
+    except (OSError, AttributeError, io.UnsupportedOperation):
+        return None
+    return fd
 
 
 class BaseService(ABC):
@@ -43,9 +85,9 @@ class BaseService(ABC):
         Returns:
             Formatted time string in MM:SS format
         """
-        minutes = int(seconds // 60)
-        seconds_part = int(seconds % 60)
-        return f"{minutes:02d}:{seconds_part:02d}"
+        # Transcripts repeat the same whole seconds many times over, so the
+        # formatted string is cached per second rather than rebuilt per call
+        return _format_whole_seconds(math.floor(seconds))
     
     def format_file_size(self, size_bytes: int) -> str:
         """Convert bytes to human readable format
@@ -68,10 +110,144 @@ class BaseService(ABC):
         Args:
             file_paths: List of file paths to remove
         """
-        for file_path in file_paths:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    self.logger.debug(f"Cleaned up temp file: {file_path}")
-            except OSError as e:
-                self.logger.warning(f"Could not remove temp file {file_path}: {e}") 
\ No newline at end of file
+        for file_path in dict.fromkeys(file_paths):
+            self._safe_remove(file_path)
+    
+    async def cleanup_temp_files_async(self, file_paths: List[str]) -> None:
+        """Clean up temporary files concurrently without blocking the event loop
+        
+        Args:
+            file_paths: List of file paths to remove
+        """
+        await asyncio.gather(
+            *(asyncio.to_thread(self._safe_remove, file_path) for file_path in dict.fromkeys(file_paths)),
+            return_exceptions=True
+        )
+    
+    def schedule_cleanup(self, file_paths: List[str]) -> None:
+        """Remove temporary files in a background task so the caller can return immediately
+        
+        Must be called from a running event loop. Failures are logged by _safe_remove.
+        
+        Args:
+            file_paths: List of file paths to remove
+        """
+        if not file_paths:
+            return
+        task = asyncio.create_task(self.cleanup_temp_files_async(list(file_paths)))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    
+    def _safe_remove(self, file_path: str) -> None:
+        """Remove a file if it exists, logging instead of raising on failure
+        
+        Args:
+            file_path: Path of file to remove
+        """
+        # One unlink per file; a missing file is not an error
+        try:
+            os.remove(file_path)
+            self.logger.debug(f"Cleaned up temp file: {file_path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not remove temp file {file_path}: {e}")
+    
+    async def save_upload_file(self, upload_file) -> str:
+        """Save uploaded file to uploads directory
+        
+        Args:
+            upload_file: FastAPI UploadFile object
+            
+        Returns:
+            Path to saved file
+            
+        Raises:
+            StorageError: If file save fails
+        """
+        try:
+            file_extension = os.path.splitext(upload_file.filename or "video.mp4")[1]
+            temp_file_path = os.path.join(self.settings.upload_dir, f"upload_{int(time.time())}{file_extension}")
+            
+            source = self._upload_source(upload_file)
+            if source is not None:
+                # Spooled upload: one worker-thread hop for the whole copy
+                total_size = await asyncio.to_thread(self._copy_file_object, source, temp_file_path)
+                self.logger.info(f"File saved to: {temp_file_path}, size: {self.format_file_size(total_size)}")
+                return temp_file_path
+            
+            expected_size = getattr(upload_file, 'size', None)
+            total_size = 0
+            async with aiofiles.open(temp_file_path, 'wb') as temp_file:
+                # Reserve the extents up front when the client sent the size
+                if isinstance(expected_size, int) and expected_size > 0 and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(temp_file.fileno(), 0, expected_size)
+                    except OSError:
+                        pass
+                
+                while chunk := await upload_file.read(1 << 20):
+                    total_size += len(chunk)
+                    await temp_file.write(chunk)
+                
+                if isinstance(expected_size, int) and expected_size > total_size:
+                    await temp_file.truncate(total_size)
+            
+            self.logger.info(f"File saved to: {temp_file_path}, size: {self.format_file_size(total_size)}")
+            return temp_file_path
+            
+        except Exception as e:
+            self.logger.error(f"Error saving upload file: {e}")
+            raise StorageError(f"Failed to save uploaded file: {e}")
+    
+    def _upload_source(self, upload_file) -> Optional[object]:
+        """Return the real file object backing an upload, if it has one
+        
+        Args:
+            upload_file: FastAPI UploadFile or compatible object
+        
+        Returns:
+            The spooled or on-disk file, or None for stream-only uploads
+        """
+        source = getattr(upload_file, 'file', None)
+        if isinstance(source, (io.IOBase, tempfile.SpooledTemporaryFile)):
+            return source
+        return None
+    
+    def _copy_file_object(self, source, destination_path: str) -> int:
+        """Copy a file object to disk with zero-copy sendfile or a 4MB buffer
+        
+        Blocking; call through asyncio.to_thread from async code.
+        
+        Args:
+            source: Seekable file object to copy from its start
+            destination_path: Path to write to
+        
+        Returns:
+            Number of bytes written
+        """
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+        
+        source_fd = _disk_fileno(source)
+        with open(destination_path, 'wb') as destination:
+            if source_fd is not None and hasattr(os, 'sendfile'):
+                try:
+                    offset = 0
+                    while offset < size:
+                        sent = os.sendfile(destination.fileno(), source_fd, offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    if offset == size:
+                        return size
+                    destination.seek(0)
+                    destination.truncate()
+                except (OSError, io.UnsupportedOperation):
+                    destination.seek(0)
+                    destination.truncate()
+                source.seek(0)
+            
+            shutil.copyfileobj(source, destination, length=4 * 1024 * 1024)
+        return size
@@ -1,36 +1,179 @@
 import os
+import asyncio
 import tempfile
 import shutil
 import subprocess
 import base64
 import json
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import cv2
 import numpy as np
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 from app.services.base import BaseService
 from app.config.settings import Settings
 from app.core.exceptions import ContentAnalysisError, DownloadError, ConfigurationError
 
+_TIKTOK_ID_RE = re.compile(r'/video/(\d+)')
+_INSTAGRAM_ID_RE = re.compile(r'/(?:p|reel|tv|reels)/([A-Za-z0-9_-]+)', re.IGNORECASE)
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
+_CATEGORY_RE = re.compile(r'Category\s*:\s*(.*)')
+
+# Frames are scored at this width so cost and scores don't depend on source resolution
+_IMPORTANCE_WIDTH = 320
+
+
+# Scene detection compares histograms, so frames are decoded straight to small
+# grayscale; the aspect ratio is not kept since histograms don't depend on it
+_SCENE_FRAME_SIZE = (320, 180)
+
+# Up to this many frames are decoded forward rather than seeking between targets
+_MAX_GRAB_GAP = 30
+
+_KEYFRAME_JPEG_QUALITY = 85
+
+
+def _gray_frames(video_path: str, start_time: float = 0.0, count: Optional[int] = None) -> Iterator[np.ndarray]:
+    """Yield downscaled grayscale frames decoded by an ffmpeg pipe
+    
+    ffmpeg decodes, scales and converts in its own process, so only a few KB per
+    frame reach Python and decoding overlaps the caller's analysis.
+    
+    Args:
+        video_path: Path to video file
+        start_time: Seconds to seek to before the first frame
+        count: Maximum number of frames to decode (all by default)
+    
+    Raises:
+        ContentAnalysisError: If ffmpeg cannot be started or exits with an error
+    """
+    width, height = _SCENE_FRAME_SIZE
+    frame_size = width * height
+    cmd = ['ffmpeg', '-v', 'error']
+    if start_time > 0:
+        cmd += ['-ss', f"{start_time:.6f}"]
+    cmd += [
+        '-i', video_path, '-map', '0:v:0', '-fps_mode', 'passthrough',
+        '-vf', f"scale={width}:{height}:flags=area", '-pix_fmt', 'gray'
+    ]
+    if count is not None:
+        cmd += ['-frames:v', str(count)]
+    cmd += ['-f', 'rawvideo', 'pipe:1']
+    
+    # stderr goes to a file so a chatty ffmpeg can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+        except OSError as e:
+            raise ContentAnalysisError(f"Could not run ffmpeg to decode frames: {e}")
+        with proc:
+            try:
+                while len(data := proc.stdout.read(frame_size)) == frame_size:
+                    yield np.frombuffer(data, np.uint8).reshape(height, width)
+            finally:
+                # Stops ffmpeg early if the caller didn't consume every frame
+                proc.stdout.close()
+            
+            # Only reached when the caller read to the end, so a failure means
+            # missing frames rather than an intentional early stop
+            if proc.wait() != 0:
+                stderr_file.seek(0)
+                message = stderr_file.read().decode(errors='replace').strip()
+                raise ContentAnalysisError(f"ffmpeg failed to decode frames from {video_path}: {message}")
+
+
+def _histogram_changes(frames: Iterator[np.ndarray], threshold: float,
+                       first_index: int = 0, start: int = 0) -> List[int]:
+    """Return indices of frames whose histogram differs from the previous frame's
+    
+    Args:
+        frames: Grayscale frames, the first of which has index ``first_index``
+        threshold: Histogram difference threshold for a scene change
+        first_index: Frame index of the first frame
+        start: Frames before this index are only used as a comparison baseline
+    """
+    changes = []
+    # Each histogram is computed once and compared against the next frame's;
+    # the two buffers are swapped instead of allocated per frame
+    prev_hist = np.empty((256, 1), np.float32)
+    hist = np.empty_like(prev_hist)
+    
+    for frame_count, gray in enumerate(frames, first_index):
+        cv2.calcHist([gray], [0], None, [256], [0, 256], hist=hist)
+        
+        if frame_count > first_index and frame_count >= start:
+            diff = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL)
+            if diff < (1 - threshold):
+                changes.append(frame_count)
+        
+        prev_hist, hist = hist, prev_hist
+    
+    return changes
+
+
+def _read_frames_at(video_path: str, indices: List[int]) -> Dict[int, np.ndarray]:
+    """Decode full-resolution BGR frames at the given indices with a single capture
+    
+    Nearby targets are reached by decoding forward; distant ones by seeking.
+    """
+    frames = {}
+    cap = cv2.VideoCapture(video_path)
+    position = 0
+    try:
+        for index in sorted(indices):
+            if not 0 <= index - position <= _MAX_GRAB_GAP:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                position = index
+            while position < index and cap.grab():
+                position += 1
+            if position != index:
+                break
+            ret, frame = cap.read()
+            position += 1
+            if ret:
+                frames[index] = frame
+    finally:
+        cap.release()
+    return frames
+
 
 class SmartFrameExtractor:
     """Utility class for intelligent video frame extraction"""
     
     def __init__(self):
-        self.orb = cv2.ORB_create(nfeatures=500)
+        # Frames are scored on a thread pool and a detector isn't safe to share
+        self._local = threading.local()
+    
+    @property
+    def orb(self):
+        """ORB detector for the calling thread"""
+        orb = getattr(self._local, 'orb', None)
+        if orb is None:
+            orb = self._local.orb = cv2.ORB_create(nfeatures=500)
+        return orb
     
     def calculate_frame_importance(self, frame) -> float:
         """Calculate importance score for a video frame"""
+        height, width = frame.shape[:2]
+        if width > _IMPORTANCE_WIDTH:
+            size = (_IMPORTANCE_WIDTH, max(1, round(height * _IMPORTANCE_WIDTH / width)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.sum(edges) / (edges.shape[0] * edges.shape[1])
+        edge_density = cv2.mean(edges)[0]
         
         keypoints = self.orb.detect(gray, None)
         feature_count = len(keypoints)
         
-        brightness_var = np.var(gray)
+        _, stddev = cv2.meanStdDev(gray)
+        brightness_var = stddev[0, 0] ** 2
         
         importance_score = (
             edge_density * 0.4 + 
@@ -41,79 +184,122 @@ class SmartFrameExtractor:
     
     def detect_scene_changes(self, video_path: str, threshold: float = 0.3) -> List[Tuple[int, np.ndarray, float]]:
         """Detect scene changes in video"""
-        cap = cv2.VideoCapture(video_path)
-        scene_changes = []
-        prev_frame = None
-        frame_count = 0
+        return self._score_frames(video_path, self._scene_change_indices(video_path, threshold))
+    
+    def _scene_change_indices(self, video_path: str, threshold: float, parallel: bool = False) -> List[int]:
+        """Return the indices of scene-change frames without decoding them at full size
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            if prev_frame is not None:
-                hist1 = cv2.calcHist([prev_frame], [0], None, [256], [0, 256])
-                hist2 = cv2.calcHist([gray], [0], None, [256], [0, 256])
-                diff = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
-                
-                if diff < (1 - threshold):
-                    importance = self.calculate_frame_importance(frame)
-                    scene_changes.append((frame_count, frame, importance))
-            
-            prev_frame = gray
-            frame_count += 1
+        Args:
+            video_path: Path to video file
+            threshold: Histogram difference threshold for a scene change
+            parallel: Scan frame ranges in worker processes, see detect_scene_changes_parallel
+        """
+        if parallel:
+            return self._scene_change_indices_parallel(video_path, threshold)
+        with closing(_gray_frames(video_path)) as frames:
+            return _histogram_changes(frames, threshold)
+    
+    def _score_frames(self, video_path: str, indices: List[int],
+                      max_workers: Optional[int] = None) -> List[Tuple[int, np.ndarray, float]]:
+        """Decode the frames at the given indices and score their importance
         
+        Decoding stays serial on one capture; scoring runs on a thread pool since
+        OpenCV releases the GIL in its kernels.
+        
+        Args:
+            video_path: Path to video file
+            indices: Frame indices to decode; frames that can't be read are skipped
+            max_workers: Scoring threads (defaults to CPU count)
+        
+        Returns:
+            (frame_idx, frame, importance) in the order of ``indices``
+        """
+        frames = _read_frames_at(video_path, indices)
+        found = [index for index in indices if index in frames]
+        workers = min(len(found), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                scores = list(pool.map(self.calculate_frame_importance, (frames[index] for index in found)))
+        else:
+            scores = [self.calculate_frame_importance(frames[index]) for index in found]
+        return [(index, frames[index], score) for index, score in zip(found, scores)]
+    
+    def detect_scene_changes_parallel(self, video_path: str, threshold: float = 0.3,
+                                      n_workers: Optional[int] = None) -> List[Tuple[int, np.ndarray, float]]:
+        """Detect scene changes by splitting the video into frame ranges scanned in parallel
+        
+        Args:
+            video_path: Path to video file
+            threshold: Histogram difference threshold for a scene change
+            n_workers: Number of worker processes (defaults to CPU count)
+        
+        Returns:
+            Scene changes as (frame_idx, frame, importance), sorted by frame index
+        """
+        return self._score_frames(video_path, self._scene_change_indices_parallel(video_path, threshold, n_workers))
+    
+    def _scene_change_indices_parallel(self, video_path: str, threshold: float,
+                                       n_workers: Optional[int] = None) -> List[int]:
+        """Return scene-change indices found by scanning frame ranges in worker processes
+        
+        Workers only run the histogram scan and send back indices; the frames are
+        decoded and scored afterwards in this process, like the serial path.
+        """
+        cap = cv2.VideoCapture(video_path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
         cap.release()
-        return scene_changes
+        
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, total_frames))
+        if n_workers == 1 or total_frames <= 0 or fps <= 0:
+            return self._scene_change_indices(video_path, threshold)
+        
+        bounds = np.linspace(0, total_frames, n_workers + 1, dtype=int)
+        ranges = [(video_path, int(start), int(end), threshold, fps) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        
+        # OpenCV is not fork-safe on every platform, so workers are spawned fresh
+        with multiprocessing.get_context('spawn').Pool(processes=len(ranges)) as pool:
+            chunk_results = pool.starmap(_scene_change_indices_range, ranges)
+        
+        # Ranges are in order and don't overlap, so the indices come out sorted
+        return [index for chunk in chunk_results for index in chunk]
     
-    def extract_smart_keyframes(self, video_path: str, max_frames: int = 20, method: str = 'hybrid') -> List[Tuple[int, np.ndarray, float]]:
-        """Extract keyframes using smart algorithms"""
+    def extract_smart_keyframes(self, video_path: str, max_frames: int = 20, method: str = 'hybrid',
+                                parallel: bool = False) -> List[Tuple[int, np.ndarray, float]]:
+        """Extract keyframes using smart algorithms
+        
+        With ``parallel``, scene detection scans frame ranges in worker processes.
+        """
         if method == 'scene_change':
-            keyframes = self.detect_scene_changes(video_path)
+            keyframes = self._score_frames(video_path, self._scene_change_indices(video_path, 0.3, parallel))
             keyframes.sort(key=lambda x: x[2], reverse=True)
             return keyframes[:max_frames]
         
         elif method == 'uniform_smart':
             cap = cv2.VideoCapture(video_path)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
             frame_indices = np.linspace(0, total_frames-1, max_frames*2, dtype=int)
             
-            candidates = []
-            for idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-                ret, frame = cap.read()
-                if ret:
-                    importance = self.calculate_frame_importance(frame)
-                    candidates.append((idx, frame, importance))
-            
-            cap.release()
+            candidates = self._score_frames(video_path, [int(idx) for idx in frame_indices])
             candidates.sort(key=lambda x: x[2], reverse=True)
             return candidates[:max_frames]
         
         elif method == 'hybrid':
-            scene_frames = self.detect_scene_changes(video_path, threshold=0.2)
+            scene_indices = self._scene_change_indices(video_path, threshold=0.2, parallel=parallel)
             
-            if len(scene_frames) < max_frames:
+            if len(scene_indices) < max_frames:
                 cap = cv2.VideoCapture(video_path)
                 total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                existing_indices = set([f[0] for f in scene_frames])
-                remaining_slots = max_frames - len(scene_frames)
-                
-                if remaining_slots > 0:
-                    all_indices = set(range(0, total_frames, max(1, total_frames // (remaining_slots * 2))))
-                    new_indices = list(all_indices - existing_indices)[:remaining_slots]
-                    
-                    for idx in new_indices:
-                        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-                        ret, frame = cap.read()
-                        if ret:
-                            importance = self.calculate_frame_importance(frame)
-                            scene_frames.append((idx, frame, importance))
-                
                 cap.release()
+                existing_indices = set(scene_indices)
+                remaining_slots = max_frames - len(scene_indices)
+                
+                all_indices = set(range(0, total_frames, max(1, total_frames // (remaining_slots * 2))))
+                scene_indices += list(all_indices - existing_indices)[:remaining_slots]
             
+            # Scene changes and fill-in frames are decoded together in one forward pass
+            scene_frames = self._score_frames(video_path, scene_indices)
             scene_frames.sort(key=lambda x: x[0])
             return scene_frames[:max_frames]
         
@@ -121,12 +307,38 @@ class SmartFrameExtractor:
             raise ValueError(f"Unknown extraction method: {method}")
 
 
+def _scene_change_indices_range(video_path: str, start: int, end: int, threshold: float,
+                                fps: float) -> List[int]:
+    """Find scene changes within frames [start, end) of a video (worker process entry point)
+    
+    The frame before ``start`` is decoded as the comparison baseline so that a cut
+    falling exactly on a range boundary is still detected.
+    """
+    first = max(0, start - 1)
+    # Seek half a frame early so rounding never skips the first frame
+    start_time = max(0.0, (first - 0.5) / fps)
+    with closing(_gray_frames(video_path, start_time, end - first)) as frames:
+        return _histogram_changes(frames, threshold, first, start)
+
+
+def _video_duration(video_path: str) -> float:
+    """Read a video's duration from its frame count and rate (0.0 if unknown)"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    finally:
+        cap.release()
+    return total_frames / fps if fps > 0 and total_frames > 0 else 0.0
+
+
 class ContentAnalyzerService(BaseService):
     """Service for content analysis including social media downloads and AI analysis"""
     
-    def __init__(self, settings: Settings, openai_client: OpenAI):
+    def __init__(self, settings: Settings, openai_client: OpenAI, async_openai_client: Optional[AsyncOpenAI] = None):
         super().__init__(settings)
         self.client = openai_client
+        self.async_client = async_openai_client or AsyncOpenAI(api_key=settings.openai_api_key)
         self.frame_extractor = SmartFrameExtractor()
     
     def check_yt_dlp(self) -> bool:
@@ -164,14 +376,12 @@ class ContentAnalyzerService(BaseService):
         Returns:
             Post ID if found
         """
-        import re
-        
         if platform == 'tiktok':
-            match = re.search(r'/video/(\d+)', url)
+            match = _TIKTOK_ID_RE.search(url)
             if match:
                 return match.group(1)
         elif platform == 'instagram':
-            match = re.search(r'/(?:p|reel|tv|reels)/([A-Za-z0-9_-]+)', url, re.IGNORECASE)
+            match = _INSTAGRAM_ID_RE.search(url)
             if match:
                 return match.group(1)
         
@@ -359,28 +569,40 @@ class ContentAnalyzerService(BaseService):
         
         Args:
             video_path: Path to video file
-            output_dir: Directory to save frames
+            output_dir: Directory the frames are also saved to in debug mode
             max_frames: Maximum number of frames
             method: Extraction method
             
         Returns:
             List of frame data for AI analysis
         """
-        keyframes_data = self.frame_extractor.extract_smart_keyframes(video_path, max_frames, method)
+        # Worker processes only pay off for long videos on multi-core machines
+        parallel = (
+            method != 'uniform_smart' and (os.cpu_count() or 1) > 1
+            and _video_duration(video_path) >= self.settings.parallel_scene_detection_min_duration
+        )
+        keyframes_data = self.frame_extractor.extract_smart_keyframes(video_path, max_frames, method, parallel)
         images = []
         
         for i, (frame_idx, frame, importance) in enumerate(keyframes_data):
-            img_path = os.path.join(output_dir, f'smart_frame_{i:03d}.jpg')
-            cv2.imwrite(img_path, frame)
+            # Encode in memory at a reduced quality to keep the vision payload small
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, _KEYFRAME_JPEG_QUALITY])
+            if not ok:
+                self.logger.warning(f"Could not encode keyframe {frame_idx}")
+                continue
+            jpeg = buffer.tobytes()
+            
+            if self.settings.debug:
+                with open(os.path.join(output_dir, f'smart_frame_{i:03d}.jpg'), 'wb') as img_file:
+                    img_file.write(jpeg)
             
-            with open(img_path, "rb") as img_file:
-                b64_img = base64.b64encode(img_file.read()).decode('utf-8')
-                images.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{b64_img}"
-                    }
-                })
+            b64_img = base64.b64encode(jpeg).decode('utf-8')
+            images.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{b64_img}"
+                }
+            })
         
         return images
     
@@ -447,8 +669,7 @@ class ContentAnalyzerService(BaseService):
     
     def sanitize_filename(self, name: str) -> str:
         """Sanitize filename for cross-platform compatibility"""
-        import re
-        return re.sub(r'[<>:"/\\|?*]', '_', name)
+        return _SANITIZE_RE.sub('_', name)
     
     async def analyze_video_from_url(self, url: str, language: str = 'en') -> Dict:
         """Complete video analysis workflow from social media URL
@@ -467,21 +688,25 @@ class ContentAnalyzerService(BaseService):
             if not video_file:
                 raise ContentAnalysisError('Video file not found after scraping!')
             
-            # Extract transcript (this will need transcription service)
+            # Transcribe audio and extract keyframes concurrently; they read independent streams
             from app.services.transcription import TranscriptionService
-            transcription_service = TranscriptionService(self.settings)
-            transcript_result = await transcription_service.transcribe_video(video_file)
+            transcription_service = TranscriptionService(self.settings, self.async_client)
+            # Both must finish before tmpdir is removed, since the frame thread can't be cancelled
+            keyframes, transcript_result = await asyncio.gather(
+                asyncio.to_thread(self.extract_keyframes_smart, video_file, tmpdir, 15, 'hybrid'),
+                transcription_service.transcribe_video(video_file),
+                return_exceptions=True
+            )
+            for result in (keyframes, transcript_result):
+                if isinstance(result, Exception):
+                    raise result
             transcript = transcript_result.get('text', '')
             
-            # Extract keyframes
-            keyframes = self.extract_keyframes_smart(video_file, tmpdir, max_frames=15, method='hybrid')
-            
             # Generate summary
             summary = self.summarize_video_content(transcript, keyframes, language=language)
             
             # Parse category from summary
-            import re
-            category_match = re.search(r'Category\s*:\s*(.*)', summary)
+            category_match = _CATEGORY_RE.search(summary)
             category_display = category_match.group(1).strip().split('\n')[0] if category_match else 'Uncategorized'
             category_code = category_display.lower().replace(' ', '_').replace('/', '_')
             category_code = self.sanitize_filename(category_code)
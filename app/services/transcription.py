@@ -1,37 +1,199 @@
 import os
 import subprocess
 import json
+import glob
 import asyncio
-import concurrent.futures
-from datetime import datetime
-from typing import Dict, List, Optional
+import csv
+import random
+import uuid
+import wave
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Union
 from io import BytesIO
 
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError
+
+try:
+    import av
+except ImportError:  # optional: audio is encoded by an ffmpeg subprocess instead
+    av = None
 
 from app.services.base import BaseService
 from app.config.settings import Settings
 from app.core.exceptions import TranscriptionError, ConfigurationError
 
 
+# 24 kbps Opus plus Ogg framing overhead
+_OPUS_BYTES_PER_SECOND = 3300
+
+
+@lru_cache(maxsize=256)
+def _probe_duration_cached(audio_path: str, mtime: float, size: int) -> float:
+    """Run ffprobe once per (path, mtime, size) and return the container duration"""
+    if audio_path.lower().endswith('.wav'):
+        # PCM WAV duration is plain header arithmetic, no subprocess needed
+        try:
+            with wave.open(audio_path, 'rb') as wav_file:
+                return wav_file.getnframes() / wav_file.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-print_format', 'json',
+        '-show_format', audio_path
+    ]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    return float(info['format']['duration'])
+
+
+def _encode_opus_with_pyav(video_path: str) -> bytes:
+    """Decode, resample to 16 kHz mono and encode Opus/Ogg in-process with PyAV
+    
+    Mirrors the ffmpeg pipe in extract_audio_to_buffer without spawning a process.
+    """
+    output = BytesIO()
+    with av.open(video_path) as source:
+        audio_stream = source.streams.audio[0]
+        resampler = av.AudioResampler(format='s16', layout='mono', rate=16000)
+        with av.open(output, 'w', format='ogg') as sink:
+            opus_stream = sink.add_stream('libopus', rate=16000)
+            opus_stream.layout = 'mono'
+            opus_stream.bit_rate = 24000
+            
+            def mux(frames):
+                for frame in frames:
+                    for packet in opus_stream.encode(frame):
+                        sink.mux(packet)
+            
+            for frame in source.decode(audio_stream):
+                mux(resampler.resample(frame))
+            # Flush the resampler, then the encoder
+            mux(resampler.resample(None))
+            mux([None])
+    return output.getvalue()
+
+
+def _shift_timestamps(items: Optional[List[Dict]], offset: float) -> None:
+    """Add a chunk offset to the start/end of each segment or word in place"""
+    if not items or not offset:
+        return
+    for item in items:
+        if item:
+            item['start'] += offset
+            item['end'] += offset
+
+
 class TranscriptionService(BaseService):
     """Service for handling audio transcription with OpenAI Whisper"""
     
-    def __init__(self, settings: Settings, openai_client: OpenAI):
+    def __init__(self, settings: Settings, openai_client: AsyncOpenAI):
         """Initialize transcription service
         
         Args:
             settings: Application settings
-            openai_client: OpenAI client
+            openai_client: Async OpenAI client
         """
         super().__init__(settings)
+        # _create_transcription owns the retry policy; stop the SDK retrying underneath it
+        if isinstance(openai_client, AsyncOpenAI):
+            openai_client = openai_client.with_options(max_retries=0)
         self.client = openai_client
+        self._semaphore: Optional[asyncio.Semaphore] = None
     
     def _ensure_client(self) -> None:
         """Ensure OpenAI client is available"""
         if self.client is None:
             raise TranscriptionError("OpenAI client not initialized. Check API key configuration.")
     
+    async def _create_transcription(self, audio: Union[str, BytesIO], word_timestamps: bool = True):
+        """Call Whisper with bounded concurrency, retrying rate limits and connection errors
+        
+        Args:
+            audio: Path to audio file, or named in-memory buffer, to upload
+            word_timestamps: Also request word-level timestamps
+        
+        Returns:
+            Whisper verbose_json transcription object
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.settings.max_concurrent_chunks)
+        
+        max_attempts = self.settings.transcription_max_retries + 1
+        async with self._semaphore:
+            for attempt in range(max_attempts):
+                try:
+                    if isinstance(audio, BytesIO):
+                        audio.seek(0)
+                        return await self._request_transcription(audio, word_timestamps)
+                    with open(audio, "rb") as audio_file:
+                        return await self._request_transcription(audio_file, word_timestamps)
+                except (RateLimitError, APIConnectionError) as e:
+                    if attempt == max_attempts - 1:
+                        raise
+                    delay = 2 ** attempt + random.random()
+                    self.logger.warning(f"Whisper request failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+    
+    async def _request_transcription(self, audio_file, word_timestamps: bool = True):
+        """Send a single verbose_json Whisper request for an open audio file
+        
+        Word timestamps inflate the response roughly tenfold, so callers that only
+        need segments can leave them out.
+        """
+        return await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file,
+            response_format="verbose_json",
+            timestamp_granularities=["word", "segment"] if word_timestamps else ["segment"]
+        )
+    
+    def extract_audio_to_buffer(self, video_path: str) -> BytesIO:
+        """Encode the video's audio track to Opus/Ogg in memory
+        
+        PyAV does this in-process when installed; otherwise, or if PyAV cannot
+        handle the file, ffmpeg writes the Ogg stream to its stdout.
+        
+        Args:
+            video_path: Path to video file
+        
+        Returns:
+            In-memory Ogg buffer named ``audio.ogg`` for upload
+        
+        Raises:
+            subprocess.CalledProcessError: If ffmpeg fails to encode the audio
+        """
+        if av is not None:
+            try:
+                audio_bytes = _encode_opus_with_pyav(video_path)
+            except Exception as e:
+                self.logger.debug(f"PyAV audio encoding failed, using ffmpeg: {e}")
+            else:
+                buffer = BytesIO(audio_bytes)
+                buffer.name = "audio.ogg"
+                self.logger.info(f"Audio encoded in memory: {self.format_file_size(len(audio_bytes))}")
+                return buffer
+        
+        cmd = [
+            'ffmpeg', '-i', video_path, '-vn',
+            '-ac', '1', '-ar', '16000',
+            '-c:a', 'libopus', '-b:a', '24k',
+            '-f', 'ogg', 'pipe:1'
+        ]
+        
+        proc = subprocess.run(cmd, capture_output=True, check=True)
+        buffer = BytesIO(proc.stdout)
+        buffer.name = "audio.ogg"
+        self.logger.info(f"Audio encoded in memory: {self.format_file_size(len(proc.stdout))}")
+        return buffer
+    
+    def _write_buffer(self, buffer: BytesIO, path: str) -> None:
+        """Write an in-memory buffer to disk (blocking; call through asyncio.to_thread)"""
+        with open(path, 'wb') as output_file:
+            output_file.write(buffer.getbuffer())
+    
     def extract_audio_from_video(self, video_path: str) -> str:
         """Extract audio from video for transcription
         
@@ -45,7 +207,7 @@ class TranscriptionService(BaseService):
             TranscriptionError: If audio extraction fails
         """
         try:
-            audio_filename = f"audio_{int(datetime.now().timestamp())}.wav"
+            audio_filename = f"audio_{uuid.uuid4().hex[:8]}.wav"
             audio_path = os.path.join(self.settings.temp_dir, audio_filename)
             
             # Extract audio with ffmpeg
@@ -76,26 +238,20 @@ class TranscriptionService(BaseService):
             Duration in seconds
         """
         try:
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', audio_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            info = json.loads(result.stdout)
-            
-            duration = float(info['format']['duration'])
-            return duration
+            stat = os.stat(audio_path)
+            return _probe_duration_cached(audio_path, stat.st_mtime, stat.st_size)
             
         except Exception as e:
             self.logger.error(f"Error getting audio duration: {e}")
             return 0.0
     
-    def split_audio_for_transcription(self, audio_path: str) -> List[Dict[str, float]]:
+    def split_audio_for_transcription(self, audio_path: str,
+                                      duration: Optional[float] = None) -> List[Dict[str, float]]:
         """Split large audio files into smaller chunks for transcription
         
         Args:
             audio_path: Path to audio file
+            duration: Audio duration in seconds if the caller already probed it
             
         Returns:
             List of chunk information with paths and offsets
@@ -105,10 +261,11 @@ class TranscriptionService(BaseService):
             max_size_bytes = self.settings.max_transcription_chunk_size
             
             if file_size <= max_size_bytes:
+                # Whole file goes in one request; duration is informational, so don't probe for it
                 return [{
                     'path': audio_path,
                     'start_offset': 0.0,
-                    'duration': self.get_audio_duration(audio_path)
+                    'duration': duration or 0.0
                 }]
             
             # Calculate number of chunks needed
@@ -116,36 +273,29 @@ class TranscriptionService(BaseService):
             num_chunks = math.ceil(file_size / max_size_bytes)
             self.logger.info(f"Audio file ({self.format_file_size(file_size)}) exceeds limit, splitting into {num_chunks} chunks")
             
-            # Get total duration to calculate chunk duration
-            total_duration = self.get_audio_duration(audio_path)
+            # Probe duration only when chunking needs it, reusing the caller's value when given
+            total_duration = duration if duration else self.get_audio_duration(audio_path)
             chunk_duration = total_duration / num_chunks
             
-            chunk_info = []
-            for i in range(num_chunks):
-                start_time = i * chunk_duration
-                end_time = min((i + 1) * chunk_duration, total_duration)
-                
-                chunk_filename = f"audio_chunk_{i}_{int(datetime.now().timestamp())}.wav"
-                chunk_path = os.path.join(self.settings.temp_dir, chunk_filename)
-                
-                # Extract audio chunk
-                cmd = [
-                    'ffmpeg', '-y', '-i', audio_path,
-                    '-ss', str(start_time), '-to', str(end_time),
-                    '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
-                    chunk_path
-                ]
-                
-                subprocess.run(cmd, capture_output=True, text=True, check=True)
-                
-                chunk_size = os.path.getsize(chunk_path)
-                self.logger.info(f"Created chunk {i+1}/{num_chunks}: {self.format_file_size(chunk_size)} ({self.format_timestamp(start_time)} - {self.format_timestamp(end_time)})")
-                
-                chunk_info.append({
-                    'path': chunk_path,
-                    'start_offset': start_time,
-                    'duration': end_time - start_time
-                })
+            job_id = uuid.uuid4().hex[:8]
+            try:
+                chunk_info = self._split_audio_with_segment_muxer(audio_path, chunk_duration, job_id)
+            except subprocess.CalledProcessError as e:
+                # Still one linear pass, re-encoding to the same 24 kbps Opus used for
+                # extraction; chunks are kept short enough to fit at that bitrate even
+                # when the source was smaller per second
+                self.logger.warning(f"Segment muxer could not stream-copy audio, re-encoding chunks: {e.stderr}")
+                chunk_info = self._split_audio_with_segment_muxer(
+                    audio_path, min(chunk_duration, max_size_bytes / _OPUS_BYTES_PER_SECOND), job_id,
+                    codec_args=['-ac', '1', '-ar', '16000', '-c:a', 'libopus', '-b:a', '24k'],
+                    extension='.ogg'
+                )
+            
+            for i, chunk_data in enumerate(chunk_info):
+                start_time = chunk_data['start_offset']
+                end_time = start_time + chunk_data['duration']
+                chunk_size = os.path.getsize(chunk_data['path'])
+                self.logger.info(f"Created chunk {i+1}/{len(chunk_info)}: {self.format_file_size(chunk_size)} ({self.format_timestamp(start_time)} - {self.format_timestamp(end_time)})")
             
             return chunk_info
             
@@ -153,13 +303,77 @@ class TranscriptionService(BaseService):
             self.logger.error(f"Error splitting audio: {e}")
             raise TranscriptionError(f"Failed to split audio: {e}")
     
-    def transcribe_chunk_sync(self, chunk_path: str, chunk_index: int, start_offset: float) -> Dict:
-        """Synchronous transcription of a single chunk for parallel processing
+    def _split_audio_with_segment_muxer(self, audio_path: str, chunk_duration: float,
+                                        job_id: str, codec_args: Optional[List[str]] = None,
+                                        extension: Optional[str] = None) -> List[Dict[str, float]]:
+        """Split audio into chunks with a single ffmpeg segment muxer pass
+        
+        The source is read once, linearly. Chunk offsets come from the muxer's
+        segment list, so they match where the cuts actually landed on packet
+        boundaries rather than the requested chunk_duration multiples.
+        
+        Args:
+            audio_path: Path to audio file
+            chunk_duration: Target duration of each chunk in seconds
+            job_id: Unique per-split identifier used to name the chunk files
+            codec_args: Output codec options; stream copy when omitted
+            extension: Chunk file extension; the source's when omitted
+        
+        Returns:
+            List of chunk information with paths and offsets
+        """
+        extension = extension or os.path.splitext(audio_path)[1] or '.wav'
+        chunk_prefix = os.path.join(self.settings.temp_dir, f"audio_chunk_{job_id}_")
+        segment_list = f"{chunk_prefix}list.csv"
+        
+        cmd = ['ffmpeg', '-y', '-i', audio_path, '-vn']
+        cmd.extend(codec_args or ['-c', 'copy'])
+        cmd.extend([
+            '-f', 'segment', '-segment_time', str(chunk_duration),
+            '-segment_list', segment_list, '-segment_list_type', 'csv',
+            '-reset_timestamps', '1',
+            f"{chunk_prefix}%03d{extension}"
+        ])
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            with open(segment_list, newline='') as list_file:
+                segments = list(csv.reader(list_file))
+        except subprocess.CalledProcessError:
+            # Don't leave chunks from a partial pass behind for the caller's retry
+            for partial_chunk in glob.glob(f"{glob.escape(chunk_prefix)}[0-9][0-9][0-9]{extension}"):
+                os.remove(partial_chunk)
+            raise
+        finally:
+            if os.path.exists(segment_list):
+                os.remove(segment_list)
+        
+        chunk_info = []
+        for i, (chunk_name, start_time, end_time) in enumerate(segments):
+            chunk_path = os.path.join(self.settings.temp_dir, chunk_name)
+            start_time, end_time = float(start_time), float(end_time)
+            if i and end_time - start_time < 0.1:
+                # Packet boundaries can leave a near-empty trailing segment; nothing to transcribe
+                os.remove(chunk_path)
+                continue
+            chunk_info.append({
+                'path': chunk_path,
+                'start_offset': start_time,
+                'duration': end_time - start_time
+            })
+        
+        if not chunk_info:
+            raise TranscriptionError("Segment muxer produced no audio chunks")
+        return chunk_info
+    
+    async def transcribe_chunk(self, chunk_path: str, chunk_index: int, start_offset: float,
+                               word_timestamps: bool = True) -> Dict:
+        """Transcribe a single chunk for parallel processing
         
         Args:
             chunk_path: Path to audio chunk
             chunk_index: Index of the chunk
             start_offset: Time offset for timestamps
+            word_timestamps: Also request word-level timestamps
             
         Returns:
             Transcription result with adjusted timestamps
@@ -167,13 +381,7 @@ class TranscriptionService(BaseService):
         try:
             self.logger.info(f"Transcribing chunk {chunk_index + 1}...")
             
-            with open(chunk_path, "rb") as audio_file:
-                chunk_transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="verbose_json",
-                    timestamp_granularities=["word"]
-                )
+            chunk_transcript = await self._create_transcription(chunk_path, word_timestamps)
             
             chunk_data_dict = chunk_transcript.model_dump()
             
@@ -189,18 +397,9 @@ class TranscriptionService(BaseService):
             
             # Adjust timestamps by adding chunk start offset
             segments = chunk_data_dict.get('segments', [])
-            if segments:
-                for segment in segments:
-                    if segment:
-                        segment['start'] += start_offset
-                        segment['end'] += start_offset
-            
             words = chunk_data_dict.get('words', [])
-            if words:
-                for word in words:
-                    if word:
-                        word['start'] += start_offset
-                        word['end'] += start_offset
+            _shift_timestamps(segments, start_offset)
+            _shift_timestamps(words, start_offset)
             
             result = {
                 'chunk_index': chunk_index,
@@ -224,51 +423,46 @@ class TranscriptionService(BaseService):
                 'error': str(chunk_error)
             }
     
-    async def transcribe_chunks_parallel(self, chunk_info: List[Dict]) -> List[Dict]:
+    async def transcribe_chunks_parallel(self, chunk_info: List[Dict],
+                                         word_timestamps: bool = True) -> List[Dict]:
         """Transcribe multiple audio chunks in parallel
         
         Args:
             chunk_info: List of chunk information
+            word_timestamps: Also request word-level timestamps
             
         Returns:
             List of successful transcription results
         """
         self.logger.info(f"Starting parallel transcription of {len(chunk_info)} chunks...")
         
-        loop = asyncio.get_event_loop()
-        max_workers = min(self.settings.max_concurrent_chunks, len(chunk_info))
+        tasks = [
+            self.transcribe_chunk(chunk_data['path'], i, chunk_data['start_offset'], word_timestamps)
+            for i, chunk_data in enumerate(chunk_info)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for i, chunk_data in enumerate(chunk_info):
-                future = loop.run_in_executor(
-                    executor,
-                    self.transcribe_chunk_sync,
-                    chunk_data['path'],
-                    i,
-                    chunk_data['start_offset']
-                )
-                futures.append(future)
-            
-            results = await asyncio.gather(*futures, return_exceptions=True)
-            
-            successful_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    self.logger.error(f"Chunk {i + 1} failed with exception: {result}")
-                elif result and result.get('success', False):
-                    successful_results.append(result)
-                else:
-                    self.logger.warning(f"Chunk {i + 1} returned empty or failed result")
-            
-            self.logger.info(f"Parallel transcription completed: {len(successful_results)}/{len(chunk_info)} chunks successful")
-            return successful_results
+        successful_results = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Chunk {i + 1} failed with exception: {result}")
+            elif result and result.get('success', False):
+                successful_results.append(result)
+            else:
+                self.logger.warning(f"Chunk {i + 1} returned empty or failed result")
+        
+        self.logger.info(f"Parallel transcription completed: {len(successful_results)}/{len(chunk_info)} chunks successful")
+        return successful_results
     
-    async def transcribe_audio_with_timestamps(self, audio_path: str) -> Dict:
+    async def transcribe_audio_with_timestamps(self, audio_path: str,
+                                               duration: Optional[float] = None,
+                                               word_timestamps: bool = True) -> Dict:
         """Transcribe audio with word-level timestamps, handling large files by chunking
         
         Args:
             audio_path: Path to audio file
+            duration: Audio duration in seconds if the caller already probed it
+            word_timestamps: Also request word-level timestamps; segments are always included
             
         Returns:
             Complete transcription with timestamps
@@ -280,17 +474,11 @@ class TranscriptionService(BaseService):
             self._ensure_client()
             
             # Split audio if necessary
-            chunk_info = self.split_audio_for_transcription(audio_path)
+            chunk_info = await asyncio.to_thread(self.split_audio_for_transcription, audio_path, duration)
             
             if len(chunk_info) == 1:
                 # Single file transcription
-                with open(chunk_info[0]['path'], "rb") as audio_file:
-                    transcript = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="verbose_json",
-                        timestamp_granularities=["word"]
-                    )
+                transcript = await self._create_transcription(chunk_info[0]['path'], word_timestamps)
                 
                 result = transcript.model_dump()
                 self.logger.info("Single-file transcription completed")
@@ -298,38 +486,20 @@ class TranscriptionService(BaseService):
             
             else:
                 # Multi-chunk transcription
-                chunk_results = await self.transcribe_chunks_parallel(chunk_info)
+                chunk_results = await self.transcribe_chunks_parallel(chunk_info, word_timestamps)
                 
                 if not chunk_results:
                     raise TranscriptionError("All audio chunks failed to transcribe")
                 
                 # Merge results
-                all_segments = []
-                all_words = []
-                full_text = ""
-                
                 chunk_results.sort(key=lambda x: x.get('chunk_index', 0))
                 
-                for result in chunk_results:
-                    all_segments.extend(result.get('segments', []))
-                    all_words.extend(result.get('words', []))
-                    
-                    chunk_text = result.get('text', '')
-                    if chunk_text:
-                        if full_text:
-                            full_text += " " + chunk_text
-                        else:
-                            full_text = chunk_text
+                all_segments = list(chain.from_iterable(r.get('segments', []) for r in chunk_results))
+                all_words = list(chain.from_iterable(r.get('words', []) for r in chunk_results))
+                full_text = " ".join(r['text'] for r in chunk_results if r.get('text'))
                 
-                # Clean up chunk files
-                for chunk_data in chunk_info:
-                    chunk_path = chunk_data['path']
-                    if chunk_path != audio_path and os.path.exists(chunk_path):
-                        try:
-                            os.remove(chunk_path)
-                            self.logger.debug(f"Cleaned up audio chunk: {chunk_path}")
-                        except OSError:
-                            pass
+                # Clean up chunk files; a multi-chunk split never reuses audio_path itself
+                await self.cleanup_temp_files_async([chunk_data['path'] for chunk_data in chunk_info])
                 
                 merged_transcript = {
                     'text': full_text,
@@ -345,11 +515,14 @@ class TranscriptionService(BaseService):
             self.logger.error(f"Error transcribing audio: {e}")
             raise TranscriptionError(f"Failed to transcribe audio: {e}")
     
-    async def transcribe_video(self, video_path: str) -> Dict:
+    async def transcribe_video(self, video_path: str, duration: Optional[float] = None,
+                               word_timestamps: bool = True) -> Dict:
         """Complete video transcription workflow
         
         Args:
             video_path: Path to video file
+            duration: Video duration in seconds if the caller already probed it
+            word_timestamps: Also request word-level timestamps; segments are always included
             
         Returns:
             Transcription result with timestamps
@@ -357,21 +530,40 @@ class TranscriptionService(BaseService):
         temp_files = []
         
         try:
-            # Extract audio
-            audio_path = self.extract_audio_from_video(video_path)
+            self._ensure_client()
+            
+            # Stream compressed audio straight to Whisper when it fits in one request.
+            # ffmpeg runs in a worker thread so the event loop keeps serving requests
+            try:
+                audio_buffer = await asyncio.to_thread(self.extract_audio_to_buffer, video_path)
+            except subprocess.CalledProcessError as e:
+                self.logger.warning(f"In-memory audio encoding failed, falling back to WAV: {e.stderr.decode(errors='replace')}")
+                audio_buffer = None
+            
+            if audio_buffer is not None and audio_buffer.getbuffer().nbytes <= self.settings.max_transcription_chunk_size:
+                try:
+                    transcript = await self._create_transcription(audio_buffer, word_timestamps)
+                except Exception as e:
+                    self.logger.error(f"Error transcribing audio: {e}")
+                    raise TranscriptionError(f"Failed to transcribe audio: {e}")
+                self.logger.info("In-memory transcription completed")
+                return transcript.model_dump()
+            
+            if audio_buffer is not None:
+                # Too big for one request: chunk the Opus stream itself, the segment
+                # muxer stream-copies it, so there is no second encode to WAV
+                audio_path = os.path.join(self.settings.temp_dir, f"audio_{uuid.uuid4().hex[:8]}.ogg")
+                await asyncio.to_thread(self._write_buffer, audio_buffer, audio_path)
+            else:
+                # Extract audio to disk and chunk it
+                audio_path = await asyncio.to_thread(self.extract_audio_from_video, video_path)
             temp_files.append(audio_path)
             
             # Transcribe
-            result = await self.transcribe_audio_with_timestamps(audio_path)
+            result = await self.transcribe_audio_with_timestamps(audio_path, duration, word_timestamps)
             
             return result
             
         finally:
             # Clean up temporary files
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    try:
-                        os.remove(temp_file)
-                        self.logger.debug(f"Cleaned up temp file: {temp_file}")
-                    except OSError as e:
-                        self.logger.warning(f"Could not clean up temp file {temp_file}: {e}") 
\ No newline at end of file
+            await self.cleanup_temp_files_async(temp_files)
\ No newline at end of file
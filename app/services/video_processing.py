@@ -1,16 +1,202 @@
 import os
+import re
+import asyncio
 import subprocess
 import json
+from bisect import bisect_right
 from datetime import datetime
-from typing import Dict, Optional, Union
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
+import aiofiles
 from fastapi import UploadFile
 
+try:
+    import av
+except ImportError:  # optional: ffprobe is used instead
+    av = None
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
 from app.services.base import BaseService
 from app.config.settings import Settings
 from app.core.exceptions import VideoProcessingError, StorageError
 
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_SPACES_RE = re.compile(r'[-\s]+')
+
+# Aspect ratio -> (ratio width, ratio height, output width, output height)
+_ASPECT_RATIO_TABLE = {
+    "9:16": (9, 16, 1080, 1920),
+    "16:9": (16, 9, 1920, 1080),
+    "1:1": (1, 1, 1080, 1080),
+}
+
+# Codecs that can be stream-copied into an .mp4 and play back everywhere
+_MP4_COPY_VIDEO_CODECS = ('h264',)
+_MP4_COPY_AUDIO_CODECS = ('aac', 'mp3')
+
+# Hardware H.264 encoders in order of preference
+_HARDWARE_ENCODERS = ('h264_nvenc', 'h264_videotoolbox', 'h264_qsv')
+
+
+@lru_cache(maxsize=1)
+def _list_encoders() -> str:
+    """Return ffmpeg's encoder listing, queried once per process"""
+    try:
+        return subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+@lru_cache(maxsize=None)
+def _encoder_works(encoder: str) -> bool:
+    """Check once per process that ffmpeg can actually open an encoder
+    
+    Static ffmpeg builds list NVENC/QSV even without the hardware, so a
+    tiny test encode is needed rather than just parsing ``-encoders``.
+    """
+    if f" {encoder} " not in _list_encoders():
+        return False
+    try:
+        subprocess.run(
+            ['ffmpeg', '-hide_banner', '-v', 'error', '-f', 'lavfi',
+             '-i', 'color=s=256x256:d=0.1', '-c:v', encoder, '-f', 'null', '-'],
+            capture_output=True, check=True, timeout=15
+        )
+        return True
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def _probe_with_pyav(video_path: str) -> Dict:
+    """Read container metadata in-process with PyAV, shaped like ffprobe's JSON
+    
+    Only headers are parsed, so this costs milliseconds instead of a process spawn.
+    """
+    with av.open(video_path) as container:
+        streams = []
+        for stream in container.streams:
+            # The canonical name matches ffprobe's codec_name; codec_context.name is the
+            # decoder, which differs for e.g. mp3 (mp3float) or AV1 (libdav1d)
+            entry = {'codec_type': stream.type, 'codec_name': stream.codec_context.codec.canonical_name}
+            if stream.type == 'video':
+                entry['width'] = stream.codec_context.width
+                entry['height'] = stream.codec_context.height
+                rate = getattr(stream, 'base_rate', None) or stream.average_rate
+                if rate:
+                    entry['r_frame_rate'] = f"{rate.numerator}/{rate.denominator}"
+            streams.append(entry)
+        
+        format_info = {'size': os.path.getsize(video_path)}
+        if container.duration is not None:
+            format_info['duration'] = container.duration / av.time_base
+        if container.bit_rate:
+            format_info['bit_rate'] = container.bit_rate
+    return {'streams': streams, 'format': format_info}
+
+
+@lru_cache(maxsize=256)
+def _probe_cached(video_path: str, mtime: float, size: int) -> Dict:
+    """Probe once per (path, mtime, size); callers must not mutate the result
+    
+    Uses PyAV when installed and falls back to ffprobe for anything it cannot open.
+    """
+    if av is not None:
+        try:
+            return _probe_with_pyav(video_path)
+        except Exception:
+            pass
+    
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-print_format', 'json',
+        '-show_format', '-show_streams', video_path
+    ]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    if orjson is not None:
+        return orjson.loads(result.stdout)
+    return json.loads(result.stdout)
+
+
+def _keyframes_with_pyav(video_path: str) -> List[float]:
+    """List video keyframe times in-process with PyAV by demuxing packets, no decoding"""
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        return [
+            float(packet.pts * stream.time_base)
+            for packet in container.demux(stream)
+            if packet.is_keyframe and packet.pts is not None
+        ]
+
+
+@lru_cache(maxsize=32)
+def _keyframes_cached(video_path: str, mtime: float, size: int) -> Tuple[float, ...]:
+    """Read the sorted keyframe times once per (path, mtime, size)
+    
+    Uses PyAV when installed and falls back to ffprobe's packet listing, which
+    also only demuxes.
+    """
+    if av is not None:
+        try:
+            return tuple(sorted(_keyframes_with_pyav(video_path)))
+        except Exception:
+            pass
+    
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path
+    ]
+    
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    return tuple(sorted(keyframes))
+
+
+@lru_cache(maxsize=None)
+def _aspect_filter(target_aspect_ratio: str) -> str:
+    """Build the crop/scale filter for an aspect ratio once per process
+    
+    The filter only depends on the ratio (source dimensions are resolved by
+    FFmpeg at runtime), so every clip of every video shares the same string.
+    """
+    if target_aspect_ratio == "original":
+        return "scale=trunc(iw/2)*2:trunc(ih/2)*2:flags=bilinear"  # Ensure even dimensions
+    
+    # Parse target aspect ratio
+    try:
+        ratio_w, ratio_h, target_width, target_height = _ASPECT_RATIO_TABLE[target_aspect_ratio]
+    except KeyError:
+        raise VideoProcessingError(f"Unsupported aspect ratio: {target_aspect_ratio}")
+    
+    # Center crop to the largest target-ratio window, then scale
+    crop_filter = (
+        f"crop='min(iw,ih*{ratio_w}/{ratio_h})':'min(ih,iw*{ratio_h}/{ratio_w})'"
+    )
+    return f"{crop_filter},scale={target_width}:{target_height}:flags=bilinear,setsar=1"
+
+
+def _parse_rate(rate: str) -> float:
+    """Parse an ffprobe rational such as '30000/1001' into a float (0.0 if invalid)"""
+    try:
+        numerator, _, denominator = rate.partition('/')
+        num = int(numerator)
+        den = int(denominator) if denominator else 1
+        return num / den if den else 0.0
+    except (ValueError, AttributeError):
+        return 0.0
+
 
 class VideoProcessingService(BaseService):
     """Service for handling video processing operations"""
@@ -22,6 +208,60 @@ class VideoProcessingService(BaseService):
             settings: Application settings
         """
         super().__init__(settings)
+        self.video_encoder = self._select_video_encoder()
+    
+    def _select_video_encoder(self) -> str:
+        """Pick the configured H.264 encoder, preferring working hardware in auto mode
+        
+        Returns:
+            FFmpeg encoder name
+        """
+        configured = self.settings.video_encoder
+        if configured != "auto":
+            return configured
+        
+        for encoder in _HARDWARE_ENCODERS:
+            if _encoder_works(encoder):
+                self.logger.info(f"Using hardware video encoder: {encoder}")
+                return encoder
+        return 'libx264'
+    
+    def _video_encoder_args(self) -> List[str]:
+        """Build encoder and rate control options for the selected encoder
+        
+        Returns:
+            FFmpeg video codec arguments
+        """
+        crf = str(self.settings.video_quality_crf)
+        if self.video_encoder == 'h264_nvenc':
+            return ['-c:v', 'h264_nvenc', '-preset', 'p4', '-rc', 'vbr', '-cq', crf, '-b:v', '0']
+        if self.video_encoder == 'h264_qsv':
+            return ['-c:v', 'h264_qsv', '-global_quality', crf]
+        if self.video_encoder == 'h264_videotoolbox':
+            return ['-c:v', 'h264_videotoolbox', '-b:v', '6M', '-allow_sw', '1']
+        return [
+            '-c:v', self.video_encoder, '-preset', self.settings.ffmpeg_preset, '-crf', crf,
+            '-threads', str(self.settings.ffmpeg_threads_per_encode)
+        ]
+    
+    def _input_args(self, video_path: str, seek_to: float = 0.0) -> List[str]:
+        """Build the FFmpeg input options, decoding on the GPU alongside hardware encoders
+        
+        Args:
+            video_path: Path to source video
+            seek_to: Input seek position in seconds; ffmpeg jumps to the preceding
+                keyframe and, when transcoding, decodes accurately from there
+        
+        Returns:
+            FFmpeg arguments ending with the input path
+        """
+        args = ['-y']
+        if self.video_encoder in _HARDWARE_ENCODERS:
+            args.extend(['-hwaccel', 'auto'])
+        if seek_to > 0:
+            args.extend(['-ss', str(seek_to)])
+        args.extend(['-i', video_path])
+        return args
     
     async def save_upload_file(self, upload_file: UploadFile) -> str:
         """Save uploaded file to temp directory
@@ -46,21 +286,53 @@ class VideoProcessingService(BaseService):
             timestamp = int(datetime.now().timestamp())
             temp_file_path = os.path.join(self.settings.temp_dir, f"upload_{timestamp}{file_extension}")
             
-            # Check file size
-            content = await upload_file.read()
-            if len(content) > self.settings.max_file_size:
-                raise StorageError(f"File size ({self.format_file_size(len(content))}) exceeds maximum allowed size ({self.format_file_size(self.settings.max_file_size)})")
-            
-            with open(temp_file_path, 'wb') as temp_file:
-                temp_file.write(content)
-            
-            self.logger.info(f"File saved to: {temp_file_path}, size: {self.format_file_size(len(content))}")
+            total_size = 0
+            try:
+                source = self._upload_source(upload_file)
+                if source is not None:
+                    # Spooled upload: bulk copy off the event loop
+                    total_size = await asyncio.to_thread(self._copy_upload_file, source, temp_file_path)
+                else:
+                    # Stream to disk in 1MB chunks, aborting as soon as the size limit is exceeded
+                    async with aiofiles.open(temp_file_path, 'wb') as temp_file:
+                        while chunk := await upload_file.read(1 << 20):
+                            total_size += len(chunk)
+                            if total_size > self.settings.max_file_size:
+                                raise StorageError(f"File size exceeds maximum allowed size ({self.format_file_size(self.settings.max_file_size)})")
+                            await temp_file.write(chunk)
+            except Exception:
+                if os.path.exists(temp_file_path):
+                    os.remove(temp_file_path)
+                raise
+            
+            self.logger.info(f"File saved to: {temp_file_path}, size: {self.format_file_size(total_size)}")
             return temp_file_path
             
         except Exception as e:
             self.logger.error(f"Error saving upload file: {e}")
             raise StorageError(f"Failed to save uploaded file: {e}")
     
+    def _copy_upload_file(self, source, destination_path: str) -> int:
+        """Enforce the upload size limit, then copy a spooled upload to disk
+        
+        Args:
+            source: File object backing the upload
+            destination_path: Path to write the upload to
+        
+        Returns:
+            Number of bytes written
+        
+        Raises:
+            StorageError: If the upload exceeds the maximum file size
+        """
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+        if size > self.settings.max_file_size:
+            raise StorageError(f"File size ({self.format_file_size(size)}) exceeds maximum allowed size ({self.format_file_size(self.settings.max_file_size)})")
+        
+        return self._copy_file_object(source, destination_path)
+    
     def get_video_info(self, video_path: str) -> Dict:
         """Get video information using ffprobe
         
@@ -74,13 +346,12 @@ class VideoProcessingService(BaseService):
             VideoProcessingError: If video info extraction fails
         """
         try:
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', '-show_streams', video_path
-            ]
+            try:
+                stat = os.stat(video_path)
+            except FileNotFoundError:
+                raise VideoProcessingError(f"Video file not found: {video_path}")
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            info = json.loads(result.stdout)
+            info = _probe_cached(video_path, stat.st_mtime, stat.st_size)
             
             video_stream = None
             audio_stream = None
@@ -103,10 +374,11 @@ class VideoProcessingService(BaseService):
                 'width': width,
                 'height': height,
                 'aspect_ratio': width / height if height > 0 else 16/9,
-                'fps': eval(video_stream.get('r_frame_rate', '30/1')),
+                'fps': _parse_rate(video_stream.get('r_frame_rate', '30/1')),
                 'codec': video_stream.get('codec_name', 'unknown'),
                 'bitrate': int(info.get('format', {}).get('bit_rate', 0)),
                 'has_audio': audio_stream is not None,
+                'audio_codec': audio_stream.get('codec_name', 'unknown') if audio_stream else None,
                 'file_size': int(info.get('format', {}).get('size', 0))
             }
             
@@ -116,6 +388,8 @@ class VideoProcessingService(BaseService):
         except subprocess.CalledProcessError as e:
             self.logger.error(f"FFprobe error: {e.stderr}")
             raise VideoProcessingError(f"Failed to get video info: {e.stderr}")
+        except VideoProcessingError:
+            raise
         except Exception as e:
             self.logger.error(f"Error getting video info: {e}")
             raise VideoProcessingError(f"Failed to get video info: {e}")
@@ -143,56 +417,162 @@ class VideoProcessingService(BaseService):
             self.logger.warning(f"Could not parse time string: {time_str}")
             return 0.0
     
-    def calculate_crop_filter(self, video_info: Dict, target_aspect_ratio: str) -> str:
+    def calculate_crop_filter(self, target_aspect_ratio: str) -> str:
         """Calculate FFmpeg filter for aspect ratio conversion
         
+        The crop is expressed in terms of ``iw``/``ih`` so FFmpeg resolves the
+        source dimensions at runtime and no ffprobe call is needed.
+        
         Args:
-            video_info: Video metadata
             target_aspect_ratio: Target aspect ratio (e.g., "9:16", "16:9", "1:1")
             
         Returns:
             FFmpeg filter string
         """
-        if target_aspect_ratio == "original":
-            return "scale=trunc(iw/2)*2:trunc(ih/2)*2"  # Ensure even dimensions
-        
-        # Parse target aspect ratio
-        if target_aspect_ratio == "9:16":
-            target_ratio = 9/16
-            target_width, target_height = 1080, 1920
-        elif target_aspect_ratio == "16:9":
-            target_ratio = 16/9
-            target_width, target_height = 1920, 1080
-        elif target_aspect_ratio == "1:1":
-            target_ratio = 1.0
-            target_width, target_height = 1080, 1080
-        else:
-            raise VideoProcessingError(f"Unsupported aspect ratio: {target_aspect_ratio}")
-        
-        current_ratio = video_info['aspect_ratio']
-        width = video_info['width']
-        height = video_info['height']
-        
-        if abs(current_ratio - target_ratio) < 0.01:
-            # Already correct ratio, just scale
-            return f"scale={target_width}:{target_height}"
-        
-        if current_ratio > target_ratio:
-            # Video is wider, crop sides
-            new_width = int(height * target_ratio)
-            x_offset = (width - new_width) // 2
-            crop_filter = f"crop={new_width}:{height}:{x_offset}:0"
-        else:
-            # Video is taller, crop top/bottom
-            new_height = int(width / target_ratio)
-            y_offset = (height - new_height) // 2
-            crop_filter = f"crop={width}:{new_height}:0:{y_offset}"
-        
-        # Combine crop and scale
-        return f"{crop_filter},scale={target_width}:{target_height}"
+        return _aspect_filter(target_aspect_ratio)
+    
+    def _validate_clip_duration(self, start_time: float, end_time: float) -> None:
+        """Raise if a clip is outside the configured duration bounds
+        
+        Raises:
+            VideoProcessingError: If the clip is too short or too long
+        """
+        clip_duration = end_time - start_time
+        if clip_duration < self.settings.min_clip_duration:
+            raise VideoProcessingError(f"Clip duration ({clip_duration:.1f}s) is below minimum ({self.settings.min_clip_duration}s)")
+        
+        if clip_duration > self.settings.max_clip_duration:
+            raise VideoProcessingError(f"Clip duration ({clip_duration:.1f}s) exceeds maximum ({self.settings.max_clip_duration}s)")
+    
+    def _clip_output_args(self, start_time: float, end_time: float,
+                          output_path: str, aspect_ratio: str,
+                          input_offset: float = 0.0) -> List[str]:
+        """Build the FFmpeg output options for a single clip
+        
+        Args:
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            output_path: Path for output clip
+            aspect_ratio: Target aspect ratio
+            input_offset: Position the input was already seeked to
+        
+        Returns:
+            FFmpeg arguments ending with the output path
+        """
+        # Set time range relative to the input seek point
+        args = []
+        if start_time > input_offset:
+            args.extend(['-ss', str(start_time - input_offset)])
+        args.extend(['-to', str(end_time - input_offset)])
+        
+        # Add video filter for aspect ratio (original is only re-encoded when its
+        # dimensions need evening out for 4:2:0)
+        args.extend(['-vf', self.calculate_crop_filter(aspect_ratio)])
+        
+        # First video stream plus audio if the source has any
+        args.extend(['-map', '0:v:0', '-map', '0:a:0?'])
+        
+        # Video encoding settings; 8-bit 4:2:0 keeps every source on the widely
+        # playable High profile and converts at most once, at the end of the graph
+        args.extend(self._video_encoder_args())
+        args.extend(['-pix_fmt', 'yuv420p'])
+        
+        # Audio encoding settings (ignored when no audio stream is mapped)
+        args.extend(['-c:a', 'aac', '-b:a', '128k'])
+        
+        # Index up front so served clips can start playing before they are fully fetched
+        args.extend(['-movflags', '+faststart'])
+        
+        args.append(output_path)
+        return args
+    
+    def _keyframe_shift(self, video_path: str, start_time: float) -> Optional[float]:
+        """Measure how far a stream copy starting at start_time would be pulled back
+        
+        A stream copy can only begin on a keyframe, so the cut snaps down to the
+        last keyframe at or before start_time.
+        
+        Args:
+            video_path: Path to source video
+            start_time: Requested clip start in seconds
+        
+        Returns:
+            Seconds between the preceding keyframe and start_time, or None if the
+            keyframes could not be read
+        """
+        try:
+            stat = os.stat(video_path)
+            keyframes = _keyframes_cached(video_path, stat.st_mtime, stat.st_size)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+        
+        if not keyframes:
+            return None
+        
+        # Small tolerance for keyframes whose pts rounds just past the requested time
+        index = bisect_right(keyframes, start_time + 1e-3)
+        if index == 0:
+            return None
+        return max(0.0, start_time - keyframes[index - 1])
+    
+    def _can_stream_copy(self, video_path: str, aspect_ratio: str,
+                         video_info: Optional[Dict] = None,
+                         start_time: Optional[float] = None) -> bool:
+        """Check whether a clip can be cut without re-encoding
+        
+        Only H.264 video with AAC, MP3 or no audio is copied, since the clips are
+        .mp4 files and sources such as .mkv/.webm/.avi may carry codecs that the
+        container rejects or players cannot decode. Within that,
+        "original" clips of sources with even dimensions qualify, since the only
+        filter they would get is the mod-2 scale. So do clips whose source already
+        has the target aspect ratio at no more than the target resolution, where
+        the crop is a no-op and the scale could only upsample. When start_time is given,
+        the clip must also start within stream_copy_max_keyframe_shift seconds
+        of a keyframe, otherwise the copy would begin noticeably early.
+        
+        Args:
+            video_path: Path to source video
+            aspect_ratio: Target aspect ratio
+            video_info: Already probed video metadata, if available
+            start_time: Clip start in seconds, checked against the keyframes
+        
+        Returns:
+            True if the clip can be stream-copied
+        """
+        if aspect_ratio != "original" and aspect_ratio not in _ASPECT_RATIO_TABLE:
+            return False
+        
+        if video_info is None:
+            try:
+                video_info = self.get_video_info(video_path)
+            except VideoProcessingError:
+                return False
+        
+        if video_info.get('codec') not in _MP4_COPY_VIDEO_CODECS:
+            return False
+        if video_info.get('has_audio') and video_info.get('audio_codec') not in _MP4_COPY_AUDIO_CODECS:
+            return False
+        
+        width, height = video_info['width'], video_info['height']
+        if width % 2 or height % 2:
+            return False
+        
+        if aspect_ratio != "original":
+            ratio_w, ratio_h, target_width, target_height = _ASPECT_RATIO_TABLE[aspect_ratio]
+            if width * ratio_h != height * ratio_w or width > target_width:
+                return False
+        
+        if start_time is not None:
+            shift = self._keyframe_shift(video_path, start_time)
+            if shift is not None and shift > self.settings.stream_copy_max_keyframe_shift:
+                self.logger.debug(f"Nearest keyframe is {shift:.2f}s before {start_time}s, re-encoding")
+                return False
+        
+        return True
     
     def create_video_clip(self, video_path: str, start_time: float, end_time: float, 
-                         output_path: str, aspect_ratio: str = "9:16") -> str:
+                         output_path: str, aspect_ratio: str = "9:16",
+                         video_info: Optional[Dict] = None) -> str:
         """Create a video clip with specified parameters
         
         Args:
@@ -201,6 +581,7 @@ class VideoProcessingService(BaseService):
             end_time: End time in seconds
             output_path: Path for output clip
             aspect_ratio: Target aspect ratio
+            video_info: Already probed video metadata, used to detect stream-copy clips
             
         Returns:
             Path to created clip
@@ -209,42 +590,20 @@ class VideoProcessingService(BaseService):
             VideoProcessingError: If clip creation fails
         """
         try:
-            # Validate clip duration
-            clip_duration = end_time - start_time
-            if clip_duration < self.settings.min_clip_duration:
-                raise VideoProcessingError(f"Clip duration ({clip_duration:.1f}s) is below minimum ({self.settings.min_clip_duration}s)")
-            
-            if clip_duration > self.settings.max_clip_duration:
-                raise VideoProcessingError(f"Clip duration ({clip_duration:.1f}s) exceeds maximum ({self.settings.max_clip_duration}s)")
-            
-            # Get video info for filter calculation
-            video_info = self.get_video_info(video_path)
+            self._validate_clip_duration(start_time, end_time)
             
             # Build FFmpeg command
-            cmd = ['ffmpeg', '-y', '-i', video_path]
-            
-            # Set time range
-            cmd.extend(['-ss', str(start_time), '-to', str(end_time)])
-            
-            # Add video filter for aspect ratio
-            if aspect_ratio != "original":
-                video_filter = self.calculate_crop_filter(video_info, aspect_ratio)
-                cmd.extend(['-vf', video_filter])
-            
-            # Video encoding settings
-            cmd.extend([
-                '-c:v', 'libx264',
-                '-preset', self.settings.ffmpeg_preset,
-                '-crf', str(self.settings.video_quality_crf)
-            ])
-            
-            # Audio encoding settings
-            if video_info.get('has_audio', False):
-                cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+            if self._can_stream_copy(video_path, aspect_ratio, video_info, start_time):
+                # Fast input seek and stream copy, no decode or encode
+                cmd = [
+                    'ffmpeg', '-y', '-ss', str(start_time), '-to', str(end_time),
+                    '-i', video_path, '-map', '0:v:0', '-map', '0:a:0?',
+                    '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+                    '-movflags', '+faststart', output_path
+                ]
             else:
-                cmd.extend(['-an'])  # No audio
-            
-            cmd.append(output_path)
+                cmd = ['ffmpeg'] + self._input_args(video_path, seek_to=start_time)
+                cmd.extend(self._clip_output_args(start_time, end_time, output_path, aspect_ratio, start_time))
             
             self.logger.info(f"Creating clip: {self.format_timestamp(start_time)} - {self.format_timestamp(end_time)} ({aspect_ratio})")
             
@@ -266,6 +625,177 @@ class VideoProcessingService(BaseService):
             self.logger.error(f"Error creating clip: {e}")
             raise VideoProcessingError(f"Failed to create clip: {e}")
     
+    def create_video_clips_batch(self, video_path: str, specs: List[Dict],
+                                 video_info: Optional[Dict] = None) -> List[str]:
+        """Create several clips from one source with a single FFmpeg invocation
+        
+        The source is opened and demuxed once; each clip is a separate output
+        with its own time range and filter. Clips that can be stream-copied are
+        cut together in a second invocation, each from its own fast-seeked input.
+        
+        Args:
+            video_path: Path to source video
+            specs: Clip specs with 'start_time', 'end_time', 'output_path' and
+                optional 'aspect_ratio' (defaults to "9:16")
+            video_info: Already probed video metadata, used to detect stream-copy clips
+        
+        Returns:
+            Paths to created clips, in the same order as specs
+        
+        Raises:
+            VideoProcessingError: If clip creation fails
+        """
+        if not specs:
+            return []
+        
+        try:
+            for spec in specs:
+                self._validate_clip_duration(spec['start_time'], spec['end_time'])
+            
+            copy_specs = []
+            encode_specs = []
+            for spec in specs:
+                aspect_ratio = spec.get('aspect_ratio', "9:16")
+                if self._can_stream_copy(video_path, aspect_ratio, video_info, spec['start_time']):
+                    copy_specs.append(spec)
+                else:
+                    encode_specs.append(spec)
+            
+            if copy_specs:
+                # One process for every stream-copy clip: each gets its own fast-seeked
+                # input of the source, mapped straight to its output
+                cmd = ['ffmpeg', '-y']
+                for spec in copy_specs:
+                    cmd.extend(['-ss', str(spec['start_time']), '-to', str(spec['end_time']), '-i', video_path])
+                for index, spec in enumerate(copy_specs):
+                    cmd.extend([
+                        '-map', f'{index}:v:0', '-map', f'{index}:a:0?',
+                        '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+                        '-movflags', '+faststart', spec['output_path']
+                    ])
+                
+                self.logger.info(f"Stream-copying {len(copy_specs)} clips in one FFmpeg pass")
+                
+                subprocess.run(cmd, capture_output=True, text=True, check=True)
+            
+            if encode_specs:
+                # Build FFmpeg command with one output group per clip, in source order.
+                # The input fast-seeks to the earliest clip; outputs trim relative to it.
+                encode_specs.sort(key=lambda s: s['start_time'])
+                seek_to = encode_specs[0]['start_time']
+                cmd = ['ffmpeg'] + self._input_args(video_path, seek_to=seek_to)
+                for spec in encode_specs:
+                    cmd.extend(self._clip_output_args(
+                        spec['start_time'], spec['end_time'],
+                        spec['output_path'], spec.get('aspect_ratio', "9:16"), seek_to
+                    ))
+                
+                self.logger.info(f"Creating {len(encode_specs)} clips in one FFmpeg pass")
+                
+                subprocess.run(cmd, capture_output=True, text=True, check=True)
+            
+            output_paths = []
+            for spec in specs:
+                output_path = spec['output_path']
+                if not os.path.exists(output_path):
+                    raise VideoProcessingError(f"Clip file was not created: {output_path}")
+                output_paths.append(output_path)
+            
+            self.logger.info(f"Batch clip creation completed: {len(output_paths)} clips")
+            return output_paths
+        
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"FFmpeg error creating clips: {e.stderr}")
+            raise VideoProcessingError(f"Failed to create clips: {e.stderr}")
+        except Exception as e:
+            self.logger.error(f"Error creating clips: {e}")
+            raise VideoProcessingError(f"Failed to create clips: {e}")
+    
+    def _parallel_clip_groups(self, video_path: str, specs: List[Dict],
+                              video_info: Optional[Dict] = None) -> List[List[Dict]]:
+        """Split clip specs into groups that can be encoded by parallel FFmpeg processes
+        
+        Stream-copy clips stay together in one group since they are cheap. Clips that
+        need re-encoding are split by start time into at most
+        cpu_count // ffmpeg_threads_per_encode groups, so the processes together
+        fill the cores without oversubscribing them.
+        
+        Args:
+            video_path: Path to source video
+            specs: Clip specs, see create_video_clips_batch
+            video_info: Already probed video metadata
+        
+        Returns:
+            Non-empty groups of specs
+        """
+        copy_specs = []
+        encode_specs = []
+        for spec in specs:
+            if self._can_stream_copy(video_path, spec.get('aspect_ratio', "9:16"), video_info, spec['start_time']):
+                copy_specs.append(spec)
+            else:
+                encode_specs.append(spec)
+        
+        max_processes = max(1, (os.cpu_count() or 1) // max(1, self.settings.ffmpeg_threads_per_encode))
+        num_groups = min(max_processes, len(encode_specs))
+        encode_specs.sort(key=lambda s: s['start_time'])
+        
+        # Contiguous runs keep each process's input seek close to its clips
+        groups = [copy_specs] if copy_specs else []
+        for index in range(num_groups):
+            start = index * len(encode_specs) // num_groups
+            end = (index + 1) * len(encode_specs) // num_groups
+            groups.append(encode_specs[start:end])
+        return groups
+    
+    async def _create_clip_group(self, video_path: str, group: List[Dict],
+                                 video_info: Optional[Dict]) -> List[Dict]:
+        """Run create_video_clips_batch for one group in a worker thread and hand the group back"""
+        await asyncio.to_thread(self.create_video_clips_batch, video_path, group, video_info)
+        return group
+    
+    async def create_video_clips_as_completed(self, video_path: str, specs: List[Dict],
+                                              video_info: Optional[Dict] = None) -> AsyncIterator[List[Dict]]:
+        """Create clips with parallel FFmpeg processes, yielding each group as it finishes
+        
+        Lets callers start on the first clips (e.g. captioning) while later
+        groups are still encoding.
+        
+        Args:
+            video_path: Path to source video
+            specs: Clip specs, see create_video_clips_batch
+            video_info: Already probed video metadata
+        
+        Yields:
+            The specs of each group whose clips have all been written
+        """
+        tasks = [
+            asyncio.create_task(self._create_clip_group(video_path, group, video_info))
+            for group in self._parallel_clip_groups(video_path, specs, video_info)
+        ]
+        try:
+            for next_group in asyncio.as_completed(tasks):
+                yield await next_group
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def create_video_clips_batch_async(self, video_path: str, specs: List[Dict],
+                                             video_info: Optional[Dict] = None) -> List[str]:
+        """Create clips with parallel FFmpeg processes, each in a worker thread
+        
+        Args:
+            video_path: Path to source video
+            specs: Clip specs, see create_video_clips_batch
+            video_info: Already probed video metadata
+        
+        Returns:
+            Paths to created clips, in the same order as specs
+        """
+        async for _ in self.create_video_clips_as_completed(video_path, specs, video_info):
+            pass
+        return [spec['output_path'] for spec in specs]
+    
     def validate_video_file(self, video_path: str) -> bool:
         """Validate that a file is a valid video
         
@@ -307,9 +837,12 @@ class VideoProcessingService(BaseService):
             file_path: Path to file to delete
         """
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                self.logger.debug(f"Cleaned up temp file: {file_path}")
+            os.remove(file_path)
+            _probe_cached.cache_clear()
+            _keyframes_cached.cache_clear()
+            self.logger.debug(f"Cleaned up temp file: {file_path}")
+        except FileNotFoundError:
+            pass
         except OSError as e:
             self.logger.warning(f"Could not clean up temp file {file_path}: {e}")
     
@@ -323,11 +856,9 @@ class VideoProcessingService(BaseService):
         Returns:
             Safe filename string
         """
-        import re
-        
         # Remove special characters and replace spaces with underscores
-        safe_title = re.sub(r'[^\w\s-]', '', title).strip()
-        safe_title = re.sub(r'[-\s]+', '_', safe_title)
+        safe_title = _NON_WORD_RE.sub('', title).strip()
+        safe_title = _SPACES_RE.sub('_', safe_title)
         
         # Truncate if too long
         if len(safe_title) > max_length:
@@ -1,16 +1,86 @@
 import os
 import time
+import uuid
+import queue
+import random
+import json
+import logging
 import mimetypes
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Optional, Tuple
 from io import BytesIO
 import httpx
 import aiofiles
 import asyncio
 from fastapi import UploadFile
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
 from app.services.base import BaseService
 from app.config.settings import Settings
-from app.core.exceptions import ZapCapError, StorageError
+from app.core.exceptions import ZapCapError
+
+# Response keys the presigned part URLs have been returned under, in priority order
+_PRESIGNED_URL_KEYS = ("presignedUrls", "presigned_urls", "urls", "uploadUrls", "upload_urls", "parts")
+
+# 1MB chunks buffered between the download and the writer thread
+_DOWNLOAD_QUEUE_CHUNKS = 16
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_shared_client() -> httpx.AsyncClient:
+    """Return the process-wide ZapCap HTTP client, creating it on first use
+    
+    Services are built per request, so the client lives at module level to keep
+    TCP/TLS connections alive across uploads and status polls.
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=10, read=300, write=300, pool=None),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+    return _shared_client
+
+
+@lru_cache(maxsize=64)
+def _guess_content_type(extension: str) -> str:
+    """Guess a MIME type from a file extension, cached per extension"""
+    return mimetypes.guess_type(f"file{extension}")[0] or 'application/octet-stream'
+
+
+def _dumps_json(payload) -> bytes:
+    """Serialize a request payload to JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+def _loads_json(response: httpx.Response):
+    """Parse a JSON response body, with orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+async def close_shared_client() -> None:
+    """Close the shared ZapCap HTTP client (called on application shutdown)"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
 
 
 class ZapCapService(BaseService):
@@ -35,41 +105,16 @@ class ZapCapService(BaseService):
         if not self.api_key:
             raise ZapCapError("ZapCap API key not configured")
     
-    async def save_upload_file(self, upload_file: UploadFile) -> str:
-        """Save uploaded file to uploads directory
-        
-        Args:
-            upload_file: FastAPI UploadFile object
-            
-        Returns:
-            Path to saved file
-            
-        Raises:
-            StorageError: If file save fails
-        """
-        try:
-            file_extension = os.path.splitext(upload_file.filename or "video.mp4")[1]
-            temp_file_path = os.path.join(self.settings.upload_dir, f"upload_{int(time.time())}{file_extension}")
-            
-            async with aiofiles.open(temp_file_path, 'wb') as temp_file:
-                content = await upload_file.read()
-                await temp_file.write(content)
-            
-            self.logger.info(f"File saved to: {temp_file_path}, size: {self.format_file_size(len(content))}")
-            return temp_file_path
-            
-        except Exception as e:
-            self.logger.error(f"Error saving upload file: {e}")
-            raise StorageError(f"Failed to save uploaded file: {e}")
-    
     async def upload_video(self, video_path: str) -> str:
         """Upload video to ZapCap with smart size detection (async)"""
         self._ensure_api_key()
         
-        if not os.path.exists(video_path):
+        # stat off the event loop; metadata calls can stall on network filesystems
+        try:
+            file_size = (await asyncio.to_thread(os.stat, video_path)).st_size
+        except FileNotFoundError:
             raise ZapCapError(f"Video file not found: {video_path}")
         
-        file_size = os.path.getsize(video_path)
         filename = os.path.basename(video_path)
         ten_mb = 10 * 1024 * 1024
         
@@ -85,21 +130,23 @@ class ZapCapService(BaseService):
     async def _simple_upload(self, video_path: str) -> str:
         """Handle simple upload for files <= 10MB (async)"""
         try:
-            async with httpx.AsyncClient(timeout=300) as client:
-                with open(video_path, 'rb') as video_file:
-                    upload_url = f"{self.api_base}/videos"
-                    headers = {"x-api-key": self.api_key}
-                    files = {'file': (os.path.basename(video_path), video_file, 'video/mp4')}
-                    self.logger.info("Uploading video using simple upload...")
-                    response = await client.post(upload_url, headers=headers, files=files)
-                    response.raise_for_status()
-                    upload_data = response.json()
-                    if "id" in upload_data:
-                        video_id = upload_data["id"]
-                        self.logger.info(f"Upload completed! Video ID: {video_id}")
-                        return video_id
-                    else:
-                        raise ZapCapError(f"Invalid upload response: {upload_data}")
+            client = _get_shared_client()
+            with open(video_path, 'rb') as video_file:
+                upload_url = f"{self.api_base}/videos"
+                body_headers, body = self._multipart_file_body(
+                    video_file, 'file', os.path.basename(video_path), 'video/mp4'
+                )
+                headers = {"x-api-key": self.api_key, **body_headers}
+                self.logger.info("Uploading video using simple upload...")
+                response = await client.post(upload_url, headers=headers, content=body)
+                response.raise_for_status()
+                upload_data = _loads_json(response)
+                if "id" in upload_data:
+                    video_id = upload_data["id"]
+                    self.logger.info(f"Upload completed! Video ID: {video_id}")
+                    return video_id
+                else:
+                    raise ZapCapError(f"Invalid upload response: {upload_data}")
         except httpx.RequestError as e:
             self.logger.error(f"Upload failed: {e}")
             raise ZapCapError(f"Upload failed: {e}")
@@ -107,73 +154,131 @@ class ZapCapService(BaseService):
             self.logger.error(f"Upload error: {e}")
             raise ZapCapError(f"Upload error: {e}")
     
-    async def _multipart_upload(self, video_path: str) -> str:
-        """Handle multipart upload for files > 10MB (async)"""
+    def _multipart_file_body(self, file_obj, field_name: str, filename: str,
+                             content_type: str) -> Tuple[Dict[str, str], AsyncIterator[bytes]]:
+        """Build a streamed multipart/form-data body for a single file field
+        
+        The envelope is framed once and the file is yielded in 1MB pieces read
+        with pread in a worker thread, so a cold page cache never stalls the
+        event loop and the whole payload is never held in memory.
+        
+        Args:
+            file_obj: Open binary file to send
+            field_name: Form field name
+            filename: Filename reported to the server
+            content_type: Content type of the file part
+        
+        Returns:
+            Request headers (content type and length) and the async body iterator
+        """
+        boundary = uuid.uuid4().hex
+        preamble = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        epilogue = f"\r\n--{boundary}--\r\n".encode()
+        file_size = os.fstat(file_obj.fileno()).st_size
+        
+        async def body() -> AsyncIterator[bytes]:
+            yield preamble
+            fd = file_obj.fileno()
+            for offset in range(0, file_size, 1 << 20):
+                yield await asyncio.to_thread(os.pread, fd, 1 << 20, offset)
+            yield epilogue
+        
+        headers = {
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Content-Length": str(len(preamble) + file_size + len(epilogue))
+        }
+        return headers, body()
+    
+    async def _create_upload_session(self, filename: str, file_size: int) -> Dict:
+        """Open a ZapCap multipart upload session (async)
+        
+        Only the name and size of the file are needed, so the session can be
+        opened while the file itself is still being written to disk.
+        
+        Args:
+            filename: Name reported to ZapCap
+            file_size: Total size of the file in bytes
+        
+        Returns:
+            Session details: upload and video IDs, presigned URLs and part layout
+        
+        Raises:
+            ZapCapError: If the session cannot be created
+        """
+        chunk_size = self._multipart_chunk_size(file_size)
+        num_parts = (file_size + chunk_size - 1) // chunk_size
+        self.logger.info(f"Preparing {num_parts} parts for upload...")
+        create_upload_url = f"{self.api_base}/videos/upload"
+        headers = {"x-api-key": self.api_key, "Content-Type": "application/json"}
+        upload_parts = []
+        for i in range(num_parts):
+            part_size = min(chunk_size, file_size - (i * chunk_size))
+            upload_parts.append({"contentLength": part_size})
+        content_type = _guess_content_type(os.path.splitext(filename)[1])
+        create_payload = {
+            "uploadParts": upload_parts,
+            "filename": filename,
+            "contentType": content_type
+        }
+        try:
+            client = _get_shared_client()
+            self.logger.info("Creating upload session...")
+            create_resp = await client.post(create_upload_url, headers=headers, content=_dumps_json(create_payload), timeout=60)
+            create_resp.raise_for_status()
+            create_data = _loads_json(create_resp)
+        except httpx.HTTPError as e:
+            self.logger.error(f"Failed to create upload session: {e}")
+            raise ZapCapError(f"Failed to create upload session: {e}")
+        presigned_urls = next((create_data[key] for key in _PRESIGNED_URL_KEYS if key in create_data), None)
+        if not presigned_urls:
+            raise ZapCapError(f"No presigned URLs found. Available keys: {list(create_data.keys())}")
+        self.logger.info(f"Upload session created (ID: {create_data['uploadId']}, Video ID: {create_data['videoId']})")
+        return {
+            "upload_id": create_data["uploadId"],
+            "video_id": create_data["videoId"],
+            "presigned_urls": presigned_urls,
+            "filename": filename,
+            "file_size": file_size,
+            "chunk_size": chunk_size,
+            "num_parts": num_parts,
+            "content_type": content_type
+        }
+    
+    async def _multipart_upload(self, video_path: str, session: Optional[Dict] = None) -> str:
+        """Handle multipart upload for files > 10MB (async)
+        
+        Parts are read into pooled buffers, so peak memory is the part size times
+        the pool size from _part_buffer_count: at most
+        zapcap_upload_buffer_budget, or a single part if that is larger.
+        
+        Args:
+            video_path: Path to the video file
+            session: Session from _create_upload_session, opened here when omitted
+        
+        Returns:
+            ZapCap video ID
+        """
         try:
-            file_size = os.path.getsize(video_path)
-            filename = os.path.basename(video_path)
-            chunk_size = 10 * 1024 * 1024  # 10MB chunks
-            num_parts = (file_size + chunk_size - 1) // chunk_size
-            self.logger.info(f"Preparing {num_parts} parts for upload...")
-            create_upload_url = f"{self.api_base}/videos/upload"
+            if session is None:
+                file_stat = await asyncio.to_thread(os.stat, video_path)
+                session = await self._create_upload_session(os.path.basename(video_path), file_stat.st_size)
+            upload_id = session["upload_id"]
+            video_id = session["video_id"]
+            presigned_urls = session["presigned_urls"]
+            filename = session["filename"]
+            file_size = session["file_size"]
+            chunk_size = session["chunk_size"]
+            num_parts = session["num_parts"]
+            content_type = session["content_type"]
+            base_name, file_extension = os.path.splitext(filename)
             headers = {"x-api-key": self.api_key, "Content-Type": "application/json"}
-            upload_parts = []
-            for i in range(num_parts):
-                part_size = min(chunk_size, file_size - (i * chunk_size))
-                upload_parts.append({"contentLength": part_size})
-            create_payload = {
-                "uploadParts": upload_parts,
-                "filename": filename,
-                "contentType": mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-            }
-            async with httpx.AsyncClient(timeout=60) as client:
-                self.logger.info("Creating upload session...")
-                create_resp = await client.post(create_upload_url, headers=headers, json=create_payload)
-                create_resp.raise_for_status()
-                create_data = create_resp.json()
-            upload_id = create_data["uploadId"]
-            video_id = create_data["videoId"]
-            presigned_urls = None
-            for possible_key in ["presignedUrls", "presigned_urls", "urls", "uploadUrls", "upload_urls", "parts"]:
-                if possible_key in create_data:
-                    presigned_urls = create_data[possible_key]
-                    break
-            if not presigned_urls:
-                raise ZapCapError(f"No presigned URLs found. Available keys: {list(create_data.keys())}")
-            self.logger.info(f"Upload session created (ID: {upload_id}, Video ID: {video_id})")
-            uploaded_parts = []
-            async with httpx.AsyncClient(timeout=300) as client:
-                with open(video_path, 'rb') as video_file:
-                    for part_number, presigned_url_data in enumerate(presigned_urls, 1):
-                        chunk_data = video_file.read(chunk_size)
-                        if not chunk_data:
-                            break
-                        self.logger.info(f"Uploading part [{part_number}/{num_parts}] ({self.format_file_size(len(chunk_data))})")
-                        if isinstance(presigned_url_data, str):
-                            presigned_url = presigned_url_data
-                        elif isinstance(presigned_url_data, dict):
-                            presigned_url = (presigned_url_data.get("url") or 
-                                           presigned_url_data.get("uploadUrl") or 
-                                           presigned_url_data.get("presignedUrl"))
-                            if not presigned_url:
-                                raise ZapCapError(f"No URL found in: {presigned_url_data}")
-                        else:
-                            raise ZapCapError(f"Unexpected URL format: {type(presigned_url_data)}")
-                        upload_resp = await client.put(
-                            presigned_url, 
-                            content=chunk_data, 
-                            headers={'Content-Type': create_payload['contentType']}
-                        )
-                        upload_resp.raise_for_status()
-                        etag = upload_resp.headers.get('ETag', '').strip('"')
-                        uploaded_parts.append({
-                            "partNumber": part_number,
-                            "etag": etag or ""
-                        })
-            self.logger.info("All parts uploaded successfully!")
+            client = _get_shared_client()
+            # Everything but the ETags is known up front, so frame the completion now
             complete_url = f"{self.api_base}/videos/upload/complete"
-            file_extension = os.path.splitext(filename)[1]
-            base_name = os.path.splitext(filename)[0]
             complete_payload = {
                 "uploadId": upload_id,
                 "videoId": video_id,
@@ -181,28 +286,53 @@ class ZapCapService(BaseService):
                 "originalFilename": filename,
                 "fileExtension": file_extension,
                 "baseName": base_name,
-                "contentType": create_payload['contentType'],
-                "parts": uploaded_parts,
+                "contentType": content_type,
+                "parts": None,
                 "metadata": {
                     "originalSize": file_size,
                     "uploadMethod": "multipart"
                 }
             }
-            async with httpx.AsyncClient(timeout=60) as client:
-                self.logger.info("Finalizing upload...")
-                complete_resp = await client.post(complete_url, headers=headers, json=complete_payload)
-                if complete_resp.status_code in [200, 201]:
-                    self.logger.info("Upload completed successfully!")
+            # Reusable part buffers; taking one also bounds the number of parts in flight
+            buffers: asyncio.Queue = asyncio.Queue()
+            for _ in range(self._part_buffer_count(chunk_size, num_parts)):
+                buffers.put_nowait(bytearray(chunk_size))
+            fd = os.open(video_path, os.O_RDONLY)
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            try:
+                tasks = []
+                for part_number, presigned_url_data in enumerate(presigned_urls[:num_parts], 1):
+                    offset = (part_number - 1) * chunk_size
+                    tasks.append(self._upload_part(
+                        client, buffers, fd, part_number, num_parts,
+                        self._resolve_presigned_url(presigned_url_data),
+                        offset, min(chunk_size, file_size - offset), content_type
+                    ))
+                # Let every part settle before the fd is closed
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                os.close(fd)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            # gather keeps task order, so the parts are already sorted by part number
+            complete_payload["parts"] = results
+            self.logger.info("All parts uploaded successfully!")
+            self.logger.info("Finalizing upload...")
+            complete_resp = await client.post(complete_url, headers=headers, content=_dumps_json(complete_payload), timeout=60)
+            if complete_resp.status_code in [200, 201]:
+                self.logger.info("Upload completed successfully!")
+                return video_id
+            else:
+                self.logger.warning(f"Completion returned status {complete_resp.status_code}")
+                check_url = f"{self.api_base}/videos/{video_id}"
+                check_resp = await client.get(check_url, headers={"x-api-key": self.api_key}, timeout=60)
+                if check_resp.status_code == 200:
+                    self.logger.info("Video is available despite completion warning")
                     return video_id
                 else:
-                    self.logger.warning(f"Completion returned status {complete_resp.status_code}")
-                    check_url = f"{self.api_base}/videos/{video_id}"
-                    check_resp = await client.get(check_url, headers={"x-api-key": self.api_key})
-                    if check_resp.status_code == 200:
-                        self.logger.info("Video is available despite completion warning")
-                        return video_id
-                    else:
-                        complete_resp.raise_for_status()
+                    complete_resp.raise_for_status()
         except httpx.RequestError as e:
             self.logger.error(f"Multipart upload failed: {e}")
             raise ZapCapError(f"Multipart upload failed: {e}")
@@ -210,6 +340,107 @@ class ZapCapService(BaseService):
             self.logger.error(f"Multipart upload error: {e}")
             raise ZapCapError(f"Multipart upload error: {e}")
     
+    def _multipart_chunk_size(self, file_size: int) -> int:
+        """Pick the multipart part size for a file
+        
+        Adaptive mode aims for about 32 parts, clamped to 16MB-256MB, so large
+        files need far fewer presigned PUTs than with fixed 10MB parts.
+        
+        Args:
+            file_size: File size in bytes
+        
+        Returns:
+            Part size in bytes
+        """
+        if not self.settings.zapcap_adaptive_chunk:
+            return 10 * 1024 * 1024  # 10MB chunks
+        return max(16 * 1024 * 1024, min(256 * 1024 * 1024, file_size // 32))
+    
+    def _part_buffer_count(self, chunk_size: int, num_parts: int) -> int:
+        """Number of part buffers to allocate for a multipart upload
+        
+        Bounded by the upload concurrency, the part count and the memory budget,
+        but always at least one.
+        """
+        budget_buffers = self.settings.zapcap_upload_buffer_budget // chunk_size
+        return max(1, min(self.settings.zapcap_upload_concurrency, num_parts, budget_buffers))
+    
+    def _resolve_presigned_url(self, presigned_url_data) -> str:
+        """Extract the upload URL from a presigned URL entry (string or dict)"""
+        if isinstance(presigned_url_data, str):
+            return presigned_url_data
+        if isinstance(presigned_url_data, dict):
+            presigned_url = (presigned_url_data.get("url") or 
+                             presigned_url_data.get("uploadUrl") or 
+                             presigned_url_data.get("presignedUrl"))
+            if not presigned_url:
+                raise ZapCapError(f"No URL found in: {presigned_url_data}")
+            return presigned_url
+        raise ZapCapError(f"Unexpected URL format: {type(presigned_url_data)}")
+    
+    async def _upload_part(self, client: httpx.AsyncClient, buffers: asyncio.Queue, fd: int,
+                           part_number: int, num_parts: int, presigned_url: str,
+                           offset: int, size: int, content_type: str) -> Dict:
+        """Read one part into a pooled buffer and PUT it to its presigned URL (async)
+        
+        Args:
+            client: Shared HTTP client
+            buffers: Pool of part-sized bytearrays; also bounds the number of parts in flight
+            fd: File descriptor of the video, shared across parts
+            part_number: 1-based part number
+            num_parts: Total number of parts, for logging
+            presigned_url: Upload URL for this part
+            offset: Byte offset of the part in the file
+            size: Part size in bytes
+            content_type: Content type of the video
+        
+        Returns:
+            Part number and ETag for the completion payload
+        """
+        buffer = await buffers.get()
+        try:
+            # preadv does not move a shared file pointer, so parts can be read concurrently
+            chunk_view = memoryview(buffer)[:size]
+            read = await asyncio.to_thread(os.preadv, fd, [chunk_view], offset)
+            if read != size:
+                raise ZapCapError(f"Short read for part {part_number}: {read} of {size} bytes")
+            # The temp file is read once, so drop its pages instead of evicting hotter cache
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, offset, size, os.POSIX_FADV_DONTNEED)
+            
+            async def body() -> AsyncIterator[memoryview]:
+                yield chunk_view
+            
+            # Per-part line: skip building the size string when INFO is filtered out
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Uploading part [%d/%d] (%s)", part_number, num_parts, self.format_file_size(size))
+            max_attempts = max(1, self.settings.zapcap_part_max_retries)
+            for attempt in range(max_attempts):
+                try:
+                    upload_resp = await client.put(
+                        presigned_url, 
+                        content=body(), 
+                        headers={'Content-Type': content_type, 'Content-Length': str(size)}
+                    )
+                    upload_resp.raise_for_status()
+                    break
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    # Part PUTs are idempotent; only transport errors and 5xx are worth another try
+                    client_error = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+                    if client_error or attempt == max_attempts - 1:
+                        raise
+                    delay = 0.5 * 2 ** attempt + random.uniform(0, 0.2)
+                    self.logger.warning(f"Part {part_number} upload failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            etag = upload_resp.headers.get('ETag', '').strip('"')
+            return {
+                "partNumber": part_number,
+                "etag": etag or ""
+            }
+        finally:
+            # The request has been fully sent once put() returns, so the buffer can be reused
+            buffers.put_nowait(buffer)
+    
     async def create_caption_task(self, video_id: str, template_id: Optional[str] = None, 
                           language: str = "en", auto_approve: bool = True) -> str:
         """Create a captioning task for the uploaded video (async)"""
@@ -226,16 +457,16 @@ class ZapCapService(BaseService):
             "templateId": template_id or self.default_template_id
         }
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.post(task_url, headers=headers, json=payload)
-                response.raise_for_status()
-                task_data = response.json()
-                if "taskId" in task_data:
-                    task_id = task_data["taskId"]
-                    self.logger.info(f"Captioning task created! Task ID: {task_id}")
-                    return task_id
-                else:
-                    raise ZapCapError(f"Invalid task creation response: {task_data}")
+            client = _get_shared_client()
+            response = await client.post(task_url, headers=headers, content=_dumps_json(payload), timeout=60)
+            response.raise_for_status()
+            task_data = _loads_json(response)
+            if "taskId" in task_data:
+                task_id = task_data["taskId"]
+                self.logger.info(f"Captioning task created! Task ID: {task_id}")
+                return task_id
+            else:
+                raise ZapCapError(f"Invalid task creation response: {task_data}")
         except httpx.RequestError as e:
             self.logger.error(f"Failed to create captioning task: {e}")
             raise ZapCapError(f"Failed to create captioning task: {e}")
@@ -249,13 +480,17 @@ class ZapCapService(BaseService):
         status_url = f"{self.api_base}/videos/{video_id}/task/{task_id}"
         headers = {"x-api-key": self.api_key}
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.get(status_url, headers=headers)
-                response.raise_for_status()
-                status_data = response.json()
-                status = status_data.get('status', 'unknown')
-                self.logger.debug(f"Task {task_id} status: {status}")
-                return status_data
+            client = _get_shared_client()
+            response = await client.get(status_url, headers=headers, timeout=30)
+            if response.status_code == 429:
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                self.logger.warning(f"Status check rate limited (Retry-After: {retry_after})")
+                return {"status": "rate_limited", "retry_after": retry_after}
+            response.raise_for_status()
+            status_data = _loads_json(response)
+            status = status_data.get('status', 'unknown')
+            self.logger.debug(f"Task {task_id} status: {status}")
+            return status_data
         except httpx.RequestError as e:
             self.logger.error(f"Failed to check caption status: {e}")
             raise ZapCapError(f"Failed to check caption status: {e}")
@@ -264,10 +499,17 @@ class ZapCapService(BaseService):
             raise ZapCapError(f"Status check error: {e}")
     
     async def wait_for_completion(self, video_id: str, task_id: str, 
-                          max_wait_time: int = 600, check_interval: int = 5) -> Dict:
-        """Wait for captioning task to complete (async)"""
+                          max_wait_time: int = 600, max_check_interval: float = 15) -> Dict:
+        """Wait for captioning task to complete (async)
+        
+        Polls with exponential backoff (1s, 2s, 4s, ... capped at max_check_interval)
+        plus up to 10% jitter. The backoff restarts whenever the status changes, and
+        a rate-limited check waits for the server's Retry-After when one is given.
+        """
         start_time = time.time()
         self.logger.info(f"Waiting for captioning completion (max {max_wait_time}s)...")
+        attempt = 0
+        last_status = None
         while True:
             status_data = await self.check_caption_status(video_id, task_id)
             status = status_data.get("status", "unknown")
@@ -279,16 +521,24 @@ class ZapCapService(BaseService):
                 error_message = status_data.get("error", "Unknown error")
                 self.logger.error(f"Captioning failed: {error_message}")
                 raise ZapCapError(f"Captioning failed: {error_message}")
-            elif status in ["processing", "pending", "transcribing"]:
-                elapsed = time.time() - start_time
-                if elapsed > max_wait_time:
-                    self.logger.error(f"Captioning timed out after {max_wait_time} seconds")
-                    raise ZapCapError("Captioning process timed out")
+            elapsed = time.time() - start_time
+            if elapsed > max_wait_time:
+                self.logger.error(f"Captioning timed out after {max_wait_time} seconds")
+                raise ZapCapError("Captioning process timed out")
+            if status != last_status and status != "rate_limited":
+                attempt = 0
+                last_status = status
+            delay = min(max_check_interval, 2 ** min(attempt, 4))
+            delay += random.uniform(0, delay * 0.1)
+            attempt += 1
+            if status in ["processing", "pending", "transcribing"]:
                 self.logger.info(f"Status: {status}, elapsed: {int(elapsed)}s")
-                await asyncio.sleep(check_interval)
+            elif status == "rate_limited":
+                if status_data.get("retry_after") is not None:
+                    delay = status_data["retry_after"]
             else:
                 self.logger.warning(f"Unknown status: {status}")
-                await asyncio.sleep(check_interval)
+            await asyncio.sleep(delay)
     
     async def download_result_video(self, download_url: str, video_id: str, original_filename: str = None) -> str:
         """Download the processed video and save it to results directory (async)"""
@@ -301,63 +551,172 @@ class ZapCapService(BaseService):
                 result_filename = f"result_{video_id}_{timestamp}.mp4"
             result_path = os.path.join(self.settings.results_dir, result_filename)
             self.logger.info(f"Downloading result video from: {download_url}")
-            headers = {"x-api-key": self.api_key}
-            async with httpx.AsyncClient(timeout=300) as client:
+            # MP4 is already compressed; asking for identity keeps the body on the raw path below
+            headers = {"x-api-key": self.api_key, "Accept-Encoding": "identity"}
+            # A single writer thread drains the queue so each chunk costs no threadpool hop;
+            # the bound keeps a slow or failed disk from buffering the download in memory
+            write_queue: queue.Queue = queue.Queue(maxsize=_DOWNLOAD_QUEUE_CHUNKS)
+            writer = None
+            written = 0
+            try:
+                client = _get_shared_client()
                 async with client.stream("GET", download_url, headers=headers) as response:
                     response.raise_for_status()
-                    async with aiofiles.open(result_path, 'wb') as result_file:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            await result_file.write(chunk)
-            self.logger.info(f"Result video saved to: {result_path}, size: {os.path.getsize(result_path)} bytes")
+                    content_length = response.headers.get("Content-Length")
+                    expected_size = int(content_length) if content_length and content_length.isdigit() else None
+                    writer = asyncio.create_task(
+                        asyncio.to_thread(self._drain_to_file, result_path, write_queue, expected_size)
+                    )
+                    # Skip the decoder entirely when the body is not content-encoded
+                    if response.headers.get("Content-Encoding", "identity").lower() == "identity":
+                        chunks = response.aiter_raw(chunk_size=1 << 20)
+                    else:
+                        chunks = response.aiter_bytes(chunk_size=1 << 20)
+                    async for chunk in chunks:
+                        await self._put_chunk(write_queue, writer, chunk)
+            finally:
+                if writer is not None:
+                    if not writer.done():
+                        await self._put_chunk(write_queue, writer, None)
+                    # Re-raises the writer's error, e.g. a full disk
+                    written = await writer
+            self.logger.info(f"Result video saved to: {result_path}, size: {written} bytes")
             return result_path
         except Exception as e:
             self.logger.error(f"Error downloading result video: {e}")
             raise ZapCapError(f"Failed to download result video: {e}")
     
+    async def _put_chunk(self, write_queue: queue.Queue, writer: asyncio.Task, chunk: Optional[bytes]) -> None:
+        """Hand a chunk to the writer thread, waiting off the event loop while the queue is full
+        
+        Stops waiting as soon as the writer has exited, so a failed write surfaces
+        instead of blocking the download forever.
+        """
+        while not writer.done():
+            try:
+                write_queue.put_nowait(chunk)
+                return
+            except queue.Full:
+                try:
+                    await asyncio.to_thread(write_queue.put, chunk, True, 0.5)
+                    return
+                except queue.Full:
+                    continue
+        if chunk is not None:
+            # The writer only exits early on an error; awaiting it raises that error
+            await writer
+            raise ZapCapError("Result writer stopped before the download finished")
+    
+    def _drain_to_file(self, path: str, write_queue: queue.Queue, expected_size: Optional[int] = None) -> int:
+        """Write queued chunks to a file until a None sentinel arrives (runs in a thread)
+        
+        When the response announced its size the file is preallocated first,
+        so the filesystem can lay it out in a few contiguous extents.
+        
+        Returns:
+            Number of bytes written
+        """
+        with open(path, 'wb', buffering=1 << 20) as output_file:
+            if expected_size and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(output_file.fileno(), 0, expected_size)
+                except OSError:
+                    pass
+            while (chunk := write_queue.get()) is not None:
+                output_file.write(chunk)
+            # Drop any preallocated tail left by a short or aborted transfer
+            return output_file.truncate()
+    
     async def process_video(self, upload_file: UploadFile, template_id: Optional[str] = None,
                           language: str = "en", auto_approve: bool = True) -> Dict:
         """Complete video processing pipeline (async)"""
         start_time = time.time()
         temp_file_path = None
         try:
-            # Step 1: Save uploaded file
-            temp_file_path = await self.save_upload_file(upload_file)
-            # Step 2: Upload to ZapCap
-            video_id = await self.upload_video(temp_file_path)
-            # Step 3: Create captioning task
-            task_id = await self.create_caption_task(
-                video_id, 
-                template_id=template_id, 
-                language=language, 
-                auto_approve=auto_approve
+            expected_size = getattr(upload_file, 'size', None)
+            if isinstance(expected_size, int) and expected_size > 10 * 1024 * 1024:
+                # Steps 1-2: open the multipart session while the upload is saved to disk
+                self._ensure_api_key()
+                saved, session = await asyncio.gather(
+                    self.save_upload_file(upload_file),
+                    self._create_upload_session(upload_file.filename or "video.mp4", expected_size),
+                    return_exceptions=True
+                )
+                if isinstance(saved, str):
+                    temp_file_path = saved
+                for result in (saved, session):
+                    if isinstance(result, Exception):
+                        raise result
+                saved_size = (await asyncio.to_thread(os.stat, temp_file_path)).st_size
+                if saved_size == expected_size:
+                    video_id = await self._multipart_upload(temp_file_path, session)
+                else:
+                    # The announced size was wrong, so the session's part layout is unusable
+                    video_id = await self.upload_video(temp_file_path)
+            else:
+                # Step 1: Save uploaded file
+                temp_file_path = await self.save_upload_file(upload_file)
+                # Step 2: Upload to ZapCap
+                video_id = await self.upload_video(temp_file_path)
+            return await self._caption_uploaded_video(
+                video_id, upload_file.filename, template_id, language, auto_approve, start_time
             )
-            # Step 4: Wait for completion
-            status_data = await self.wait_for_completion(video_id, task_id)
-            # Step 5: Extract download URL
-            download_url = status_data.get("downloadUrl")
-            if not download_url:
-                raise ZapCapError("Download URL not found in response")
-            # Step 6: Download result
-            result_path = await self.download_result_video(download_url, video_id, upload_file.filename)
-            processing_time = time.time() - start_time
-            video_name = os.path.basename(result_path)
-            return {
-                "success": True,
-                "message": "Video captioning completed successfully",
-                "video_id": video_id,
-                "task_id": task_id,
-                "video_name": video_name,
-                "result_file_path": result_path,
-                "processing_time": processing_time
-            }
         except Exception as e:
             self.logger.error(f"Error processing video: {e}")
             raise
         finally:
             # Clean up uploaded file
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                    self.logger.info("Upload file cleaned up")
-                except OSError as e:
-                    self.logger.warning(f"Could not clean up upload file: {e}") 
\ No newline at end of file
+            if temp_file_path:
+                await self.cleanup_temp_files_async([temp_file_path])
+    
+    async def process_video_file(self, video_path: str, template_id: Optional[str] = None,
+                                 language: str = "en", auto_approve: bool = True) -> Dict:
+        """Complete video processing pipeline for a file already on disk (async)
+        
+        The file is uploaded straight from its path, without the temp copy that
+        process_video makes of an UploadFile, and is left in place afterwards.
+        """
+        start_time = time.time()
+        try:
+            video_id = await self.upload_video(video_path)
+            return await self._caption_uploaded_video(
+                video_id, os.path.basename(video_path), template_id, language, auto_approve, start_time
+            )
+        except Exception as e:
+            self.logger.error(f"Error processing video: {e}")
+            raise
+    
+    async def _caption_uploaded_video(self, video_id: str, filename: Optional[str],
+                                      template_id: Optional[str], language: str,
+                                      auto_approve: bool, start_time: float) -> Dict:
+        """Caption an uploaded video and download the result (steps 3-6 of the pipeline)"""
+        # Step 3: Create captioning task
+        task_id = await self.create_caption_task(
+            video_id, 
+            template_id=template_id, 
+            language=language, 
+            auto_approve=auto_approve
+        )
+        # Step 4: Wait for completion
+        status_data = await self.wait_for_completion(video_id, task_id)
+        # Step 5: Extract download URL
+        download_url = status_data.get("downloadUrl")
+        if not download_url:
+            raise ZapCapError("Download URL not found in response")
+        # Step 6: Download result
+        result_path = await self.download_result_video(download_url, video_id, filename)
+        return self.caption_result(video_id, task_id, result_path, start_time)
+    
+    def caption_result(self, video_id: str, task_id: str, result_path: str, start_time: float) -> Dict:
+        """Build the pipeline result for a downloaded captioned video"""
+        processing_time = time.time() - start_time
+        video_name = os.path.basename(result_path)
+        return {
+            "success": True,
+            "message": "Video captioning completed successfully",
+            "video_id": video_id,
+            "task_id": task_id,
+            "video_name": video_name,
+            "result_file_path": result_path,
+            "processing_time": processing_time
+        }
@@ -0,0 +1,77 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Any, Optional
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_text(*parts: str) -> str:
+    """Return the hex SHA-256 of text parts joined by newlines"""
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class JsonFileCache:
+    """Content-addressed JSON cache with one file per key and a time-to-live
+    
+    Entries survive restarts and are shared by every worker using the same
+    directory. Writes are atomic, so concurrent readers never see partial files.
+    """
+    
+    def __init__(self, directory: str, ttl: int):
+        """Initialize the cache
+        
+        Args:
+            directory: Directory the entries are stored in
+            ttl: Seconds an entry stays valid; 0 disables the cache
+        """
+        self.directory = directory
+        self.ttl = ttl
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are stored at all"""
+        return self.ttl > 0
+    
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, f"{namespace}_{key}.json")
+    
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing, expired or unreadable"""
+        if not self.enabled:
+            return None
+        path = self._path(namespace, key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value; failures only cost a future cache miss"""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(value, f, ensure_ascii=False)
+                os.replace(temp_path, self._path(namespace, key))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass
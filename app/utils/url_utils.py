@@ -1,19 +1,37 @@
 from fastapi import Request
+from typing import Optional
 import os
 
-def file_path_to_url(file_path: str, request: Request, mount_path: str = "/data") -> str:
+# Rendered base URLs keyed by the scope fields starlette builds them from
+_base_url_cache = {}
+_BASE_URL_CACHE_SIZE = 256
+
+
+def _base_url(request: Request) -> str:
+    """Return the request's base URL without a trailing slash, cached per origin"""
+    scope = request.scope
+    host = next((value for name, value in scope.get("headers", ()) if name == b"host"), None)
+    key = (scope.get("scheme", "http"), scope.get("server"), scope.get("root_path", ""), host)
+    base_url = _base_url_cache.get(key)
+    if base_url is None:
+        # The Host header is client controlled, so keep the cache bounded
+        if len(_base_url_cache) >= _BASE_URL_CACHE_SIZE:
+            _base_url_cache.clear()
+        base_url = _base_url_cache[key] = str(request.base_url).rstrip("/")
+    return base_url
+
+
+def file_path_to_url(file_path: str, request: Request, mount_path: str = "/data",
+                     base_url: Optional[str] = None) -> str:
     """
     Convert a local file path (e.g., data/results/video.mp4) to a full URL using the request's base URL.
     Assumes files are served from a static mount (e.g., /data).
+    A fixed base_url (e.g., settings.public_base_url) is used as-is and the request is not inspected.
     """
-    # Remove leading 'data/' if present
-    rel_path = file_path
-    if rel_path.startswith("data/"):
-        rel_path = rel_path[4:]
-    # Ensure leading slash
+    # Remove leading 'data' directory and ensure a leading slash
+    rel_path = file_path.removeprefix("data/")
     if not rel_path.startswith("/"):
         rel_path = "/" + rel_path
-    url_path = f"{mount_path}{rel_path}"
-    # Remove trailing slash from base_url if present
-    base_url = str(request.base_url).rstrip("/")
-    return base_url + url_path 
\ No newline at end of file
+    if base_url is None:
+        base_url = _base_url(request)
+    return f"{base_url.rstrip('/')}{mount_path}{rel_path}"
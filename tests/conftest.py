@@ -2,7 +2,7 @@ import pytest
 import os
 import tempfile
 import shutil
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -27,7 +27,9 @@ def test_settings():
         upload_dir="test_data/uploads",
         clips_dir="test_data/clips",
         temp_dir="test_data/temp",
-        results_dir="test_data/results"
+        results_dir="test_data/results",
+        cache_dir="test_data/cache",
+        video_encoder="libx264"
     )
 
 
@@ -82,7 +84,7 @@ def base_service(test_settings):
 @pytest.fixture
 def transcription_service(test_settings, mock_openai_client):
     """Transcription service instance for testing"""
-    return TranscriptionService(test_settings)
+    return TranscriptionService(test_settings, AsyncMock())
 
 
 @pytest.fixture
@@ -106,7 +108,7 @@ def content_analyzer_service(test_settings, mock_openai_client):
 @pytest.fixture
 def auto_clipper_service(test_settings, mock_openai_client):
     """Auto clipper service instance for testing"""
-    return AutoClipperService(test_settings)
+    return AutoClipperService(test_settings, mock_openai_client.return_value, AsyncMock())
 
 
 @pytest.fixture
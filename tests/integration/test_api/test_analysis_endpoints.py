@@ -0,0 +1,40 @@
+import pytest
+import os
+import io
+from unittest.mock import AsyncMock
+
+from app.main import app
+from app.core.dependencies import get_transcription_service
+from app.services.transcription import TranscriptionService
+
+
+class TestAnalysisEndpoints:
+    """Integration tests for analysis API endpoints"""
+    
+    def test_upload_transcribe_saves_with_service_helper(self, client, test_settings, temp_dir):
+        """Test that uploads are saved by the service helper and removed afterwards"""
+        test_settings.upload_dir = temp_dir
+        service = TranscriptionService(test_settings, AsyncMock())
+        saved_paths = []
+        
+        async def transcribe_audio(file_path, return_timestamps=True):
+            saved_paths.append(file_path)
+            with open(file_path, 'rb') as f:
+                assert f.read() == b"fake audio content"
+            return {"text": "hello", "language": "en", "duration": 1.0, "word_count": 1, "segments": []}
+        
+        service.transcribe_audio = transcribe_audio
+        app.dependency_overrides[get_transcription_service] = lambda: service
+        try:
+            response = client.post(
+                "/api/v1/analysis/upload-transcribe",
+                files={"file": ("test_audio.mp3", io.BytesIO(b"fake audio content"), "audio/mpeg")}
+            )
+        finally:
+            app.dependency_overrides.pop(get_transcription_service, None)
+        
+        assert response.status_code == 200
+        assert response.json()["success"] == True
+        assert len(saved_paths) == 1
+        assert os.path.dirname(saved_paths[0]) == temp_dir
+        assert not os.path.exists(saved_paths[0])
@@ -0,0 +1,268 @@
+import os
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch, AsyncMock, Mock
+from app.core.exceptions import ZapCapError, VideoProcessingError
+from app.utils.file_cache import JsonFileCache
+
+
+def _read_timeout(message: str) -> ZapCapError:
+    """Build a ZapCapError wrapping an httpx.ReadTimeout, as the ZapCap service raises it"""
+    try:
+        try:
+            raise httpx.ReadTimeout("timed out")
+        except httpx.ReadTimeout:
+            raise ZapCapError(message)
+    except ZapCapError as e:
+        return e
+
+
+def _status_error(status_code: int, url: str) -> ZapCapError:
+    """Build a ZapCapError wrapping an httpx.HTTPStatusError for a request to url"""
+    request = httpx.Request("POST", url)
+    response = httpx.Response(status_code, request=request)
+    try:
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            raise ZapCapError(f"Upload error: {status_code}")
+    except ZapCapError as e:
+        return e
+
+
+@pytest.fixture
+def zapcap_stages(auto_clipper_service):
+    """Mock every ZapCap stage of the auto clipper with a successful result"""
+    zapcap = auto_clipper_service.zapcap_service
+    zapcap.upload_video = AsyncMock(return_value="vid-1")
+    zapcap.create_caption_task = AsyncMock(return_value="task-1")
+    zapcap.wait_for_completion = AsyncMock(return_value={"status": "completed", "downloadUrl": "u"})
+    zapcap.download_result_video = AsyncMock(return_value="results/clip_1_captioned.mp4")
+    with patch('app.services.auto_clipper.asyncio.sleep', new=AsyncMock()):
+        yield zapcap
+
+
+class TestAutoClipperService:
+    """Test the AutoClipperService class"""
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_upload_retried(self, auto_clipper_service, zapcap_stages):
+        """Test that a connection error during upload re-uploads the clip"""
+        zapcap_stages.upload_video.side_effect = [_read_timeout("Upload failed"), "vid-1"]
+        
+        result = await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        
+        assert result["task_id"] == "task-1"
+        assert zapcap_stages.upload_video.await_count == 2
+        zapcap_stages.create_caption_task.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_task_creation_only_retried_before_send(self, auto_clipper_service, zapcap_stages):
+        """Test that task creation is retried on connect errors but not after the request was sent"""
+        connect_error = ZapCapError("Failed to create captioning task")
+        connect_error.__context__ = httpx.ConnectError("refused")
+        zapcap_stages.create_caption_task.side_effect = [connect_error, "task-1"]
+        
+        result = await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        
+        assert result["task_id"] == "task-1"
+        assert zapcap_stages.create_caption_task.await_count == 2
+        
+        zapcap_stages.create_caption_task.reset_mock()
+        zapcap_stages.create_caption_task.side_effect = _read_timeout("Failed to create captioning task")
+        
+        with pytest.raises(ZapCapError):
+            await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        zapcap_stages.create_caption_task.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_status_check_retried_against_existing_task(self, auto_clipper_service, zapcap_stages):
+        """Test that a polling timeout keeps polling the same task without re-uploading"""
+        zapcap_stages.wait_for_completion.side_effect = [
+            _read_timeout("Failed to check caption status"),
+            {"status": "completed", "downloadUrl": "u"}
+        ]
+        
+        await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        
+        zapcap_stages.upload_video.assert_awaited_once()
+        zapcap_stages.create_caption_task.assert_awaited_once()
+        assert [c.args for c in zapcap_stages.wait_for_completion.await_args_list] == [("vid-1", "task-1")] * 2
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_download_retried_without_new_task(self, auto_clipper_service, zapcap_stages):
+        """Test that a download timeout retries only the download"""
+        zapcap_stages.download_result_video.side_effect = [
+            _read_timeout("Failed to download result video"),
+            "results/clip_1_captioned.mp4"
+        ]
+        
+        result = await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        
+        assert result["result_file_path"] == "results/clip_1_captioned.mp4"
+        zapcap_stages.upload_video.assert_awaited_once()
+        zapcap_stages.create_caption_task.assert_awaited_once()
+        zapcap_stages.wait_for_completion.assert_awaited_once()
+        assert zapcap_stages.download_result_video.await_count == 2
+        zapcap_stages.download_result_video.assert_awaited_with("u", "vid-1", "clip_1.mp4")
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_api_errors_not_retried(self, auto_clipper_service, zapcap_stages):
+        """Test that errors without a connection failure behind them are raised at once"""
+        zapcap_stages.wait_for_completion.side_effect = ZapCapError("Captioning failed: bad video")
+        
+        with pytest.raises(ZapCapError, match="bad video"):
+            await auto_clipper_service._process_clip_with_zapcap(asyncio.Semaphore(1), "clips/clip_1.mp4", None)
+        zapcap_stages.wait_for_completion.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_create_clips_with_zapcap_cancels_uploads_on_clip_failure(self, auto_clipper_service):
+        """Test that in-flight ZapCap uploads are cancelled and awaited when clip creation fails"""
+        upload_started = asyncio.Event()
+        upload_cancelled = asyncio.Event()
+        
+        async def upload(semaphore, clip_path, template_id):
+            upload_started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                upload_cancelled.set()
+                raise
+        
+        async def clip_groups(video_path, specs, video_info):
+            yield specs[:1]
+            await upload_started.wait()
+            raise VideoProcessingError("ffmpeg failed")
+        
+        auto_clipper_service._process_clip_with_zapcap = upload
+        auto_clipper_service.video_processing_service.create_video_clips_as_completed = clip_groups
+        specs = [
+            {'clip_number': 1, 'output_path': "clips/clip_1.mp4"},
+            {'clip_number': 2, 'output_path': "clips/clip_2.mp4"}
+        ]
+        
+        with pytest.raises(VideoProcessingError):
+            await auto_clipper_service.create_clips_with_zapcap("in.mp4", specs, {}, None)
+        assert upload_cancelled.is_set()
+    
+    @pytest.mark.asyncio
+    async def test_zapcap_auth_failure_cancels_remaining_clips(self, auto_clipper_service, zapcap_stages):
+        """Test that a 401 from the ZapCap API cancels the clips still in flight"""
+        api_url = f"{auto_clipper_service.settings.zapcap_api_base}/videos"
+        
+        async def upload_video(clip_path):
+            if clip_path.endswith("clip_1.mp4"):
+                raise _status_error(401, api_url)
+            await asyncio.Event().wait()
+        
+        zapcap_stages.upload_video.side_effect = upload_video
+        semaphore = asyncio.Semaphore(3)
+        tasks = [
+            asyncio.create_task(auto_clipper_service._process_clip_with_zapcap(semaphore, f"clips/clip_{n}.mp4", None))
+            for n in (1, 2, 3)
+        ]
+        
+        results = await asyncio.wait_for(auto_clipper_service._gather_zapcap_tasks(tasks), timeout=5)
+        
+        assert "401" in str(results[0])
+        assert all("authentication failed" in str(result) for result in results[1:])
+        assert all(task.done() for task in tasks)
+    
+    @pytest.mark.asyncio
+    async def test_storage_auth_failure_only_fails_its_clip(self, auto_clipper_service, zapcap_stages):
+        """Test that a 403 from a presigned storage URL does not cancel the other clips"""
+        # The other uploads finish only after clip 1 has failed
+        release = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        
+        async def upload_video(clip_path):
+            if clip_path.endswith("clip_1.mp4"):
+                raise _status_error(403, "https://uploads.s3.amazonaws.com/part/1?X-Amz-Signature=x")
+            await release.wait()
+            return "vid-1"
+        
+        zapcap_stages.upload_video.side_effect = upload_video
+        semaphore = asyncio.Semaphore(3)
+        tasks = [
+            asyncio.create_task(auto_clipper_service._process_clip_with_zapcap(semaphore, f"clips/clip_{n}.mp4", None))
+            for n in (1, 2, 3)
+        ]
+        
+        results = await auto_clipper_service._gather_zapcap_tasks(tasks)
+        
+        assert isinstance(results[0], ZapCapError)
+        assert [result["task_id"] for result in results[1:]] == ["task-1", "task-1"]
+    
+    def test_with_clip_times_skips_out_of_range_clips(self, auto_clipper_service):
+        """Test that times are parsed once and clips outside the duration bounds are dropped"""
+        auto_clipper_service.settings.min_clip_duration = 10
+        auto_clipper_service.settings.max_clip_duration = 120
+        clips_data = [
+            {"title": "Too short", "start_time": "00:10", "end_time": "00:15"},
+            {"title": "Good", "start_time": "01:00", "end_time": "01:45"},
+            {"title": "Too long", "start_time": "00:00", "end_time": "05:00"},
+            {"title": "Backwards", "start_time": "02:00", "end_time": "01:00"}
+        ]
+        
+        segments = auto_clipper_service._with_clip_times(clips_data)
+        
+        assert [segment["title"] for segment in segments] == ["Good"]
+        assert (segments[0]["start_seconds"], segments[0]["end_seconds"]) == (60.0, 105.0)
+        assert segments[0]["start_time"] == "01:00"
+        assert "start_seconds" not in clips_data[1]
+    
+    @pytest.mark.asyncio
+    async def test_process_video_writes_transcript_file(self, auto_clipper_service, temp_dir):
+        """Test that the transcript is saved under clips_dir and returned as a URL, not inlined"""
+        video_path = os.path.join(temp_dir, "input.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"video")
+        settings = auto_clipper_service.settings
+        settings.clips_dir = os.path.join(temp_dir, "clips")
+        os.makedirs(settings.clips_dir)
+        settings.analysis_cache_ttl = 0
+        settings.public_base_url = "https://api.test"
+        
+        transcript_text = "Halo semuanya, selamat datang"
+        video_processing = auto_clipper_service.video_processing_service
+        video_processing.get_video_info = Mock(return_value={'duration': 120.0, 'width': 1920, 'height': 1080})
+        video_processing.create_video_clips_batch_async = AsyncMock()
+        auto_clipper_service.transcription_service.transcribe_video = AsyncMock(
+            return_value={'text': transcript_text, 'segments': []}
+        )
+        auto_clipper_service.analyze_clip_segments = Mock(return_value=[{
+            'title': "Hook", 'description': "Opening", 'start_time': "00:10", 'end_time': "00:40",
+            'start_seconds': 10.0, 'end_seconds': 40.0
+        }])
+        
+        result = await auto_clipper_service.process_video(video_path, request=Mock())
+        
+        transcript_files = [name for name in os.listdir(settings.clips_dir) if name.startswith("transcript_")]
+        assert len(transcript_files) == 1
+        with open(os.path.join(settings.clips_dir, transcript_files[0]), encoding='utf-8') as f:
+            assert f.read() == transcript_text
+        assert result['transcript_url'].startswith("https://api.test/data/")
+        assert result['transcript_url'].endswith(transcript_files[0])
+        assert result['transcript_size'] == len(transcript_text)
+        assert 'transcript' not in result
+    
+    def test_analyze_clip_segments_cache_hit_skips_openai(self, auto_clipper_service, temp_dir):
+        """Test that a repeated analysis of the same transcript is served from the cache"""
+        auto_clipper_service.cache = JsonFileCache(os.path.join(temp_dir, "cache"), ttl=60)
+        create = auto_clipper_service.content_analyzer_service.client.chat.completions.create
+        create.return_value.choices[0].message.content = (
+            '[{"title": "Hook", "description": "Opening", "start_time": "00:15", "end_time": "01:00"}]'
+        )
+        transcript_data = {'segments': [{'start': 0.0, 'end': 60.0, 'text': " Welcome back"}]}
+        
+        first = auto_clipper_service.analyze_clip_segments(transcript_data, 120.0)
+        second = auto_clipper_service.analyze_clip_segments(transcript_data, 120.0)
+        
+        create.assert_called_once()
+        assert second == first
+        assert (second[0]['start_seconds'], second[0]['end_seconds']) == (15.0, 60.0)
+        
+        # A different transcript misses the cache
+        auto_clipper_service.analyze_clip_segments({'segments': [{'start': 0.0, 'end': 60.0, 'text': " Other"}]}, 120.0)
+        assert create.call_count == 2
@@ -1,8 +1,11 @@
 import pytest
+import io
 import os
+import asyncio
+import tempfile
 from unittest.mock import patch, Mock
 
-from app.services.base import BaseService
+from app.services.base import BaseService, _disk_fileno
 from app.config.settings import Settings
 
 
@@ -77,6 +80,31 @@ class TestBaseService:
         # Should not raise an exception
         base_service.cleanup_temp_files(non_existent_files)
     
+    @pytest.mark.asyncio
+    async def test_cleanup_temp_files_async(self, base_service, temp_dir):
+        """Test concurrent cleanup removes files and tolerates missing ones"""
+        temp_file = os.path.join(temp_dir, "temp_async.txt")
+        with open(temp_file, 'w') as f:
+            f.write("test content")
+        
+        await base_service.cleanup_temp_files_async([temp_file, "/path/that/does/not/exist.txt"])
+        
+        assert not os.path.exists(temp_file)
+    
+    @pytest.mark.asyncio
+    async def test_schedule_cleanup_runs_in_background(self, base_service, temp_dir):
+        """Test that scheduled cleanup returns at once and removes files on the loop"""
+        temp_file = os.path.join(temp_dir, "temp_background.txt")
+        with open(temp_file, 'w') as f:
+            f.write("test content")
+        
+        base_service.schedule_cleanup([temp_file])
+        assert os.path.exists(temp_file)
+        
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*pending)
+        assert not os.path.exists(temp_file)
+    
     @patch('os.makedirs')
     def test_directory_creation_error_handling(self, mock_makedirs, test_settings):
         """Test that directory creation errors are handled gracefully"""
@@ -84,4 +112,31 @@ class TestBaseService:
         
         # Should not raise an exception due to error handling
         service = BaseService(test_settings)
-        assert service.settings == test_settings 
\ No newline at end of file
+        assert service.settings == test_settings     
+    def test_disk_fileno(self, temp_dir):
+        """Test that only file objects backed by a regular file on disk report a descriptor"""
+        in_memory = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        in_memory.write(b"small")
+        with patch.object(in_memory, 'fileno', side_effect=AssertionError("would roll over")):
+            assert _disk_fileno(in_memory) is None
+        
+        rolled = tempfile.SpooledTemporaryFile(max_size=1)
+        rolled.write(b"larger than the spool")
+        assert _disk_fileno(rolled) == rolled.fileno()
+        
+        assert _disk_fileno(io.BytesIO(b"bytes")) is None
+        
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, 'rb') as pipe_reader, os.fdopen(write_fd, 'wb'):
+            assert _disk_fileno(pipe_reader) is None
+    
+    def test_copy_file_object(self, base_service, temp_dir):
+        """Test that in-memory and on-disk spooled files are copied whole"""
+        for max_size in (1 << 20, 1):
+            source = tempfile.SpooledTemporaryFile(max_size=max_size)
+            source.write(b"video bytes" * 100)
+            destination = os.path.join(temp_dir, f"copy_{max_size}.mp4")
+            
+            assert base_service._copy_file_object(source, destination) == 1100
+            with open(destination, 'rb') as f:
+                assert f.read() == b"video bytes" * 100
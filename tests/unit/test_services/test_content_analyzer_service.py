@@ -0,0 +1,172 @@
+import math
+import os
+import subprocess
+import sys
+import time
+from contextlib import closing
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from app.core.exceptions import ContentAnalysisError, TranscriptionError
+from app.services.content_analyzer import (
+    ContentAnalyzerService, SmartFrameExtractor, _SCENE_FRAME_SIZE, _gray_frames,
+    _histogram_changes, _scene_change_indices_range
+)
+
+
+@pytest.fixture
+def analyzer(test_settings):
+    """Content analyzer with a mocked OpenAI client"""
+    return ContentAnalyzerService(test_settings, Mock())
+
+
+class TestContentAnalyzerService:
+    """Test the ContentAnalyzerService class"""
+    
+    def test_detect_platform(self, analyzer):
+        """Test platform detection from URLs"""
+        assert analyzer.detect_platform("https://www.TikTok.com/@user/video/123") == 'tiktok'
+        assert analyzer.detect_platform("https://instagram.com/reel/abc") == 'instagram'
+        assert analyzer.detect_platform("https://example.com/video") == 'unknown'
+    
+    def test_extract_post_id_tiktok(self, analyzer):
+        """Test TikTok post ID extraction"""
+        url = "https://www.tiktok.com/@user/video/7234567890123456789?lang=en"
+        assert analyzer.extract_post_id_from_url(url, 'tiktok') == '7234567890123456789'
+    
+    def test_extract_post_id_instagram(self, analyzer):
+        """Test Instagram post ID extraction is case-insensitive on the path kind"""
+        assert analyzer.extract_post_id_from_url("https://www.instagram.com/REEL/Cx_1-a/", 'instagram') == 'Cx_1-a'
+        assert analyzer.extract_post_id_from_url("https://www.instagram.com/p/B2c3/", 'instagram') == 'B2c3'
+    
+    def test_extract_post_id_not_found(self, analyzer):
+        """Test post ID extraction for unmatched URLs"""
+        assert analyzer.extract_post_id_from_url("https://www.tiktok.com/@user", 'tiktok') is None
+        assert analyzer.extract_post_id_from_url("https://example.com/video/1", 'unknown') is None
+    
+    def test_sanitize_filename(self, analyzer):
+        """Test that reserved filename characters are replaced"""
+        assert analyzer.sanitize_filename('a<b>c:d"e/f\\g|h?i*j') == 'a_b_c_d_e_f_g_h_i_j'
+        assert analyzer.sanitize_filename('education') == 'education'
+    
+    def test_histogram_changes(self):
+        """Test that cuts are found by histogram and baseline frames are never reported"""
+        dark = np.zeros((180, 320), dtype=np.uint8)
+        bright = np.full((180, 320), 255, dtype=np.uint8)
+        frames = [dark, dark, bright, bright, dark]
+        
+        assert _histogram_changes(iter(frames), 0.3) == [2, 4]
+        assert _histogram_changes(iter(frames), 0.3, first_index=10) == [12, 14]
+        assert _histogram_changes(iter(frames[1:]), 0.3, first_index=1, start=3) == [4]
+    
+    def test_frame_importance_is_resolution_independent(self):
+        """Test that frames are scored at a fixed width"""
+        extractor = SmartFrameExtractor()
+        frame = np.zeros((180, 320, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (40, 40), (280, 140), (255, 255, 255), -1)
+        large = cv2.resize(frame, (1920, 1080), interpolation=cv2.INTER_NEAREST)
+        
+        assert extractor.calculate_frame_importance(np.zeros_like(frame)) == 0
+        assert extractor.calculate_frame_importance(large) == pytest.approx(
+            extractor.calculate_frame_importance(frame), rel=0.05
+        )
+    
+    def test_extract_keyframes_smart_encodes_in_memory(self, analyzer, tmp_path):
+        """Test that keyframes become JPEG data URLs and are only saved in debug mode"""
+        frame = np.zeros((90, 160, 3), dtype=np.uint8)
+        analyzer.frame_extractor.extract_smart_keyframes = Mock(return_value=[(0, frame, 1.0)])
+        
+        analyzer.settings.debug = False
+        images = analyzer.extract_keyframes_smart("video.mp4", str(tmp_path))
+        assert len(images) == 1
+        assert images[0]["image_url"]["url"].startswith("data:image/jpeg;base64,/9j/")
+        assert list(tmp_path.iterdir()) == []
+        
+        analyzer.settings.debug = True
+        analyzer.extract_keyframes_smart("video.mp4", str(tmp_path))
+        assert (tmp_path / "smart_frame_000.jpg").exists()
+    
+    def test_scene_change_ranges_match_serial_scan(self):
+        """Test that cuts on worker range boundaries are found exactly as by the serial scan"""
+        dark = np.zeros((180, 320), dtype=np.uint8)
+        bright = np.full((180, 320), 255, dtype=np.uint8)
+        frames = [dark] * 4 + [bright] * 4 + [dark] * 2 + [bright] * 2
+        fps = 25.0
+        
+        def gray_frames(video_path, start_time=0.0, count=None):
+            first = math.ceil(start_time * fps)
+            yield from frames[first:first + count if count is not None else None]
+        
+        with patch('app.services.content_analyzer._gray_frames', new=gray_frames):
+            serial = _histogram_changes(gray_frames("video.mp4"), 0.3)
+            # Boundaries at 4 and 8 fall exactly on cuts
+            ranged = [
+                index
+                for start, end in [(0, 4), (4, 8), (8, 12)]
+                for index in _scene_change_indices_range("video.mp4", start, end, 0.3, fps)
+            ]
+        
+        assert serial == [4, 8, 10]
+        assert ranged == serial
+    
+    def test_extract_keyframes_smart_parallel_for_long_videos(self, analyzer):
+        """Test that scene detection only goes to worker processes for long videos"""
+        analyzer.frame_extractor.extract_smart_keyframes = Mock(return_value=[])
+        analyzer.settings.parallel_scene_detection_min_duration = 300
+        
+        with patch('app.services.content_analyzer.os.cpu_count', return_value=4), \
+             patch('app.services.content_analyzer._video_duration', side_effect=[600.0, 60.0]):
+            analyzer.extract_keyframes_smart("long.mp4", "out")
+            analyzer.extract_keyframes_smart("short.mp4", "out")
+        
+        calls = analyzer.frame_extractor.extract_smart_keyframes.call_args_list
+        assert [c.args[3] for c in calls] == [True, False]
+    
+    def test_gray_frames_raises_on_ffmpeg_failure(self):
+        """Test that a failing decoder raises instead of looking like a video without cuts"""
+        frame_bytes = _SCENE_FRAME_SIZE[0] * _SCENE_FRAME_SIZE[1]
+        script = (
+            "import sys; sys.stdout.buffer.write(bytes(%d)); sys.stdout.flush(); "
+            "sys.stderr.write('Invalid data found when processing input'); sys.exit(1)" % (2 * frame_bytes)
+        )
+        real_popen = subprocess.Popen
+        
+        def fake_popen(cmd, **kwargs):
+            return real_popen([sys.executable, '-c', script], **kwargs)
+        
+        with patch('app.services.content_analyzer.subprocess.Popen', side_effect=fake_popen):
+            with pytest.raises(ContentAnalysisError, match="Invalid data found"):
+                list(_gray_frames("broken.mp4"))
+            
+            # Stopping early is not an error, whatever ffmpeg's exit status
+            with closing(_gray_frames("broken.mp4")) as frames:
+                assert next(frames).shape == (_SCENE_FRAME_SIZE[1], _SCENE_FRAME_SIZE[0])
+    
+    def test_gray_frames_missing_ffmpeg(self):
+        """Test that a missing ffmpeg binary is reported"""
+        with patch('app.services.content_analyzer.subprocess.Popen', side_effect=FileNotFoundError("ffmpeg")):
+            with pytest.raises(ContentAnalysisError, match="Could not run ffmpeg"):
+                list(_gray_frames("video.mp4"))
+    
+    @pytest.mark.asyncio
+    async def test_analyze_video_from_url_waits_for_frames_on_failure(self, analyzer):
+        """Test that a transcription error waits for the frame thread before tmpdir is removed"""
+        dir_existed = []
+        
+        def download(url, tmpdir):
+            return {}, os.path.join(tmpdir, "video.mp4"), tmpdir, 'tiktok', '1', {}
+        
+        def extract_keyframes(video_path, output_dir, max_frames, method):
+            time.sleep(0.2)
+            dir_existed.append(os.path.isdir(output_dir))
+            return []
+        
+        analyzer.download_social_media_video = download
+        analyzer.extract_keyframes_smart = extract_keyframes
+        with patch('app.services.transcription.TranscriptionService.transcribe_video',
+                   new=AsyncMock(side_effect=TranscriptionError("whisper failed"))):
+            with pytest.raises(TranscriptionError):
+                await analyzer.analyze_video_from_url("https://www.tiktok.com/@u/video/1")
+        
+        assert dir_existed == [True]
@@ -1,7 +1,10 @@
 import pytest
 import os
+import subprocess
 import asyncio
+import wave
 from unittest.mock import Mock, patch, AsyncMock
+from openai import AsyncOpenAI
 from app.services.transcription import TranscriptionService
 from app.core.exceptions import TranscriptionError
 
@@ -17,6 +20,14 @@ class TestTranscriptionService:
         assert service.logger is not None
         assert hasattr(service, 'client')
     
+    def test_sdk_retries_disabled(self, test_settings):
+        """Test that the SDK's own retries are turned off in favour of the service's"""
+        client = AsyncOpenAI(api_key="test-openai-key")
+        service = TranscriptionService(test_settings, client)
+        
+        assert service.client.max_retries == 0
+        assert client.max_retries > 0
+    
     def test_initialization_without_api_key(self, test_settings):
         """Test initialization without OpenAI API key"""
         test_settings.openai_api_key = ""
@@ -72,6 +83,40 @@ class TestTranscriptionService:
         assert duration == 120.5
         mock_subprocess.assert_called_once()
     
+    @patch('subprocess.run')
+    def test_get_audio_duration_wav_header(self, mock_subprocess, transcription_service, temp_dir):
+        """Test that PCM WAV durations come from the header without spawning ffprobe"""
+        audio_path = os.path.join(temp_dir, "header_audio.wav")
+        with wave.open(audio_path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\x00\x00" * 16000 * 3)
+        
+        assert transcription_service.get_audio_duration(audio_path) == 3.0
+        mock_subprocess.assert_not_called()
+    
+    @patch('subprocess.run')
+    def test_extract_audio_to_buffer_pyav(self, mock_subprocess, transcription_service, temp_dir):
+        """Test that PyAV encodes the Opus buffer in-process when it is installed"""
+        av = pytest.importorskip("av")
+        source_path = os.path.join(temp_dir, "stereo.wav")
+        with wave.open(source_path, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(44100)
+            wav_file.writeframes(b"\x00\x00" * 2 * 44100 * 2)
+        
+        buffer = transcription_service.extract_audio_to_buffer(source_path)
+        
+        assert buffer.name == "audio.ogg"
+        with av.open(buffer) as container:
+            stream = container.streams.audio[0]
+            assert stream.codec_context.name == "opus"
+            assert stream.codec_context.channels == 1
+            assert container.duration / av.time_base == pytest.approx(2.0, abs=0.1)
+        mock_subprocess.assert_not_called()
+    
     def test_split_audio_small_file(self, transcription_service, temp_dir):
         """Test that small audio files are not split"""
         audio_path = os.path.join(temp_dir, "small_audio.wav")
@@ -83,6 +128,70 @@ class TestTranscriptionService:
         assert len(chunks) == 1
         assert chunks[0] == audio_path
     
+    @patch.object(TranscriptionService, 'get_audio_duration')
+    def test_split_audio_reuses_known_duration(self, mock_duration, transcription_service, temp_dir):
+        """Test that a caller-supplied duration skips the ffprobe call"""
+        audio_path = os.path.join(temp_dir, "small_audio.wav")
+        with open(audio_path, 'wb') as f:
+            f.write(b"small audio content")
+        
+        chunks = transcription_service.split_audio_for_transcription(audio_path, 42.0)
+        
+        assert chunks[0]['duration'] == 42.0
+        mock_duration.assert_not_called()
+        
+        # Small files are sent whole, so no probe happens without a known duration either
+        chunks = transcription_service.split_audio_for_transcription(audio_path)
+        
+        assert chunks[0]['duration'] == 0.0
+        mock_duration.assert_not_called()
+    
+    def test_split_audio_offsets_from_segment_list(self, transcription_service):
+        """Test that chunk offsets come from the segment muxer's list, dropping a near-empty tail"""
+        temp_dir = transcription_service.settings.temp_dir
+        
+        def fake_ffmpeg(cmd, **kwargs):
+            chunk_pattern = cmd[-1]
+            rows = [(0.0, 12.5), (12.5, 25.02), (25.02, 25.05)]
+            with open(cmd[cmd.index('-segment_list') + 1], 'w') as list_file:
+                for i, (start, end) in enumerate(rows):
+                    name = os.path.basename(chunk_pattern % i)
+                    open(os.path.join(temp_dir, name), 'wb').close()
+                    list_file.write(f"{name},{start},{end}\n")
+            return Mock(returncode=0)
+        
+        with patch('subprocess.run', side_effect=fake_ffmpeg) as mock_subprocess:
+            chunks = transcription_service._split_audio_with_segment_muxer("audio.ogg", 12.5, "seglist")
+        
+        assert [(c['start_offset'], c['duration']) for c in chunks] == [(0.0, 12.5), (12.5, pytest.approx(12.52))]
+        assert all(c['path'].endswith('.ogg') and os.path.exists(c['path']) for c in chunks)
+        assert not os.path.exists(os.path.join(temp_dir, "audio_chunk_seglist_002.ogg"))
+        assert not os.path.exists(os.path.join(temp_dir, "audio_chunk_seglist_list.csv"))
+        cmd = mock_subprocess.call_args[0][0]
+        assert cmd[cmd.index('-c') + 1] == 'copy'
+        for chunk in chunks:
+            os.remove(chunk['path'])
+    
+    def test_split_audio_reencode_fallback_stays_under_limit(self, transcription_service, temp_dir):
+        """Test that chunks re-encoded after a failed stream copy are Opus sized to the upload limit"""
+        audio_path = os.path.join(temp_dir, "large_audio.ogg")
+        max_size = transcription_service.settings.max_transcription_chunk_size
+        with open(audio_path, 'wb') as f:
+            f.truncate(3 * max_size)
+        
+        copy_error = subprocess.CalledProcessError(1, 'ffmpeg', stderr="codec not supported")
+        with patch.object(transcription_service, '_split_audio_with_segment_muxer',
+                          side_effect=[copy_error, []]) as mock_split:
+            # A low-bitrate source: 3 chunks of 20 000s each would be far over the limit as 24 kbps Opus
+            transcription_service.split_audio_for_transcription(audio_path, 60000.0)
+        
+        fallback = mock_split.call_args_list[1]
+        chunk_duration = fallback.args[1]
+        assert chunk_duration * 24000 / 8 < max_size
+        assert fallback.kwargs['extension'] == '.ogg'
+        codec_args = fallback.kwargs['codec_args']
+        assert codec_args[codec_args.index('-c:a') + 1] == 'libopus'
+    
     @patch.object(TranscriptionService, 'get_audio_duration')
     def test_split_audio_large_file(self, mock_duration, transcription_service, temp_dir):
         """Test that large audio files are split into chunks"""
@@ -158,33 +267,149 @@ class TestTranscriptionService:
             with pytest.raises(TranscriptionError, match="Failed to transcribe audio"):
                 await transcription_service.transcribe_with_timestamps(audio_path)
     
-    def test_transcribe_chunk_sync_success(self, transcription_service, temp_dir, mock_openai_client):
-        """Test synchronous chunk transcription"""
+    @pytest.mark.asyncio
+    async def test_transcribe_chunk_success(self, transcription_service, temp_dir):
+        """Test async chunk transcription offsets timestamps"""
         chunk_path = os.path.join(temp_dir, "chunk.wav")
         with open(chunk_path, 'wb') as f:
             f.write(b"dummy audio content")
         
-        result = transcription_service.transcribe_chunk_sync(chunk_path, 0, 0.0)
+        mock_response = Mock()
+        mock_response.model_dump.return_value = {
+            'text': 'hello world',
+            'segments': [{'start': 0.0, 'end': 1.5, 'text': 'hello world'}],
+            'words': [{'start': 0.0, 'end': 0.5, 'word': 'hello'}, {'start': 0.6, 'end': 1.5, 'word': 'world'}]
+        }
+        transcription_service.client.audio.transcriptions.create.return_value = mock_response
+        
+        result = await transcription_service.transcribe_chunk(chunk_path, 1, 60.0)
         
         assert result['success'] == True
-        assert result['chunk_index'] == 0
-        assert 'text' in result
-        assert 'segments' in result
-        assert 'words' in result
+        assert result['chunk_index'] == 1
+        assert result['text'] == 'hello world'
+        assert result['segments'][0]['start'] == 60.0
+        assert result['words'][1]['end'] == 61.5
     
-    def test_transcribe_chunk_sync_error(self, transcription_service, temp_dir, mock_openai_client):
-        """Test synchronous chunk transcription with error"""
+    @pytest.mark.asyncio
+    async def test_transcribe_chunk_error(self, transcription_service, temp_dir):
+        """Test async chunk transcription with error"""
         chunk_path = os.path.join(temp_dir, "chunk.wav")
         with open(chunk_path, 'wb') as f:
             f.write(b"dummy audio content")
         
-        mock_openai_client.return_value.audio.transcriptions.create.side_effect = Exception("Chunk error")
+        transcription_service.client.audio.transcriptions.create.side_effect = Exception("Chunk error")
         
-        result = transcription_service.transcribe_chunk_sync(chunk_path, 0, 0.0)
+        result = await transcription_service.transcribe_chunk(chunk_path, 0, 0.0)
         
         assert result['success'] == False
         assert 'error' in result
     
+    @pytest.mark.asyncio
+    async def test_transcribe_chunk_retries_rate_limit(self, transcription_service, temp_dir):
+        """Test that rate-limited Whisper calls are retried with backoff"""
+        import httpx
+        from openai import RateLimitError
+        
+        chunk_path = os.path.join(temp_dir, "chunk.wav")
+        with open(chunk_path, 'wb') as f:
+            f.write(b"dummy audio content")
+        
+        rate_limit = RateLimitError(
+            "rate limited",
+            response=httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com")),
+            body=None
+        )
+        mock_response = Mock()
+        mock_response.model_dump.return_value = {'text': 'ok', 'segments': [], 'words': []}
+        transcription_service.client.audio.transcriptions.create.side_effect = [rate_limit, mock_response]
+        
+        with patch('app.services.transcription.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            result = await transcription_service.transcribe_chunk(chunk_path, 0, 0.0)
+        
+        assert result['success'] == True
+        assert transcription_service.client.audio.transcriptions.create.call_count == 2
+        mock_sleep.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_merge_chunk_results_in_order(self, transcription_service):
+        """Test that chunk results are merged by chunk index with single-space joins"""
+        chunk_info = [
+            {'path': 'a.wav', 'start_offset': 0.0, 'duration': 10.0},
+            {'path': 'b.wav', 'start_offset': 10.0, 'duration': 10.0},
+            {'path': 'c.wav', 'start_offset': 20.0, 'duration': 10.0}
+        ]
+        chunk_results = [
+            {'chunk_index': 2, 'segments': [{'id': 2}], 'words': [{'w': 'c'}], 'text': 'third', 'success': True},
+            {'chunk_index': 0, 'segments': [{'id': 0}], 'words': [{'w': 'a'}], 'text': 'first', 'success': True},
+            {'chunk_index': 1, 'segments': [], 'words': [], 'text': '', 'success': True}
+        ]
+        
+        with patch.object(transcription_service, 'split_audio_for_transcription', return_value=chunk_info), \
+             patch.object(transcription_service, 'transcribe_chunks_parallel', new=AsyncMock(return_value=chunk_results)):
+            result = await transcription_service.transcribe_audio_with_timestamps("audio.wav")
+        
+        assert result['text'] == 'first third'
+        assert [s['id'] for s in result['segments']] == [0, 2]
+        assert [w['w'] for w in result['words']] == ['a', 'c']
+    
+    @pytest.mark.asyncio
+    @patch('subprocess.run')
+    async def test_transcribe_video_in_memory(self, mock_subprocess, transcription_service):
+        """Test that small audio is piped from ffmpeg straight to Whisper"""
+        mock_subprocess.return_value = Mock(returncode=0, stdout=b"OggS opus bytes")
+        mock_response = Mock()
+        mock_response.model_dump.return_value = {'text': 'hi', 'segments': [], 'words': []}
+        transcription_service.client.audio.transcriptions.create.return_value = mock_response
+        
+        with patch.object(transcription_service, 'extract_audio_from_video') as mock_extract:
+            result = await transcription_service.transcribe_video("video.mp4")
+        
+        assert result['text'] == 'hi'
+        mock_extract.assert_not_called()
+        assert 'pipe:1' in mock_subprocess.call_args[0][0]
+        uploaded = transcription_service.client.audio.transcriptions.create.call_args.kwargs['file']
+        assert uploaded.name == "audio.ogg"
+    
+    @pytest.mark.asyncio
+    @patch('subprocess.run')
+    async def test_transcribe_video_segments_only(self, mock_subprocess, transcription_service):
+        """Test that word timestamps can be left out of the Whisper request"""
+        mock_subprocess.return_value = Mock(returncode=0, stdout=b"OggS opus bytes")
+        mock_response = Mock()
+        mock_response.model_dump.return_value = {'text': 'hi', 'segments': []}
+        create = transcription_service.client.audio.transcriptions.create
+        create.return_value = mock_response
+        
+        await transcription_service.transcribe_video("video.mp4", word_timestamps=False)
+        assert create.call_args.kwargs['timestamp_granularities'] == ["segment"]
+        
+        await transcription_service.transcribe_video("video.mp4")
+        assert create.call_args.kwargs['timestamp_granularities'] == ["word", "segment"]
+    
+    @pytest.mark.asyncio
+    @patch('subprocess.run')
+    async def test_transcribe_video_chunks_opus_when_too_large(self, mock_subprocess, transcription_service):
+        """Test that oversized Opus audio is chunked as Ogg instead of re-extracted to WAV"""
+        transcription_service.settings.max_transcription_chunk_size = 4
+        mock_subprocess.return_value = Mock(returncode=0, stdout=b"OggS opus bytes")
+        written = {}
+        
+        async def fake_transcribe(audio_path, duration=None, word_timestamps=True):
+            with open(audio_path, 'rb') as f:
+                written[audio_path] = f.read()
+            return {'text': 'long'}
+        
+        with patch.object(transcription_service, 'extract_audio_from_video') as mock_extract, \
+             patch.object(transcription_service, 'transcribe_audio_with_timestamps', side_effect=fake_transcribe):
+            result = await transcription_service.transcribe_video("video.mp4", 600.0)
+        
+        assert result == {'text': 'long'}
+        mock_extract.assert_not_called()
+        (audio_path, data), = written.items()
+        assert audio_path.endswith(".ogg")
+        assert data == b"OggS opus bytes"
+        assert not os.path.exists(audio_path)
+    
     async def test_transcribe_chunks_parallel(self, transcription_service, temp_dir, mock_openai_client):
         """Test parallel chunk transcription"""
         chunk_info = [
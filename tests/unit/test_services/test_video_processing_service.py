@@ -1,9 +1,10 @@
 import pytest
 import os
 import json
-from unittest.mock import patch, Mock
+from fractions import Fraction
+from unittest.mock import patch, Mock, AsyncMock
 from app.services.video_processing import VideoProcessingService
-from app.core.exceptions import VideoProcessingError
+from app.core.exceptions import VideoProcessingError, StorageError
 
 
 class TestVideoProcessingService:
@@ -16,6 +17,54 @@ class TestVideoProcessingService:
         assert service.settings == test_settings
         assert service.logger is not None
     
+    @pytest.mark.asyncio
+    async def test_save_upload_file_streams_chunks(self, video_processing_service):
+        """Test that uploads are streamed to disk chunk by chunk"""
+        upload = Mock(filename="video.mp4")
+        upload.read = AsyncMock(side_effect=[b"a" * 10, b"b" * 5, b""])
+        
+        path = await video_processing_service.save_upload_file(upload)
+        
+        try:
+            with open(path, 'rb') as f:
+                assert f.read() == b"a" * 10 + b"b" * 5
+            upload.read.assert_called_with(1 << 20)
+        finally:
+            os.remove(path)
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("spool_max_size", [1 << 20, 1])
+    async def test_save_upload_file_spooled(self, video_processing_service, spool_max_size):
+        """Test bulk copy of in-memory and rolled-over spooled uploads"""
+        import tempfile
+        from fastapi import UploadFile
+        
+        spooled = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        spooled.write(b"video bytes" * 100)
+        spooled.seek(0)
+        upload = UploadFile(file=spooled, filename="video.mp4")
+        
+        path = await video_processing_service.save_upload_file(upload)
+        
+        try:
+            with open(path, 'rb') as f:
+                assert f.read() == b"video bytes" * 100
+        finally:
+            os.remove(path)
+    
+    @pytest.mark.asyncio
+    async def test_save_upload_file_too_large(self, video_processing_service):
+        """Test that oversize uploads abort early and leave no partial file"""
+        video_processing_service.settings.max_file_size = 8
+        upload = Mock(filename="video.mp4")
+        upload.read = AsyncMock(side_effect=[b"a" * 6, b"b" * 6, b"c" * 6, b""])
+        
+        with pytest.raises(StorageError, match="exceeds maximum allowed size"):
+            await video_processing_service.save_upload_file(upload)
+        
+        assert upload.read.call_count == 2
+        assert not [f for f in os.listdir(video_processing_service.settings.temp_dir) if f.startswith("upload_")]
+    
     @patch('subprocess.run')
     def test_get_video_info_success(self, mock_subprocess, video_processing_service, temp_dir):
         """Test successful video info extraction"""
@@ -29,6 +78,10 @@ class TestVideoProcessingService:
                     "codec_type": "video",
                     "width": 1920,
                     "height": 1080
+                },
+                {
+                    "codec_type": "audio",
+                    "codec_name": "vorbis"
                 }
             ],
             "format": {
@@ -45,6 +98,7 @@ class TestVideoProcessingService:
         assert info['width'] == 1920
         assert info['height'] == 1080
         assert info['aspect_ratio'] == 1920 / 1080
+        assert info['audio_codec'] == 'vorbis'
         mock_subprocess.assert_called_once()
     
     @patch('subprocess.run')
@@ -86,11 +140,105 @@ class TestVideoProcessingService:
         with pytest.raises(VideoProcessingError, match="Failed to get video info"):
             video_processing_service.get_video_info(video_path)
     
+    @patch('subprocess.run')
+    def test_get_video_info_cached(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that repeated probes of an unchanged file spawn ffprobe once"""
+        video_path = os.path.join(temp_dir, "cached_video.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"dummy video content")
+        
+        mock_subprocess.return_value.stdout = json.dumps({
+            "streams": [{"codec_type": "video", "width": 1280, "height": 720}],
+            "format": {"duration": "10.0"}
+        })
+        
+        first = video_processing_service.get_video_info(video_path)
+        second = video_processing_service.get_video_info(video_path)
+        
+        assert first == second
+        mock_subprocess.assert_called_once()
+        
+        # Deleting a temp file invalidates the cache
+        video_processing_service.cleanup_temp_file(video_path)
+        with open(video_path, 'wb') as f:
+            f.write(b"dummy video content")
+        video_processing_service.get_video_info(video_path)
+        assert mock_subprocess.call_count == 2
+    
+    @patch('subprocess.run')
+    def test_get_video_info_pyav(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that PyAV reads the metadata in-process when it is installed"""
+        av = pytest.importorskip("av")
+        video_path = os.path.join(temp_dir, "pyav_video.mp4")
+        with av.open(video_path, 'w') as container:
+            stream = container.add_stream('mpeg4', rate=25)
+            stream.width, stream.height, stream.pix_fmt = 64, 48, 'yuv420p'
+            for _ in range(25):
+                frame = av.VideoFrame(64, 48, 'yuv420p')
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode():
+                container.mux(packet)
+        
+        info = video_processing_service.get_video_info(video_path)
+        
+        assert (info['width'], info['height'], info['fps']) == (64, 48, 25.0)
+        assert info['codec'] == 'mpeg4'
+        assert info['has_audio'] is False
+        assert info['audio_codec'] is None
+        assert info['duration'] == pytest.approx(1.0, abs=0.1)
+        mock_subprocess.assert_not_called()
+    
+    @patch('subprocess.run')
+    def test_get_video_info_pyav_reports_codec_not_decoder(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that PyAV probes report ffprobe's codec names rather than decoder names"""
+        video_path = os.path.join(temp_dir, "mp3_audio.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"dummy video content")
+        
+        def stream(kind, decoder, codec, **fields):
+            codec_context = Mock(**fields)
+            codec_context.name = decoder
+            codec_context.codec.canonical_name = codec
+            return Mock(type=kind, codec_context=codec_context, base_rate=Fraction(30), average_rate=None)
+        
+        container = Mock(
+            streams=[stream('video', 'libdav1d', 'av1', width=1920, height=1080),
+                     stream('audio', 'mp3float', 'mp3')],
+            duration=10_000_000, bit_rate=0
+        )
+        fake_av = Mock(time_base=1_000_000)
+        fake_av.open.return_value.__enter__ = Mock(return_value=container)
+        fake_av.open.return_value.__exit__ = Mock(return_value=False)
+        
+        with patch('app.services.video_processing.av', new=fake_av):
+            info = video_processing_service.get_video_info(video_path)
+        
+        assert (info['codec'], info['audio_codec']) == ('av1', 'mp3')
+        assert info['duration'] == 10.0
+        mock_subprocess.assert_not_called()
+    
     def test_get_video_info_missing_file(self, video_processing_service):
         """Test video info extraction with missing file"""
         with pytest.raises(VideoProcessingError, match="Video file not found"):
             video_processing_service.get_video_info("/nonexistent/file.mp4")
     
+    def test_get_safe_filename(self, video_processing_service):
+        """Test filename sanitization and fallbacks"""
+        assert video_processing_service.get_safe_filename("Hello, World - Part 2!") == "Hello_World_Part_2"
+        assert video_processing_service.get_safe_filename("a" * 80, max_length=10) == "a" * 10
+        assert video_processing_service.get_safe_filename("???") == "clip"
+    
+    def test_parse_rate(self):
+        """Test ffprobe frame rate parsing without eval"""
+        from app.services.video_processing import _parse_rate
+        
+        assert _parse_rate("30/1") == 30.0
+        assert _parse_rate("30000/1001") == pytest.approx(29.97, rel=1e-3)
+        assert _parse_rate("25") == 25.0
+        assert _parse_rate("0/0") == 0.0
+        assert _parse_rate("__import__('os')") == 0.0
+    
     def test_time_to_seconds_formats(self, video_processing_service):
         """Test time string to seconds conversion"""
         assert video_processing_service.time_to_seconds("01:30") == 90.0
@@ -229,6 +377,31 @@ class TestVideoProcessingService:
         assert result == output_path
         mock_subprocess.assert_called_once()
     
+    def test_hardware_encoder_args(self, test_settings):
+        """Test NVENC rate control and GPU decode options"""
+        test_settings.video_encoder = "h264_nvenc"
+        service = VideoProcessingService(test_settings)
+        
+        assert service._video_encoder_args() == ['-c:v', 'h264_nvenc', '-preset', 'p4', '-rc', 'vbr', '-cq', '23', '-b:v', '0']
+        assert service._input_args("in.mp4") == ['-y', '-hwaccel', 'auto', '-i', 'in.mp4']
+    
+    def test_calculate_crop_filter_uses_runtime_dimensions(self, video_processing_service):
+        """Test that crop filters are expressed in iw/ih so no probe is needed"""
+        video_filter = video_processing_service.calculate_crop_filter("9:16")
+        
+        assert "min(iw,ih*9/16)" in video_filter
+        assert "scale=1080:1920" in video_filter
+        
+        with pytest.raises(VideoProcessingError, match="Unsupported aspect ratio"):
+            video_processing_service.calculate_crop_filter("4:3")
+    
+    def test_clip_output_args_pin_yuv420p(self, video_processing_service):
+        """Test that re-encoded clips are 4:2:0 and original-ratio clips get even dimensions"""
+        args = video_processing_service._clip_output_args(10.0, 40.0, "out.mp4", "original")
+        
+        assert args[args.index('-pix_fmt') + 1] == 'yuv420p'
+        assert args[args.index('-vf') + 1].startswith("scale=trunc(iw/2)*2:trunc(ih/2)*2")
+    
     def test_create_clip_unsupported_aspect_ratio(self, video_processing_service, temp_dir):
         """Test clip creation with unsupported aspect ratio"""
         video_path = os.path.join(temp_dir, "input_video.mp4")
@@ -275,6 +448,150 @@ class TestVideoProcessingService:
                 video_path, 10.0, 60.0, output_path, "original"
             )
     
+    @patch('subprocess.run')
+    def test_create_clip_original_stream_copy(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that original-ratio clips of even-sized sources are stream-copied"""
+        video_path = os.path.join(temp_dir, "input_video.mp4")
+        output_path = os.path.join(temp_dir, "output_clip.mp4")
+        with open(output_path, 'wb') as f:
+            f.write(b"clip")
+        
+        video_processing_service.create_video_clip(
+            video_path, 10.0, 40.0, output_path, "original", {'width': 1920, 'height': 1080, 'codec': 'h264'}
+        )
+        
+        cmd = mock_subprocess.call_args[0][0]
+        assert cmd[cmd.index('-c') + 1] == 'copy'
+        assert cmd.index('-ss') < cmd.index('-i')
+        assert '-vf' not in cmd
+    
+    @patch('subprocess.run')
+    def test_create_video_clips_batch(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that a batch of clips is encoded with one FFmpeg call in source order"""
+        video_path = os.path.join(temp_dir, "input_video.mp4")
+        specs = [
+            {'start_time': 60.0, 'end_time': 90.0, 'output_path': os.path.join(temp_dir, "late.mp4")},
+            {'start_time': 10.0, 'end_time': 40.0, 'output_path': os.path.join(temp_dir, "early.mp4"), 'aspect_ratio': "1:1"}
+        ]
+        for spec in specs:
+            with open(spec['output_path'], 'wb') as f:
+                f.write(b"clip")
+        
+        result = video_processing_service.create_video_clips_batch(video_path, specs)
+        
+        assert result == [spec['output_path'] for spec in specs]
+        mock_subprocess.assert_called_once()
+        cmd = mock_subprocess.call_args[0][0]
+        assert cmd.count('-i') == 1
+        assert cmd.index(specs[1]['output_path']) < cmd.index(specs[0]['output_path'])
+        
+        # Input fast-seeks to the earliest clip, later clips trim relative to it
+        assert cmd[cmd.index('-ss') + 1] == '10.0'
+        assert cmd.index('-ss') < cmd.index('-i')
+        late_ss = cmd.index('-ss', cmd.index(specs[1]['output_path']))
+        assert cmd[late_ss:late_ss + 4] == ['-ss', '50.0', '-to', '80.0']
+    
+    @patch('subprocess.run')
+    def test_create_video_clips_batch_stream_copy(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that stream-copy clips share one FFmpeg call with one seeked input each"""
+        video_path = os.path.join(temp_dir, "input_video.mp4")
+        specs = [
+            {'start_time': 10.0, 'end_time': 40.0, 'output_path': os.path.join(temp_dir, "a.mp4"), 'aspect_ratio': "original"},
+            {'start_time': 60.0, 'end_time': 90.0, 'output_path': os.path.join(temp_dir, "b.mp4"), 'aspect_ratio': "original"}
+        ]
+        for spec in specs:
+            with open(spec['output_path'], 'wb') as f:
+                f.write(b"clip")
+        
+        video_processing_service.create_video_clips_batch(video_path, specs, {'width': 1920, 'height': 1080, 'codec': 'h264'})
+        
+        mock_subprocess.assert_called_once()
+        cmd = mock_subprocess.call_args[0][0]
+        assert cmd.count('-i') == 2
+        assert cmd[cmd.index('-ss', cmd.index('-i')) + 1] == '60.0'
+        output_index = cmd.index(specs[1]['output_path'])
+        assert cmd[output_index - 10:output_index - 6] == ['-map', '1:v:0', '-map', '1:a:0?']
+    
+    def test_stream_copy_when_source_matches_target_ratio(self, video_processing_service):
+        """Test that sources already in the target shape are copied rather than re-encoded"""
+        assert video_processing_service._can_stream_copy("in.mp4", "9:16", {'width': 1080, 'height': 1920, 'codec': 'h264'})
+        assert video_processing_service._can_stream_copy("in.mp4", "9:16", {'width': 720, 'height': 1280, 'codec': 'h264'})
+        assert not video_processing_service._can_stream_copy("in.mp4", "9:16", {'width': 2160, 'height': 3840, 'codec': 'h264'})
+        assert not video_processing_service._can_stream_copy("in.mp4", "9:16", {'width': 1920, 'height': 1080, 'codec': 'h264'})
+        assert not video_processing_service._can_stream_copy("in.mp4", "4:3", {'width': 1440, 'height': 1080, 'codec': 'h264'})
+    
+    def test_stream_copy_requires_mp4_compatible_codecs(self, video_processing_service):
+        """Test that sources whose codecs cannot go into an .mp4 as-is are re-encoded"""
+        base = {'width': 1920, 'height': 1080}
+        assert video_processing_service._can_stream_copy("in.mkv", "original", {**base, 'codec': 'h264', 'has_audio': True, 'audio_codec': 'aac'})
+        assert video_processing_service._can_stream_copy("in.mp4", "original", {**base, 'codec': 'h264', 'has_audio': True, 'audio_codec': 'mp3'})
+        assert not video_processing_service._can_stream_copy("in.mkv", "original", {**base, 'codec': 'vp8', 'has_audio': True, 'audio_codec': 'vorbis'})
+        assert not video_processing_service._can_stream_copy("in.avi", "original", {**base, 'codec': 'mpeg4', 'has_audio': False, 'audio_codec': None})
+        assert not video_processing_service._can_stream_copy("in.avi", "original", {**base, 'codec': 'h264', 'has_audio': True, 'audio_codec': 'pcm_s16le'})
+    
+    @patch('subprocess.run')
+    def test_create_clip_non_h264_source_reencodes(self, mock_subprocess, video_processing_service, temp_dir):
+        """Test that an "original" clip of a VP8/Vorbis .mkv is re-encoded instead of copied"""
+        video_path = os.path.join(temp_dir, "input_video.mkv")
+        output_path = os.path.join(temp_dir, "output_clip.mp4")
+        with open(output_path, 'wb') as f:
+            f.write(b"clip")
+        video_info = {'width': 1920, 'height': 1080, 'codec': 'vp8', 'has_audio': True, 'audio_codec': 'vorbis'}
+        
+        video_processing_service.create_video_clip(video_path, 10.0, 40.0, output_path, "original", video_info)
+        
+        cmd = mock_subprocess.call_args[0][0]
+        assert 'copy' not in cmd
+        assert cmd[cmd.index('-c:a') + 1] == 'aac'
+        assert '-vf' in cmd
+    
+    def test_stream_copy_requires_nearby_keyframe(self, video_processing_service, temp_dir):
+        """Test that "original" clips are re-encoded when the preceding keyframe is too far back"""
+        video_path = os.path.join(temp_dir, "gop_video.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"dummy video content")
+        video_processing_service.settings.stream_copy_max_keyframe_shift = 1.0
+        video_info = {'width': 1920, 'height': 1080, 'codec': 'h264'}
+        
+        with patch('app.services.video_processing._keyframes_cached', return_value=(0.0, 10.0, 20.0)):
+            assert video_processing_service._can_stream_copy(video_path, "original", video_info, 10.5)
+            assert video_processing_service._can_stream_copy(video_path, "original", video_info, 20.0)
+            assert not video_processing_service._can_stream_copy(video_path, "original", video_info, 15.0)
+    
+    def test_parallel_clip_groups(self, video_processing_service):
+        """Test that re-encoded clips are split into contiguous groups capped by cores"""
+        video_processing_service.settings.ffmpeg_threads_per_encode = 2
+        specs = [
+            {'start_time': float(start), 'end_time': start + 30.0, 'output_path': f"{start}.mp4"}
+            for start in (90, 0, 30, 60)
+        ]
+        specs.append({'start_time': 5.0, 'end_time': 35.0, 'output_path': "copy.mp4", 'aspect_ratio': "original"})
+        
+        with patch('app.services.video_processing.os.cpu_count', return_value=4):
+            groups = video_processing_service._parallel_clip_groups("in.mp4", specs, {'width': 1920, 'height': 1080, 'codec': 'h264'})
+        
+        assert [[spec['output_path'] for spec in group] for group in groups] == [
+            ["copy.mp4"], ["0.mp4", "30.mp4"], ["60.mp4", "90.mp4"]
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_create_video_clips_as_completed(self, video_processing_service):
+        """Test that each FFmpeg group is yielded once its clips are written"""
+        specs = [
+            {'start_time': 0.0, 'end_time': 30.0, 'output_path': "a.mp4"},
+            {'start_time': 5.0, 'end_time': 35.0, 'output_path': "copy.mp4", 'aspect_ratio': "original"}
+        ]
+        
+        with patch.object(video_processing_service, 'create_video_clips_batch') as mock_batch:
+            groups = [
+                group async for group in video_processing_service.create_video_clips_as_completed(
+                    "in.mp4", specs, {'width': 1920, 'height': 1080, 'codec': 'h264'}
+                )
+            ]
+        
+        assert sorted(spec['output_path'] for group in groups for spec in group) == ["a.mp4", "copy.mp4"]
+        assert mock_batch.call_count == len(groups)
+    
     def test_validate_video_file_valid_formats(self, video_processing_service):
         """Test video file validation with valid formats"""
         valid_files = [
@@ -0,0 +1,308 @@
+import pytest
+import os
+import json
+import queue
+import asyncio
+import httpx
+from unittest.mock import patch, Mock, AsyncMock
+from app.services import zapcap
+
+
+def _mock_async_client(handler):
+    """Build an httpx.AsyncClient factory that routes requests to handler"""
+    real_client = httpx.AsyncClient
+    
+    def factory(*args, **kwargs):
+        kwargs.pop('limits', None)
+        kwargs.pop('timeout', None)
+        return real_client(*args, transport=httpx.MockTransport(handler), **kwargs)
+    
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_client():
+    """Make each test build its own shared client from the patched factory"""
+    zapcap._shared_client = None
+    yield
+    zapcap._shared_client = None
+
+
+class TestZapCapService:
+    """Test the ZapCapService class"""
+    
+    @pytest.mark.asyncio
+    async def test_shared_client_is_reused(self):
+        """Test that the pooled client is reused until it is closed"""
+        client = zapcap._get_shared_client()
+        assert zapcap._get_shared_client() is client
+        
+        await zapcap.close_shared_client()
+        assert client.is_closed
+        assert zapcap._shared_client is None
+    
+    @pytest.mark.asyncio
+    async def test_save_upload_file_streams_chunks(self, zapcap_service):
+        """Test that uploads are streamed in chunks and trimmed to the bytes received"""
+        upload = Mock(filename="video.mp4", size=64)
+        upload.read = AsyncMock(side_effect=[b"a" * 10, b"b" * 5, b""])
+        
+        path = await zapcap_service.save_upload_file(upload)
+        
+        try:
+            with open(path, 'rb') as f:
+                assert f.read() == b"a" * 10 + b"b" * 5
+            upload.read.assert_called_with(1 << 20)
+        finally:
+            os.remove(path)
+    
+    @pytest.mark.asyncio
+    async def test_multipart_upload_parts(self, zapcap_service, temp_dir):
+        """Test that every part is uploaded from its own offset and completed in order"""
+        zapcap_service.settings.zapcap_adaptive_chunk = False
+        chunk_size = 10 * 1024 * 1024
+        video_path = os.path.join(temp_dir, "large_video.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"a" * chunk_size + b"b" * chunk_size + b"c" * 1024)
+        
+        put_bodies = {}
+        completed = {}
+        
+        def handler(request):
+            if request.url.path == "/videos/upload":
+                return httpx.Response(200, json={
+                    "uploadId": "up-1",
+                    "videoId": "vid-1",
+                    "presignedUrls": [f"https://s3.test/part/{i}" for i in range(1, 4)]
+                })
+            if request.url.host == "s3.test":
+                part = int(request.url.path.rsplit('/', 1)[1])
+                put_bodies[part] = request.content
+                return httpx.Response(200, headers={"ETag": f'"etag-{part}"'})
+            if request.url.path == "/videos/upload/complete":
+                completed.update(json.loads(request.content))
+                return httpx.Response(200, json={})
+            return httpx.Response(404)
+        
+        with patch('app.services.zapcap.httpx.AsyncClient', new=_mock_async_client(handler)):
+            video_id = await zapcap_service._multipart_upload(video_path)
+        
+        assert video_id == "vid-1"
+        assert put_bodies[1] == b"a" * chunk_size
+        assert put_bodies[2] == b"b" * chunk_size
+        assert put_bodies[3] == b"c" * 1024
+        assert completed["parts"] == [
+            {"partNumber": 1, "etag": "etag-1"},
+            {"partNumber": 2, "etag": "etag-2"},
+            {"partNumber": 3, "etag": "etag-3"}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_upload_part_retries_server_errors(self, zapcap_service, temp_dir):
+        """Test that a part PUT is retried after a 5xx and its ETag is still collected"""
+        video_path = os.path.join(temp_dir, "part.mp4")
+        with open(video_path, 'wb') as f:
+            f.write(b"p" * 1024)
+        responses = [httpx.Response(503), httpx.Response(200, headers={"ETag": '"etag-1"'})]
+        bodies = []
+        
+        def handler(request):
+            bodies.append(request.read())
+            return responses.pop(0)
+        
+        buffers = asyncio.Queue()
+        buffers.put_nowait(bytearray(1024))
+        fd = os.open(video_path, os.O_RDONLY)
+        try:
+            with patch('app.services.zapcap.asyncio.sleep', new=AsyncMock()):
+                async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                    part = await zapcap_service._upload_part(
+                        client, buffers, fd, 1, 1, "https://s3.test/part/1", 0, 1024, "video/mp4"
+                    )
+        finally:
+            os.close(fd)
+        
+        assert part == {"partNumber": 1, "etag": "etag-1"}
+        assert bodies == [b"p" * 1024, b"p" * 1024]
+        assert buffers.qsize() == 1
+    
+    @pytest.mark.asyncio
+    async def test_simple_upload_streams_multipart_body(self, zapcap_service, temp_dir):
+        """Test that the streamed form body frames the whole file with a matching length"""
+        video_path = os.path.join(temp_dir, "small_video.mp4")
+        payload = os.urandom(2 * 1024 * 1024 + 3)
+        with open(video_path, 'wb') as f:
+            f.write(payload)
+        
+        captured = {}
+        
+        def handler(request):
+            captured['body'] = request.read()
+            captured['headers'] = request.headers
+            return httpx.Response(200, json={"id": "vid-2"})
+        
+        with patch('app.services.zapcap.httpx.AsyncClient', new=_mock_async_client(handler)):
+            video_id = await zapcap_service._simple_upload(video_path)
+        
+        assert video_id == "vid-2"
+        boundary = captured['headers']['content-type'].split("boundary=")[1]
+        assert int(captured['headers']['content-length']) == len(captured['body'])
+        assert captured['body'].startswith(f"--{boundary}\r\n".encode())
+        assert captured['body'].endswith(payload + f"\r\n--{boundary}--\r\n".encode())
+        assert b'name="file"; filename="small_video.mp4"' in captured['body']
+    
+    @pytest.mark.asyncio
+    async def test_process_video_opens_session_while_saving(self, zapcap_service, temp_dir):
+        """Test that large uploads reuse the session opened alongside the local save"""
+        saved_path = os.path.join(temp_dir, "upload.mp4")
+        size = 11 * 1024 * 1024
+        with open(saved_path, 'wb') as f:
+            f.truncate(size)
+        session = {"video_id": "vid-3"}
+        upload = Mock(filename="clip.mp4", size=size)
+        zapcap_service.save_upload_file = AsyncMock(return_value=saved_path)
+        zapcap_service._create_upload_session = AsyncMock(return_value=session)
+        zapcap_service._multipart_upload = AsyncMock(return_value="vid-3")
+        zapcap_service.create_caption_task = AsyncMock(return_value="task-3")
+        zapcap_service.wait_for_completion = AsyncMock(return_value={"downloadUrl": "u"})
+        zapcap_service.download_result_video = AsyncMock(return_value=os.path.join(temp_dir, "out.mp4"))
+        
+        result = await zapcap_service.process_video(upload)
+        
+        assert result["video_id"] == "vid-3"
+        zapcap_service._create_upload_session.assert_awaited_once_with("clip.mp4", size)
+        zapcap_service._multipart_upload.assert_awaited_once_with(saved_path, session)
+        assert not os.path.exists(saved_path)
+    
+    @pytest.mark.asyncio
+    async def test_process_video_file_uploads_in_place(self, zapcap_service, temp_dir):
+        """Test that files on disk are uploaded from their path and left in place"""
+        clip_path = os.path.join(temp_dir, "clip_1.mp4")
+        with open(clip_path, 'wb') as f:
+            f.write(b"clip")
+        zapcap_service.save_upload_file = AsyncMock()
+        zapcap_service.upload_video = AsyncMock(return_value="vid-4")
+        zapcap_service.create_caption_task = AsyncMock(return_value="task-4")
+        zapcap_service.wait_for_completion = AsyncMock(return_value={"downloadUrl": "u"})
+        zapcap_service.download_result_video = AsyncMock(return_value=os.path.join(temp_dir, "out.mp4"))
+        
+        result = await zapcap_service.process_video_file(clip_path, language="id")
+        
+        assert result["video_id"] == "vid-4"
+        zapcap_service.upload_video.assert_awaited_once_with(clip_path)
+        zapcap_service.save_upload_file.assert_not_called()
+        zapcap_service.download_result_video.assert_awaited_once_with("u", "vid-4", "clip_1.mp4")
+        assert os.path.exists(clip_path)
+    
+    def test_multipart_chunk_size(self, zapcap_service):
+        """Test adaptive part sizing clamps to 16MB-256MB"""
+        mb = 1024 * 1024
+        assert zapcap_service._multipart_chunk_size(100 * mb) == 16 * mb
+        assert zapcap_service._multipart_chunk_size(1024 * mb) == 32 * mb
+        assert zapcap_service._multipart_chunk_size(20 * 1024 * mb) == 256 * mb
+        
+        zapcap_service.settings.zapcap_adaptive_chunk = False
+        assert zapcap_service._multipart_chunk_size(1024 * mb) == 10 * mb
+    
+    def test_part_buffer_count_respects_memory_budget(self, zapcap_service):
+        """Test that large parts get fewer buffers so an upload stays within the byte budget"""
+        mb = 1024 * 1024
+        zapcap_service.settings.zapcap_upload_concurrency = 8
+        zapcap_service.settings.zapcap_upload_buffer_budget = 256 * mb
+        
+        assert zapcap_service._part_buffer_count(16 * mb, 32) == 8
+        assert zapcap_service._part_buffer_count(16 * mb, 3) == 3
+        assert zapcap_service._part_buffer_count(64 * mb, 32) == 4
+        assert zapcap_service._part_buffer_count(256 * mb, 32) == 1
+        assert zapcap_service._part_buffer_count(512 * mb, 32) == 1
+    
+    @pytest.mark.asyncio
+    async def test_download_result_video(self, zapcap_service):
+        """Test that the streamed result is written out by the writer thread"""
+        body = b"x" * (3 * 1024 * 1024 + 7)
+        
+        async def stream():
+            for offset in range(0, len(body), 1 << 20):
+                yield body[offset:offset + (1 << 20)]
+        
+        def handler(request):
+            assert request.headers["Accept-Encoding"] == "identity"
+            return httpx.Response(200, headers={"Content-Length": str(len(body))}, content=stream())
+        
+        with patch('app.services.zapcap.httpx.AsyncClient', new=_mock_async_client(handler)):
+            path = await zapcap_service.download_result_video("https://cdn.test/result.mp4", "vid-1")
+        
+        try:
+            with open(path, 'rb') as f:
+                assert f.read() == body
+        finally:
+            os.remove(path)
+    
+    @pytest.mark.asyncio
+    async def test_download_result_video_stops_when_writer_fails(self, zapcap_service):
+        """Test that a failed writer aborts the download instead of buffering it in memory"""
+        body = b"x" * (64 * 1024 * 1024)
+        sent = 0
+        
+        async def stream():
+            nonlocal sent
+            for offset in range(0, len(body), 1 << 20):
+                sent += 1 << 20
+                yield body[offset:offset + (1 << 20)]
+        
+        def handler(request):
+            return httpx.Response(200, content=stream())
+        
+        def failing_writer(path, write_queue, expected_size=None):
+            write_queue.get()
+            raise OSError(28, "No space left on device")
+        
+        zapcap_service._drain_to_file = failing_writer
+        with patch('app.services.zapcap.httpx.AsyncClient', new=_mock_async_client(handler)):
+            with pytest.raises(zapcap.ZapCapError, match="No space left"):
+                await asyncio.wait_for(
+                    zapcap_service.download_result_video("https://cdn.test/result.mp4", "vid-1"), timeout=10
+                )
+        
+        assert sent < len(body)
+    
+    def test_drain_to_file_trims_preallocation(self, zapcap_service, temp_dir):
+        """Test that a preallocated result file is trimmed to the bytes written"""
+        path = os.path.join(temp_dir, "result.mp4")
+        write_queue = queue.Queue()
+        for chunk in (b"a" * 10, b"b" * 5, None):
+            write_queue.put(chunk)
+        
+        zapcap_service._drain_to_file(path, write_queue, expected_size=1024)
+        
+        with open(path, 'rb') as f:
+            assert f.read() == b"a" * 10 + b"b" * 5
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_completion_backs_off(self, zapcap_service):
+        """Test exponential polling that resets on status change and honours Retry-After"""
+        statuses = [
+            {"status": "pending"}, {"status": "pending"}, {"status": "pending"},
+            {"status": "rate_limited", "retry_after": 7.0},
+            {"status": "transcribing"}, {"status": "completed", "downloadUrl": "u"}
+        ]
+        zapcap_service.check_caption_status = AsyncMock(side_effect=statuses)
+        sleep = AsyncMock()
+        
+        with patch('app.services.zapcap.asyncio.sleep', new=sleep), \
+             patch('app.services.zapcap.random.uniform', return_value=0):
+            result = await zapcap_service.wait_for_completion("vid-1", "task-1")
+        
+        assert result["downloadUrl"] == "u"
+        assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 4, 7.0, 1]
+    
+    @pytest.mark.asyncio
+    async def test_check_caption_status_rate_limited(self, zapcap_service):
+        """Test that a 429 is reported as a rate-limited status with its Retry-After"""
+        def handler(request):
+            return httpx.Response(429, headers={"Retry-After": "12"})
+        
+        with patch('app.services.zapcap.httpx.AsyncClient', new=_mock_async_client(handler)):
+            status = await zapcap_service.check_caption_status("vid-1", "task-1")
+        
+        assert status == {"status": "rate_limited", "retry_after": 12.0}
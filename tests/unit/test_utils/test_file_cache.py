@@ -0,0 +1,41 @@
+import os
+import time
+from app.utils.file_cache import JsonFileCache, sha256_file, sha256_text
+
+
+class TestJsonFileCache:
+    """Test the JsonFileCache class"""
+    
+    def test_round_trip(self, temp_dir):
+        """Test that stored values are returned until they expire"""
+        cache = JsonFileCache(os.path.join(temp_dir, "cache"), ttl=60)
+        key = sha256_text("gpt-4o", "120.0", "[00:00-00:05] hello")
+        
+        assert cache.get("clip_segments", key) is None
+        cache.set("clip_segments", key, [{"title": "Hook", "start_time": "00:00"}])
+        assert cache.get("clip_segments", key) == [{"title": "Hook", "start_time": "00:00"}]
+        
+        # Age the entry past its TTL
+        path = cache._path("clip_segments", key)
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        assert cache.get("clip_segments", key) is None
+        assert not os.path.exists(path)
+    
+    def test_disabled(self, temp_dir):
+        """Test that a zero TTL stores nothing"""
+        cache = JsonFileCache(os.path.join(temp_dir, "cache"), ttl=0)
+        cache.set("transcript", "k", {"text": "hi"})
+        
+        assert cache.get("transcript", "k") is None
+        assert not os.path.exists(os.path.join(temp_dir, "cache"))
+    
+    def test_sha256_file(self, temp_dir):
+        """Test that file hashes depend only on content"""
+        first = os.path.join(temp_dir, "a.mp4")
+        second = os.path.join(temp_dir, "b.mp4")
+        for path in (first, second):
+            with open(path, 'wb') as f:
+                f.write(b"x" * (3 << 20))
+        
+        assert sha256_file(first) == sha256_file(second)